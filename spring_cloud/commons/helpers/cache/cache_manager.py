@@ -13,7 +13,9 @@ __author__ = "Waterball (johnny850807@gmail.com)"
 __license__ = "Apache 2.0"
 
 # standard library
+import threading
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 
 
 class OnCacheMiss:
@@ -53,6 +55,13 @@ class CacheManager(ABC):
     def put(self, key, value):
         pass
 
+    def evict(self, key):
+        """
+        Removes the value of the key if it's cached, so that the next retrieval misses the cache.
+        By default it caches None (which is a miss), override it to really remove the value.
+        """
+        self.put(key, None)
+
 
 class NaiveCacheManager(CacheManager):
     """
@@ -67,3 +76,48 @@ class NaiveCacheManager(CacheManager):
 
     def put(self, key, value):
         self.dict[key] = value
+
+    def evict(self, key):
+        self.dict.pop(key, None)
+
+
+class LruCacheManager(CacheManager):
+    """
+    A thread-safe cache bounded in size, the least recently used value is evicted when it's full.
+    The hits and misses are counted for monitoring.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.__dict = OrderedDict()
+        self.__lock = threading.Lock()
+
+    def retrieve_value(self, key):
+        with self.__lock:
+            value = self.__dict.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.__dict.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self.__lock:
+            self.__dict[key] = value
+            self.__dict.move_to_end(key)
+            if len(self.__dict) > self.max_size:
+                self.__dict.popitem(last=False)
+
+    def evict(self, key):
+        with self.__lock:
+            self.__dict.pop(key, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__dict.clear()
+
+    def __len__(self):
+        return len(self.__dict)
@@ -123,7 +123,7 @@ class RestTemplate:
 
         kwargs.setdefault("allow_redirects", True)
         kwargs["params"] = params
-        url, kwargs = self.__intercept_request("get", url, kwargs)
+        url, kwargs = self.intercept_request("get", url, kwargs)
         return self.request("get", url, **kwargs)
 
     def options(self, url, **kwargs):
@@ -135,7 +135,7 @@ class RestTemplate:
         """
 
         kwargs.setdefault("allow_redirects", True)
-        url, kwargs = self.__intercept_request("options", url, kwargs)
+        url, kwargs = self.intercept_request("options", url, kwargs)
         return self.request("options", url, **kwargs)
 
     def head(self, url, **kwargs):
@@ -149,7 +149,7 @@ class RestTemplate:
         """
 
         kwargs.setdefault("allow_redirects", False)
-        url, kwargs = self.__intercept_request("head", url, kwargs)
+        url, kwargs = self.intercept_request("head", url, kwargs)
         return self.request("head", url, **kwargs)
 
     def post(self, url, data=None, json=None, **kwargs):
@@ -164,7 +164,7 @@ class RestTemplate:
         """
         kwargs["data"] = data
         kwargs["json"] = json
-        url, kwargs = self.__intercept_request("post", url, kwargs)
+        url, kwargs = self.intercept_request("post", url, kwargs)
         return self.request("post", url, **kwargs)
 
     def put(self, url, data=None, **kwargs):
@@ -178,7 +178,7 @@ class RestTemplate:
         :rtype: requests.Response
         """
         kwargs["data"] = data
-        url, kwargs = self.__intercept_request("put", url, kwargs)
+        url, kwargs = self.intercept_request("put", url, kwargs)
         return self.request("put", url, **kwargs)
 
     def patch(self, url, data=None, **kwargs):
@@ -192,7 +192,7 @@ class RestTemplate:
         :rtype: requests.Response
         """
         kwargs["data"] = data
-        url, kwargs = self.__intercept_request("patch", url, kwargs)
+        url, kwargs = self.intercept_request("patch", url, kwargs)
         return self.request("patch", url, **kwargs)
 
     def delete(self, url, **kwargs):
@@ -203,10 +203,10 @@ class RestTemplate:
         :rtype: requests.Response
         """
 
-        url, kwargs = self.__intercept_request("delete", url, kwargs)
+        url, kwargs = self.intercept_request("delete", url, kwargs)
         return self.request("delete", url, **kwargs)
 
-    def __intercept_request(self, method, url, kwargs) -> Tuple[str, dict]:
+    def intercept_request(self, method, url, kwargs) -> Tuple[str, dict]:
         """
         Intercept the request and return the url after intercepted
         Returns:
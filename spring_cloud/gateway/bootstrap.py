@@ -1,15 +1,24 @@
 # -*- coding: utf-8 -*-
 # standard library
-from http.server import HTTPServer
 from typing import Callable, List, Optional
 
 # scip plugin
 from spring_cloud.commons.http import RestTemplate
-from spring_cloud.gateway.filter.global_filter import RestTemplateRouteFilter
+from spring_cloud.gateway.filter.global_filter import AsyncRestTemplateRouteFilter, RestTemplateRouteFilter
 from spring_cloud.gateway.handler import DispatcherHandler
 from spring_cloud.gateway.handler.handler import FilteringWebHandler, RoutePredicateHandlerMapping
-from spring_cloud.gateway.route.builder.route_locator import RouteLocator, RouteLocatorBuilder
+from spring_cloud.gateway.route.builder.route_locator import (
+    CompositeRouteLocator,
+    RefreshableRouteLocator,
+    RouteLocator,
+    RouteLocatorBuilder,
+)
+from spring_cloud.gateway.route.definition import FileRouteDefinitionLocator
+from spring_cloud.gateway.route.definition_route_locator import RouteDefinitionRouteLocator
+from spring_cloud.gateway.route.watcher import FileWatcher
+from spring_cloud.gateway.server.async_server import AsyncHTTPServer
 from spring_cloud.gateway.server.request_handler import HTTPRequestHandler
+from spring_cloud.gateway.server.worker import PreforkServer, ThreadPoolHTTPServer
 from spring_cloud.utils import logging, validate
 
 __author__ = "Waterball (johnny850807@gmail.com)"
@@ -24,15 +33,118 @@ class ApiGatewayApplication:
         port_: Optional[int] = 8726,
         enable_discovery_client: Optional[bool] = False,
         eureka_server_urls: Optional[List[str]] = None,
+        async_mode: Optional[bool] = False,
+        workers: Optional[int] = 1,
+        max_threads: Optional[int] = 32,
+        max_queue_size: Optional[int] = 128,
+        keep_alive_timeout: Optional[float] = 15,
+        max_keep_alive_requests: Optional[int] = 100,
+        streaming: Optional[bool] = False,
+        passthrough_compressed: Optional[bool] = False,
+        route_cache_size: Optional[int] = 0,
+        routes_file: Optional[str] = None,
+        routes_refresh_interval: Optional[float] = 1.0,
     ):
+        """
+        Args:
+            async_mode: serve with the asyncio-native server, which keeps every connection
+                in a coroutine so that a slow upstream doesn't stall the other clients,
+                and awaits the upstream services with aiohttp (see AsyncRestTemplateRouteFilter).
+            workers: the number of pre-forked worker processes sharing the listening port via SO_REUSEPORT.
+            max_threads: the number of threads serving the connections in each worker
+                (in the async mode, the number of threads running the blocking filters).
+            max_queue_size: the maximum number of accepted connections waiting for a thread,
+                the connections beyond it are rejected with 503.
+            keep_alive_timeout: the seconds a persistent connection may stay idle before it's closed.
+            max_keep_alive_requests: the maximum number of requests served over one persistent connection.
+            streaming: relay the response bodies to the clients as they arrive from the upstream services
+                instead of downloading them first.
+            passthrough_compressed: relay the compressed response bodies untouched instead of decompressing them.
+            route_cache_size: the maximum number of the (method, host, path) keys whose matched routes are cached,
+                0 to disable the cache.
+            routes_file: the JSON or YAML (requires the 'yaml' extra) file of the route definitions served along with
+                the built routes, the routes are reloaded whenever the file changes.
+            routes_refresh_interval: the seconds between the checks of the routes file for changes.
+        """
         __logger = logging.getLogger("spring_cloud.ApiGatewayApplication")
-        api = None
-        web_server = None
+        prefork_server = None
         try:
-
             __logger.info(f"Launching ApiGatewayApplication listening at {host_name}:{port_}")
             if enable_discovery_client:
                 validate.not_none(eureka_server_urls)
+
+            # the routes are compiled once here, the forked workers share them
+            route_locator = route_locator_builder_consumer(RouteLocatorBuilder())
+            if routes_file:
+                definition_route_locator = RouteDefinitionRouteLocator(FileRouteDefinitionLocator(routes_file))
+                route_locator = RefreshableRouteLocator(
+                    CompositeRouteLocator([route_locator, definition_route_locator])
+                )
+            route_locator.get_routes()
+            __logger.debug(str(route_locator))
+            route_mapping = RoutePredicateHandlerMapping(route_locator, cache_size=route_cache_size)
+
+            def serve():
+                # every worker watches the routes file itself, their route tables aren't shared once forked
+                watcher = None
+                if routes_file:
+                    watcher = FileWatcher(routes_file, route_locator.refresh, routes_refresh_interval).start()
+                ApiGatewayApplication.serve(
+                    route_mapping,
+                    host_name,
+                    port_,
+                    enable_discovery_client,
+                    eureka_server_urls,
+                    async_mode,
+                    max_threads,
+                    max_queue_size,
+                    keep_alive_timeout,
+                    max_keep_alive_requests,
+                    reuse_port=workers > 1,
+                    streaming=streaming,
+                    passthrough_compressed=passthrough_compressed,
+                )
+                if watcher:
+                    watcher.stop()
+
+            if workers > 1:
+                prefork_server = PreforkServer(workers, serve)
+                prefork_server.serve_forever()
+            else:
+                serve()
+        except KeyboardInterrupt:
+            pass
+        except Exception as err:
+            __logger.error(str(err))
+
+        if prefork_server:
+            prefork_server.server_close()
+            __logger.info("Workers stopped.")
+
+    @staticmethod
+    def serve(
+        route_mapping: RoutePredicateHandlerMapping,
+        host_name: str,
+        port_: int,
+        enable_discovery_client: bool,
+        eureka_server_urls: Optional[List[str]],
+        async_mode: bool,
+        max_threads: int,
+        max_queue_size: int,
+        keep_alive_timeout: float,
+        max_keep_alive_requests: int,
+        reuse_port: bool,
+        streaming: Optional[bool] = False,
+        passthrough_compressed: Optional[bool] = False,
+    ):
+        """
+        Serve the requests in the current process until interrupted.
+        """
+        __logger = logging.getLogger("spring_cloud.ApiGatewayApplication")
+        api = None
+        web_server = None
+        try:
+            if enable_discovery_client:
                 __logger.debug("The discovery client routing is enabled.")
                 # scip plugin
                 import spring_cloud.context.bootstrap_client as spring_cloud_bootstrap
@@ -43,17 +155,35 @@ class ApiGatewayApplication:
             else:
                 api = RestTemplate()
 
-            route_locator = route_locator_builder_consumer(RouteLocatorBuilder())
-            __logger.debug(str(route_locator))
-
-            route_mapping = RoutePredicateHandlerMapping(route_locator)
-            filtering_web_handler = FilteringWebHandler([RestTemplateRouteFilter(api)])
+            # the asyncio-native server awaits the upstream services on its loop instead of its worker threads
+            route_filter_class = AsyncRestTemplateRouteFilter if async_mode else RestTemplateRouteFilter
+            route_filter = route_filter_class(api, streaming=streaming, passthrough_compressed=passthrough_compressed)
+            filtering_web_handler = FilteringWebHandler([route_filter])
             dispatcher_handler = DispatcherHandler(route_mapping, filtering_web_handler)
 
-            web_server = HTTPServer(
-                (host_name, port_),
-                lambda *args, **kwargs: HTTPRequestHandler(*args, dispatcher_handler=dispatcher_handler, **kwargs),
-            )
+            if async_mode:
+                web_server = AsyncHTTPServer(
+                    (host_name, port_),
+                    dispatcher_handler,
+                    keep_alive_timeout=keep_alive_timeout,
+                    max_keep_alive_requests=max_keep_alive_requests,
+                    max_workers=max_threads,
+                    reuse_port=reuse_port,
+                )
+            else:
+                web_server = ThreadPoolHTTPServer(
+                    (host_name, port_),
+                    lambda *args, **kwargs: HTTPRequestHandler(
+                        *args,
+                        dispatcher_handler=dispatcher_handler,
+                        keep_alive_timeout=keep_alive_timeout,
+                        max_keep_alive_requests=max_keep_alive_requests,
+                        **kwargs,
+                    ),
+                    max_threads=max_threads,
+                    max_queue_size=max_queue_size,
+                    reuse_port=reuse_port,
+                )
 
             __logger.info(f"Server listening at {host_name}:{port_}")
 
@@ -66,5 +196,5 @@ class ApiGatewayApplication:
         if web_server:
             web_server.server_close()
             __logger.info("Server stopped.")
-        if api:
+        if api and hasattr(api, "shutdown"):
             api.shutdown()
@@ -1,5 +1,15 @@
 # -*- coding: utf-8 -*-
-from .filter import GatewayFilter, GatewayFilterChain, GlobalFilter, StaticGatewayFilterChain
+from .filter import (
+    AsyncGatewayFilter,
+    AsyncGatewayFilterChain,
+    AsyncGlobalFilter,
+    GatewayFilter,
+    GatewayFilterChain,
+    GlobalFilter,
+    OrderedGatewayFilter,
+    PhasedGatewayFilter,
+    StaticGatewayFilterChain,
+)
 from .http_headers_filter import (
     HEADER_FILTERS,
     ForwardedHeadersFilter,
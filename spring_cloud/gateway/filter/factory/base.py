@@ -10,10 +10,28 @@ from spring_cloud.gateway.filter import GatewayFilter
 
 
 class GatewayFilterFactory(ABC):
+    # whether the routes of the identical configs may share one filter, false for the stateful filters
+    shareable = True
+
     @abstractmethod
     def apply(self, config) -> GatewayFilter:
         pass
 
+    @property
+    def name(self) -> str:
+        """
+        Returns:
+            (str) the name referred to by the filter definitions, e.g., 'PrefixPath' of PrefixPathGatewayFilterFactory
+        """
+        name = type(self).__name__
+        return name[: -len("GatewayFilterFactory")] if name.endswith("GatewayFilterFactory") else name
+
+    def new_config(self, **args):
+        """
+        Creates the config from the args of the filter definition.
+        """
+        raise NotImplementedError(f"{type(self).__name__} can't create the config from the args.")
+
 
 class AbstractGatewayFilterFactory(GatewayFilterFactory, ABC):
     pass
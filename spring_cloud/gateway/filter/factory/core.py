@@ -4,10 +4,28 @@ from __future__ import annotations
 __author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
 __license__ = "Apache 2.0"
 
+# standard library
+import math
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
 # scip plugin
-from spring_cloud.gateway.filter import GatewayFilter, GatewayFilterChain
+from spring_cloud.gateway.filter import GatewayFilter, PhasedGatewayFilter
 from spring_cloud.gateway.filter.factory.base import GatewayFilterFactory
-from spring_cloud.gateway.server import GATEWAY_ALREADY_PREFIXED_ATTR, GATEWAY_REQUEST_URL_ATTR, ServerWebExchange
+from spring_cloud.gateway.server import (
+    GATEWAY_ALREADY_PREFIXED_ATTR,
+    GATEWAY_REQUEST_URL_ATTR,
+    GATEWAY_ROUTE_ATTR,
+    HttpHeaders,
+    ServerHTTPResponse,
+    ServerWebExchange,
+    get_uri_template_variables,
+)
+from spring_cloud.gateway.server.utils import GATEWAY_RESPONSE_CACHE_ATTR
 from spring_cloud.utils.logging import getLogger
 
 
@@ -15,61 +33,112 @@ class AddRequestHeaderGatewayFilterFactory(GatewayFilterFactory):
     def apply(self, config) -> GatewayFilter:
         return AddRequestHeaderGatewayFilter(config)
 
+    def new_config(self, name, value) -> NameValueConfig:
+        return NameValueConfig(name, value)
+
 
 class AddResponseHeaderGatewayFilterFactory(GatewayFilterFactory):
     def apply(self, config) -> GatewayFilter:
         return AddResponseHeaderGatewayFilter(config)
 
+    def new_config(self, name, value) -> NameValueConfig:
+        return NameValueConfig(name, value)
+
 
 class PrefixPathGatewayFilterFactory(GatewayFilterFactory):
     def apply(self, config) -> GatewayFilter:
         return PrefixPathGatewayFilter(config)
 
+    def new_config(self, prefix) -> PrefixPathGatewayFilter.Config:
+        return PrefixPathGatewayFilter.Config(prefix)
+
+
+class SetPathGatewayFilterFactory(GatewayFilterFactory):
+    def apply(self, config) -> GatewayFilter:
+        return SetPathGatewayFilter(config)
+
+    def new_config(self, template) -> SetPathGatewayFilter.Config:
+        return SetPathGatewayFilter.Config(template)
+
+
+class ResponseCompressionGatewayFilterFactory(GatewayFilterFactory):
+    def apply(self, config) -> GatewayFilter:
+        return ResponseCompressionGatewayFilter(config)
+
+    def new_config(self, **args) -> ResponseCompressionGatewayFilter.Config:
+        if "encodings" in args:
+            args["encodings"] = tuple(args["encodings"])
+        return ResponseCompressionGatewayFilter.Config(**args)
+
+
+class RequestRateLimiterGatewayFilterFactory(GatewayFilterFactory):
+    # the buckets are the state of each route's own limiter
+    shareable = False
 
-class AddRequestHeaderGatewayFilter(GatewayFilter):
+    def apply(self, config) -> GatewayFilter:
+        return RequestRateLimiterGatewayFilter(config)
+
+    def new_config(self, **args) -> RequestRateLimiterGatewayFilter.Config:
+        return RequestRateLimiterGatewayFilter.Config(**args)
+
+
+class LocalResponseCacheGatewayFilterFactory(GatewayFilterFactory):
+    # the cached responses are of each route's own upstream
+    shareable = False
+
+    def apply(self, config) -> GatewayFilter:
+        return LocalResponseCacheGatewayFilter(config)
+
+    def new_config(self, **args) -> LocalResponseCacheGatewayFilter.Config:
+        if "vary_headers" in args:
+            args["vary_headers"] = tuple(args["vary_headers"])
+        return LocalResponseCacheGatewayFilter.Config(**args)
+
+
+class AddRequestHeaderGatewayFilter(PhasedGatewayFilter):
     def __init__(self, config: NameValueConfig):
         self.config = config
         self.logger = getLogger(name="spring_cloud.gateway.filter.core")
 
-    def filter(self, exchange: ServerWebExchange, chain: GatewayFilterChain) -> None:
+    def pre(self, exchange: ServerWebExchange) -> ServerWebExchange:
         request = exchange.request.mutate().header(self.config.name, self.config.value).build()
         self.logger.trace(f"Add request header with: {self.config.name}={self.config.value}")
-        chain.filter(exchange.mutate().request(request).build())
+        return exchange.mutate().request(request).build()
 
     def __str__(self):
         return f"[AddRequestHeader:'{self.config.name}'='{self.config.value}']"
 
 
-class AddResponseHeaderGatewayFilter(GatewayFilter):
+class AddResponseHeaderGatewayFilter(PhasedGatewayFilter):
     def __init__(self, config: NameValueConfig):
         self.config = config
         self.logger = getLogger(name="spring_cloud.gateway.filter.core")
 
-    def filter(self, exchange: ServerWebExchange, chain: GatewayFilterChain) -> None:
+    def pre(self, exchange: ServerWebExchange) -> ServerWebExchange:
         exchange.response.add_header(self.config.name, self.config.value)
         self.logger.trace(f"Add response header with: {self.config.name}={self.config.value}")
-        chain.filter(exchange)
+        return exchange
 
     def __str__(self):
         return f"[AddResponseHeader:'{self.config.name}'='{self.config.value}']"
 
 
-class PrefixPathGatewayFilter(GatewayFilter):
+class PrefixPathGatewayFilter(PhasedGatewayFilter):
     def __init__(self, config: PrefixPathGatewayFilter.Config):
         self.config = config
         self.logger = getLogger(name="spring_cloud.gateway.filter.core")
 
-    def filter(self, exchange: ServerWebExchange, chain: GatewayFilterChain) -> None:
+    def pre(self, exchange: ServerWebExchange) -> ServerWebExchange:
         is_already_prefix = exchange.get_arrtibute_or_default(GATEWAY_ALREADY_PREFIXED_ATTR, False)
         if is_already_prefix:
-            return chain.filter(exchange)
+            return exchange
 
         exchange.attributes[GATEWAY_ALREADY_PREFIXED_ATTR] = True
         new_path = f"{self.config.prefix}{exchange.request.path}"
         request = exchange.request.mutate().path(new_path).build()
         exchange.attributes[GATEWAY_REQUEST_URL_ATTR] = f"{request.uri}{request.path}"
         self.logger.trace(f"Prefixed URI with: {self.config.prefix} -> {request.uri}{request.path}")
-        chain.filter(exchange.mutate().request(request).build())
+        return exchange.mutate().request(request).build()
 
     def __str__(self):
         return f"[PrefixPath:'{self.config.prefix}']"
@@ -79,6 +148,514 @@ class PrefixPathGatewayFilter(GatewayFilter):
             self.prefix = prefix
 
 
+class SetPathGatewayFilter(PhasedGatewayFilter):
+    """
+    Sets the path of the request to the template expanded with the uri variables captured by the Path predicate,
+    e.g., the template '/{segment}' with the predicate Path('/api/{segment}') sets the path '/api/users' to '/users'.
+    """
+
+    TEMPLATE_VARIABLE = re.compile(r"\{([^{}]+)\}")
+
+    def __init__(self, config: SetPathGatewayFilter.Config):
+        self.config = config
+        # split once into the literals (at the even indices) and the variable names (at the odd indices)
+        self.template_parts = self.TEMPLATE_VARIABLE.split(config.template)
+        self.logger = getLogger(name="spring_cloud.gateway.filter.core")
+
+    def pre(self, exchange: ServerWebExchange) -> ServerWebExchange:
+        variables = get_uri_template_variables(exchange)
+        # the variables not captured are left as they are
+        new_path = "".join(
+            part if i % 2 == 0 else variables.get(part, f"{{{part}}}") for i, part in enumerate(self.template_parts)
+        )
+        request = exchange.request.mutate().path(new_path).build()
+        exchange.attributes[GATEWAY_REQUEST_URL_ATTR] = f"{request.uri}{request.path}"
+        self.logger.trace(f"Set path with: {self.config.template} -> {request.uri}{request.path}")
+        return exchange.mutate().request(request).build()
+
+    def __str__(self):
+        return f"[SetPath:'{self.config.template}']"
+
+    class Config:
+        def __init__(self, template: str):
+            self.template = template
+
+
+class ResponseCompressionGatewayFilter(PhasedGatewayFilter):
+    """
+    Compresses the response body with the encoding the client accepts (gzip or deflate)
+    right before the response is committed.
+    The bodies smaller than the minimum size and the bodies already encoded are sent as they are.
+    """
+
+    # the zlib window bits of the encodings
+    WBITS = {"gzip": 16 + zlib.MAX_WBITS, "deflate": zlib.MAX_WBITS}
+    UNCOMPRESSED_STATUS_CODES = {204, 304}
+
+    def __init__(self, config: ResponseCompressionGatewayFilter.Config):
+        self.config = config
+        self.logger = getLogger(name="spring_cloud.gateway.filter.core")
+
+    def pre(self, exchange: ServerWebExchange) -> ServerWebExchange:
+        encoding = self.negotiate_encoding(exchange.request.headers.get("Accept-Encoding", ""))
+        if encoding and exchange.request.method.upper() != "HEAD":
+            exchange.response.before_commit(lambda response: self.compress(response, encoding))
+        return exchange
+
+    def negotiate_encoding(self, accept_encoding: str) -> Optional[str]:
+        """
+        Returns:
+            (Optional[str]) the supported encoding the client prefers, None if there is none
+        """
+        qualities = {}
+        for token in accept_encoding.split(","):
+            coding, _, params = token.strip().partition(";")
+            coding = coding.strip().lower()
+            quality = 1.0
+            if params.strip().startswith("q="):
+                try:
+                    quality = float(params.strip()[2:])
+                except ValueError:
+                    continue
+            qualities[coding] = quality
+        # the wildcard only stands for the encodings not listed, so it never overrides a refusal (q=0)
+        wildcard_quality = qualities.get("*", 0.0)
+        best_encoding, best_quality = None, 0.0
+        for encoding in self.config.encodings:
+            quality = qualities.get(encoding, wildcard_quality)
+            if quality > best_quality:
+                best_encoding, best_quality = encoding, quality
+        return best_encoding
+
+    def compress(self, response: ServerHTTPResponse, encoding: str):
+        if response.status_code in self.UNCOMPRESSED_STATUS_CODES or self.__get_header(response, "Content-Encoding"):
+            return
+        content_length = self.__get_header(response, "Content-Length")
+        if response.body_stream is None:
+            if len(response.body) < self.config.min_size:
+                return
+            self.__pop_header(response, "Content-Length")
+            compressor = zlib.compressobj(self.config.level, zlib.DEFLATED, self.WBITS[encoding])
+            response.set_body(compressor.compress(response.body) + compressor.flush())
+        else:
+            if content_length is not None and int(content_length) < self.config.min_size:
+                return
+            # the compressed length is unknown until the whole stream is compressed
+            self.__pop_header(response, "Content-Length")
+            response.set_body_stream(self.compress_stream(response.body_stream, encoding))
+        response.add_header("Content-Encoding", encoding)
+        etag = self.__get_header(response, "ETag")
+        if etag and not etag.startswith("W/"):
+            # the compressed body is no longer byte-for-byte identical to the one the strong validator stands for
+            self.__pop_header(response, "ETag")
+            response.add_header("ETag", f"W/{etag}")
+        vary = self.__get_header(response, "Vary")
+        if not vary:
+            response.add_header("Vary", "Accept-Encoding")
+        elif "accept-encoding" not in vary.lower():
+            self.__pop_header(response, "Vary")
+            response.add_header("Vary", f"{vary}, Accept-Encoding")
+        self.logger.trace(f"Compressed the response with {encoding}")
+
+    def compress_stream(self, chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+        compressor = zlib.compressobj(self.config.level, zlib.DEFLATED, self.WBITS[encoding])
+        for chunk in chunks:
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    @staticmethod
+    def __get_header(response: ServerHTTPResponse, name: str) -> Optional[str]:
+        for key, value in response.headers.items():
+            if key.lower() == name.lower():
+                return value
+        return None
+
+    @staticmethod
+    def __pop_header(response: ServerHTTPResponse, name: str):
+        for key in [key for key in response.headers if key.lower() == name.lower()]:
+            del response.headers[key]
+
+    def __str__(self):
+        return f"[ResponseCompression:{'/'.join(self.config.encodings)}>={self.config.min_size}B]"
+
+    class Config:
+        def __init__(
+            self, min_size: int = 1024, encodings: Tuple[str, ...] = ("gzip", "deflate"), level: int = 6,
+        ):
+            """
+            Args:
+                min_size: the minimum size in bytes of the body to compress
+                encodings: the supported encodings in the order of preference
+                level: the compression level, from 1 (fastest) to 9 (smallest)
+            """
+            self.min_size = min_size
+            self.encodings = encodings
+            self.level = level
+
+
+class RequestRateLimiterGatewayFilter(PhasedGatewayFilter):
+    """
+    Admits the requests by the token bucket of their keys, e.g., of their clients' addresses.
+    A bucket holds up to `burst_capacity` tokens and regains `replenish_rate` tokens per second,
+    a request takes `requested_tokens` of them or is rejected with 429 before any upstream work is done.
+    """
+
+    KEY_RESOLVERS: Dict[str, Callable[[ServerWebExchange, Optional[str]], Optional[str]]] = {
+        "remote_addr": lambda exchange, _: exchange.request.remote_addr and exchange.request.remote_addr[0],
+        "header": lambda exchange, header: exchange.request.headers.get(header),
+        "route": lambda exchange, _: exchange.attributes[GATEWAY_ROUTE_ATTR].route_id,
+    }
+
+    def __init__(self, config: RequestRateLimiterGatewayFilter.Config):
+        self.config = config
+        self.resolve_key = self.KEY_RESOLVERS[config.key_resolver]
+        self.buckets = TokenBucketTable(config.replenish_rate, config.burst_capacity, config.max_keys, config.shards)
+        self.logger = getLogger(name="spring_cloud.gateway.filter.core")
+
+    def pre(self, exchange: ServerWebExchange) -> Optional[ServerWebExchange]:
+        key = self.resolve_key(exchange, self.config.header)
+        if not key:
+            if self.config.deny_empty_key:
+                self.reject(exchange, 403)
+                return None
+            return exchange
+        allowed, remaining = self.buckets.try_acquire(key, self.config.requested_tokens)
+        exchange.response.add_header("X-RateLimit-Remaining", str(int(remaining)))
+        if allowed:
+            return exchange
+        self.logger.trace(f"Rate limited: {key}")
+        retry_after = (self.config.requested_tokens - remaining) / self.config.replenish_rate
+        exchange.response.add_header("Retry-After", str(math.ceil(retry_after)))
+        self.reject(exchange, 429)
+        return None
+
+    @staticmethod
+    def reject(exchange: ServerWebExchange, status_code: int):
+        exchange.response.set_status_code(status_code)
+        exchange.response.set_body(b"")
+        exchange.response.commit()
+
+    def __str__(self):
+        return (
+            f"[RequestRateLimiter:{self.config.key_resolver} {self.config.replenish_rate}/s,"
+            f" burst {self.config.burst_capacity}]"
+        )
+
+    class Config:
+        def __init__(
+            self,
+            replenish_rate: float,
+            burst_capacity: Optional[float] = None,
+            requested_tokens: float = 1,
+            key_resolver: str = "remote_addr",
+            header: Optional[str] = None,
+            deny_empty_key: bool = True,
+            max_keys: int = 100_000,
+            shards: int = 64,
+        ):
+            """
+            Args:
+                replenish_rate: the tokens regained per second, i.e., the steady requests per second of a key
+                burst_capacity: the maximum tokens of a bucket, i.e., the requests of a burst, default to the rate
+                requested_tokens: the tokens taken by a request
+                key_resolver: the key of a request, one of 'remote_addr' (the client's address),
+                    'header' (the value of the header) and 'route' (the id of the route, i.e., all the requests)
+                header: the name of the header if the key is resolved from a header
+                deny_empty_key: whether to reject the requests without a key (e.g., the header) with 403
+                max_keys: the maximum number of the buckets, the least recently used ones are evicted
+                shards: the number of the independently locked parts of the buckets
+            """
+            if key_resolver not in RequestRateLimiterGatewayFilter.KEY_RESOLVERS:
+                raise ValueError(
+                    f"Unknown key resolver '{key_resolver}', "
+                    f"expected one of {sorted(RequestRateLimiterGatewayFilter.KEY_RESOLVERS)}."
+                )
+            if key_resolver == "header" and not header:
+                raise ValueError("The header is required to resolve the key from a header.")
+            self.replenish_rate = replenish_rate
+            self.burst_capacity = replenish_rate if burst_capacity is None else burst_capacity
+            self.requested_tokens = requested_tokens
+            self.key_resolver = key_resolver
+            self.header = header
+            self.deny_empty_key = deny_empty_key
+            self.max_keys = max_keys
+            self.shards = shards
+
+
+class TokenBucketTable:
+    """
+    The token buckets of at most `max_keys` keys, the least recently used ones are evicted (and refilled if seen again).
+    The keys are spread over the shards by their hashes, each shard is locked on its own,
+    so the concurrent requests only wait for each other if their keys fall into the same shard.
+    """
+
+    def __init__(self, replenish_rate: float, capacity: float, max_keys: int = 100_000, shards: int = 64):
+        self.replenish_rate = replenish_rate
+        self.capacity = capacity
+        self.shard_size = max(1, math.ceil(max_keys / shards))
+        # key -> [tokens, the time of the last refill], ordered from the least recently used
+        self.__shards: List[Tuple[OrderedDict, threading.Lock]] = [
+            (OrderedDict(), threading.Lock()) for _ in range(shards)
+        ]
+
+    def try_acquire(self, key: str, tokens: float = 1, now: Optional[float] = None) -> Tuple[bool, float]:
+        """
+        Returns:
+            (Tuple[bool, float]) whether the tokens are taken, and the tokens left in the bucket
+        """
+        buckets, lock = self.__shards[hash(key) % len(self.__shards)]
+        now = time.monotonic() if now is None else now
+        with lock:
+            bucket = buckets.get(key)
+            if bucket is None:
+                available = self.capacity
+                bucket = buckets[key] = [available, now]
+                if len(buckets) > self.shard_size:
+                    buckets.popitem(last=False)
+            else:
+                buckets.move_to_end(key)
+                available = min(self.capacity, bucket[0] + (now - bucket[1]) * self.replenish_rate)
+            allowed = available >= tokens
+            if allowed:
+                available -= tokens
+            bucket[0], bucket[1] = available, now
+        return allowed, available
+
+    def __len__(self):
+        return sum(len(buckets) for buckets, _ in self.__shards)
+
+
+class LocalResponseCacheGatewayFilter(PhasedGatewayFilter):
+    """
+    Serves the GET requests from the responses cached in memory, without calling the upstream service.
+
+    The responses are keyed by the method, the path, the query and the values of the configured `vary_headers`,
+    and cached for their Cache-Control max-age, or `time_to_live` without one.
+    Only the complete (not streamed) 200 responses are cached, unless they're no-store, no-cache or private,
+    set cookies, or vary by the headers other than `vary_headers`.
+    Only the headers of the upstream response are cached, not the ones added by the filters.
+    The requests of Cache-Control no-store bypass the cache, and the ones of no-cache refresh it.
+
+    Since the cache is shared by the clients, the requests with credentials (Authorization or Cookie)
+    are only served and stored the responses explicitly allowed to be shared (see RFC 7234 section 3.2).
+    """
+
+    CACHEABLE_METHODS = {"GET"}
+    CACHEABLE_STATUS_CODES = {200}
+    UNCACHEABLE_DIRECTIVES = {"no-store", "no-cache", "private"}
+    CREDENTIAL_HEADERS = ("Authorization", "Cookie")
+    SHARED_DIRECTIVES = {"public", "s-maxage", "must-revalidate"}
+
+    def __init__(self, config: LocalResponseCacheGatewayFilter.Config):
+        self.config = config
+        self.vary_headers = frozenset(header.lower() for header in config.vary_headers)
+        self.cache = ResponseCache(config.max_bytes)
+        self.logger = getLogger(name="spring_cloud.gateway.filter.core")
+
+    def pre(self, exchange: ServerWebExchange) -> Optional[ServerWebExchange]:
+        request = exchange.request
+        if request.method.upper() not in self.CACHEABLE_METHODS:
+            return exchange
+        directives = cache_control_directives(request.headers.get("Cache-Control", ""))
+        if "no-store" in directives:
+            return exchange
+        key = self.cache_key(exchange)
+        now = time.monotonic()
+        credentialed = any(header in request.headers for header in self.CREDENTIAL_HEADERS)
+        cached_response = None if "no-cache" in directives else self.cache.get(key, now, shared_only=credentialed)
+        if cached_response is None:
+            exchange.attributes[GATEWAY_RESPONSE_CACHE_ATTR] = "miss"
+            exchange.response.before_commit(lambda response: self.store(key, response, credentialed))
+            return exchange
+
+        exchange.attributes[GATEWAY_RESPONSE_CACHE_ATTR] = "hit"
+        self.logger.trace(f"Served from the response cache: {request.path}")
+        response = exchange.response
+        response.set_status_code(cached_response.status_code)
+        response.set_headers(**dict(cached_response.headers))
+        response.add_header("Age", str(int(now - cached_response.stored_at)))
+        response.set_body(cached_response.body)
+        response.commit()
+        return None
+
+    def cache_key(self, exchange: ServerWebExchange) -> tuple:
+        request = exchange.request
+        query = tuple(sorted((key, tuple(values)) for key, values in request.query.items()))
+        headers = request.headers
+        return (
+            request.method.upper(),
+            request.path,
+            query,
+            tuple(headers.get(header, "") for header in self.config.vary_headers),
+        )
+
+    def store(self, key: tuple, response: ServerHTTPResponse, credentialed: bool = False):
+        time_to_live = self.time_to_live(response)
+        if time_to_live is None:
+            return
+        directives = cache_control_directives(HttpHeaders(response.headers).get("Cache-Control", ""))
+        shared = not self.SHARED_DIRECTIVES.isdisjoint(directives)
+        if credentialed and not shared:
+            return
+        # the headers added by the filters (e.g., X-RateLimit-Remaining) are of this very request
+        excluded = response.filter_header_names
+        headers = tuple(
+            (name, value) for name, value in response.headers.items() if name.lower() != "age" and name not in excluded
+        )
+        now = time.monotonic()
+        self.cache.put(
+            key, CachedResponse(response.status_code, headers, response.body, now, now + time_to_live, shared)
+        )
+
+    def time_to_live(self, response: ServerHTTPResponse) -> Optional[float]:
+        """
+        Returns:
+            (Optional[float]) the seconds to cache the response for, None if it must not be cached
+        """
+        if response.status_code not in self.CACHEABLE_STATUS_CODES or response.body_stream is not None:
+            return None
+        if response.cookies:
+            return None
+        headers = HttpHeaders(response.headers)
+        if "Set-Cookie" in headers:
+            return None
+        vary = {header.strip().lower() for header in headers.get("Vary", "").split(",") if header.strip()}
+        if not vary <= self.vary_headers:
+            return None
+        directives = cache_control_directives(headers.get("Cache-Control", ""))
+        if not self.UNCACHEABLE_DIRECTIVES.isdisjoint(directives):
+            return None
+        # the gateway is a shared cache, which prefers s-maxage
+        max_age = directives.get("s-maxage") or directives.get("max-age")
+        if max_age is None:
+            return self.config.time_to_live
+        try:
+            time_to_live = float(max_age)
+        except ValueError:
+            return None
+        return time_to_live if time_to_live > 0 else None
+
+    def __str__(self):
+        return f"[LocalResponseCache:{self.config.max_bytes}B, {self.config.time_to_live}s]"
+
+    class Config:
+        def __init__(
+            self, max_bytes: int = 64 * 1024 * 1024, time_to_live: float = 60, vary_headers: Tuple[str, ...] = (),
+        ):
+            """
+            Args:
+                max_bytes: the memory budget of the cached responses, the least recently used ones are evicted
+                time_to_live: the seconds to cache the responses without a Cache-Control max-age
+                vary_headers: the request headers whose values key the responses too, e.g., ('Accept-Encoding',)
+            """
+            self.max_bytes = max_bytes
+            self.time_to_live = time_to_live
+            self.vary_headers = vary_headers
+
+
+class CachedResponse:
+    __slots__ = ("status_code", "headers", "body", "stored_at", "expires_at", "shared", "size")
+
+    # the rough bytes taken by a cached response besides its headers and body
+    OVERHEAD_BYTES = 256
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: Tuple[Tuple[str, str], ...],
+        body: bytes,
+        stored_at: float,
+        expires_at: float,
+        shared: bool = False,
+    ):
+        """
+        Args:
+            shared: whether the response is explicitly allowed to be shared, even with the requests of credentials
+        """
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.shared = shared
+        self.size = len(body) + sum(len(name) + len(value) for name, value in headers) + self.OVERHEAD_BYTES
+
+
+class ResponseCache:
+    """
+    The thread-safe cache of the responses within a memory budget,
+    the least recently used responses are evicted to make room for the new ones.
+    The hits and misses are counted for monitoring.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.__responses: OrderedDict = OrderedDict()
+        self.__lock = threading.Lock()
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def get(self, key, now: Optional[float] = None, shared_only: bool = False) -> Optional[CachedResponse]:
+        """
+        Args:
+            shared_only: only get the response explicitly allowed to be shared, the others are a miss
+        """
+        now = time.monotonic() if now is None else now
+        with self.__lock:
+            response = self.__responses.get(key)
+            if response is not None and response.expires_at <= now:
+                self.__remove(key)
+                response = None
+            if response is not None and shared_only and not response.shared:
+                response = None
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.__responses.move_to_end(key)
+            return response
+
+    def put(self, key, response: CachedResponse):
+        if response.size > self.max_bytes:
+            return
+        with self.__lock:
+            self.__remove(key)
+            self.__responses[key] = response
+            self.size += response.size
+            while self.size > self.max_bytes:
+                _, evicted = self.__responses.popitem(last=False)
+                self.size -= evicted.size
+
+    def __remove(self, key):
+        response = self.__responses.pop(key, None)
+        if response is not None:
+            self.size -= response.size
+
+    def __len__(self):
+        return len(self.__responses)
+
+
+def cache_control_directives(cache_control: str) -> Dict[str, Optional[str]]:
+    """
+    Returns:
+        (Dict[str, Optional[str]]) the lower-cased directives of the Cache-Control header to their values
+    """
+    directives = {}
+    for directive in cache_control.split(","):
+        name, _, value = directive.partition("=")
+        if name.strip():
+            directives[name.strip().lower()] = value.strip().strip('"') or None
+    return directives
+
+
 class NameValueConfig:
     def __init__(self, name: str, value: str):
         self.__name = name
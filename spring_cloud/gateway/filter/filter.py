@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 # standard library
 from abc import ABC, abstractmethod
+from typing import Optional
 
 __author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
 __license__ = "Apache 2.0"
 
 # scip plugin
 from spring_cloud.gateway.server import ServerWebExchange
+from spring_cloud.utils.ordered import Ordered
 
 
 class GatewayFilterChain(ABC):
@@ -21,12 +23,76 @@ class GatewayFilter(ABC):
         pass
 
 
+class PhasedGatewayFilter(GatewayFilter, ABC):
+    """
+    The filter which only acts before (pre) and after (post) the rest of the chain.
+    The filter chain runs the phased filters in a loop instead of nesting a call per filter.
+    """
+
+    def pre(self, exchange: ServerWebExchange) -> Optional[ServerWebExchange]:
+        """
+        Returns:
+            (Optional[ServerWebExchange]) the exchange passed to the rest of the chain, or None to end the chain
+        """
+        return exchange
+
+    def post(self, exchange: ServerWebExchange) -> None:
+        """
+        Runs after the rest of the chain, also if the chain was ended by the pre hook.
+        """
+        pass
+
+    def filter(self, exchange: ServerWebExchange, chain: GatewayFilterChain) -> None:
+        next_exchange = self.pre(exchange)
+        if next_exchange is not None:
+            chain.filter(next_exchange)
+        self.post(exchange)
+
+
+class OrderedGatewayFilter(GatewayFilter, Ordered):
+    def __init__(self, delegate: GatewayFilter, order: int):
+        self.delegate = delegate
+        self.__order = order
+
+    def filter(self, exchange: ServerWebExchange, chain: GatewayFilterChain) -> None:
+        return self.delegate.filter(exchange, chain)
+
+    def get_order(self) -> int:
+        return self.__order
+
+    def __str__(self):
+        return f"[{self.delegate}, order = {self.__order}]"
+
+
 class GlobalFilter(ABC):
     @abstractmethod
     def filter(self, exchange: ServerWebExchange, chain: GatewayFilterChain) -> None:
         pass
 
 
+class AsyncGatewayFilterChain(ABC):
+    @abstractmethod
+    async def filter(self, exchange: ServerWebExchange) -> None:
+        pass
+
+
+class AsyncGatewayFilter(ABC):
+    """
+    The filter awaiting its I/O (e.g., the upstream service) on the event loop instead of blocking a thread.
+    The filter chain awaits the async filters and runs the sync ones as usual, so both can be mixed in a route.
+    """
+
+    @abstractmethod
+    async def filter(self, exchange: ServerWebExchange, chain: AsyncGatewayFilterChain) -> None:
+        pass
+
+
+class AsyncGlobalFilter(ABC):
+    @abstractmethod
+    async def filter(self, exchange: ServerWebExchange, chain: AsyncGatewayFilterChain) -> None:
+        pass
+
+
 class StaticGatewayFilterChain(GatewayFilterChain):
     def filter(self, exchange: ServerWebExchange) -> None:
         pass
@@ -1,10 +1,14 @@
 # -*- coding: utf-8 -*-
 # standard library
+import asyncio
+import time
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, Iterable, Iterator
 
 # pypi/conda library
+import aiohttp
 import requests
+from requests.structures import CaseInsensitiveDict
 
 # scip plugin
 from spring_cloud.utils import logging
@@ -14,9 +18,21 @@ __license__ = "Apache 2.0"
 
 # scip plugin
 from spring_cloud.commons.http import RestTemplate
-from spring_cloud.gateway.filter import HEADER_FILTERS, GatewayFilterChain, HttpHeadersFilter
+from spring_cloud.gateway.filter import (
+    HEADER_FILTERS,
+    AsyncGatewayFilterChain,
+    AsyncGlobalFilter,
+    GatewayFilterChain,
+    HttpHeadersFilter,
+)
 from spring_cloud.gateway.server import ServerWebExchange
-from spring_cloud.gateway.server.utils import GATEWAY_ROUTE_ATTR, is_already_routed, set_already_routed
+from spring_cloud.gateway.server.utils import (
+    GATEWAY_ROUTE_ATTR,
+    add_upstream_time,
+    is_already_routed,
+    set_already_routed,
+)
+from spring_cloud.utils.ordered import Ordered
 
 
 class GlobalFilter(ABC):
@@ -25,10 +41,38 @@ class GlobalFilter(ABC):
         return NotImplemented
 
 
-class RestTemplateRouteFilter(GlobalFilter):
-    def __init__(self, rest_template: RestTemplate):
+class RestTemplateRouteFilter(GlobalFilter, Ordered):
+    HOP_BY_HOP_RESPONSE_HEADERS = ["Connection", "Keep-Alive", "Transfer-Encoding", "Trailer", "Upgrade"]
+
+    DEFAULT_BUFFER_SIZE = 64 * 1024
+    # the responses that never have a body
+    BODILESS_STATUS_CODES = {204, 304}
+
+    def __init__(
+        self,
+        rest_template: RestTemplate,
+        streaming: bool = False,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        passthrough_compressed: bool = False,
+    ):
+        """
+        Args:
+            rest_template: the client of the upstream services
+            streaming: whether to relay the response body to the client as it arrives
+                instead of downloading the whole body first
+            buffer_size: the maximum number of bytes buffered per connection while relaying
+            passthrough_compressed: whether to relay the compressed response body untouched
+                instead of decompressing it
+        """
         self.logger = logging.getLogger("spring_cloud.gateway.RestTemplateRouteFilter")
         self.api = rest_template
+        self.streaming = streaming
+        self.buffer_size = buffer_size
+        self.passthrough_compressed = passthrough_compressed
+
+    def get_order(self) -> int:
+        # routing to the upstream service ends the chain
+        return Ordered.LOWEST_PRECEDENCE
 
     def filter(self, exchange: ServerWebExchange, chain: GatewayFilterChain):
         self.logger.trace("Filtering...")
@@ -43,14 +87,31 @@ class RestTemplateRouteFilter(GlobalFilter):
         filtered_headers = HttpHeadersFilter.filter_request(HEADER_FILTERS, exchange)
         headers = self.compose_headers(exchange.request.cookies, filtered_headers)
         self.remove_host_headers(headers)
+        if self.passthrough_compressed:
+            self.restrict_accept_encoding(headers)
         params = exchange.request.query
-        data = exchange.request.body
+        # the body is piped to the upstream as it arrives instead of being buffered
+        body_stream = exchange.request.body_stream
+        data = body_stream if body_stream.has_body else None
 
-        res = self.map_api_request_method(method)(url, headers=headers, params=params, data=data)
+        # the raw body can only be read from a streamed response
+        stream = self.streaming or self.passthrough_compressed
+        start = time.perf_counter()
+        res = self.map_api_request_method(method)(url, headers=headers, params=params, data=data, stream=stream)
+        add_upstream_time(exchange, time.perf_counter() - start)
         self.logger.trace("Receive the response from the downstream service, now return it back to the client.")
-        self.send(res, exchange)
+        try:
+            if self.streaming and self.is_streamable(method, res):
+                self.send_stream(res, exchange)
+            else:
+                self.send(res, exchange)
+        finally:
+            res.close()
         self.logger.trace("Successfully responded.")
 
+    def is_streamable(self, method: str, res: requests.Response) -> bool:
+        return method.upper() != "HEAD" and res.status_code not in self.BODILESS_STATUS_CODES
+
     def map_api_request_method(self, method: str):
         method = method.lower()
         mapping = {
@@ -65,13 +126,53 @@ class RestTemplateRouteFilter(GlobalFilter):
         return mapping[method]
 
     def send(self, res: requests.Response, exchange: ServerWebExchange):
-        # TODO: response body has been unzip by RestTemplate, but we want the raw compressed body
-        self.modify_content_headers(res.headers, res.content)
-        exchange.response.set_body(res.content)
+        start = time.perf_counter()
+        if self.passthrough_compressed:
+            body = res.raw.read(decode_content=False)
+        else:
+            # the body has been decompressed by RestTemplate
+            body = res.content
+        add_upstream_time(exchange, time.perf_counter() - start)
+        self.modify_content_headers(res.headers, body)
+        exchange.response.set_body(body)
         exchange.response.set_status_code(res.status_code)
         exchange.response.set_headers(**res.headers)
         exchange.response.commit()
 
+    def send_stream(self, res: requests.Response, exchange: ServerWebExchange):
+        headers = res.headers
+        if self.passthrough_compressed:
+            content_length = headers.get("Content-Length")
+            chunks = res.raw.stream(self.buffer_size, decode_content=False)
+        else:
+            # the body is decoded while being relayed, so the upstream length only holds for an identity encoding
+            content_length = None if headers.pop("Content-Encoding", None) else headers.get("Content-Length")
+            chunks = res.iter_content(chunk_size=self.buffer_size)
+        headers.pop("Content-Length", None)
+        for header in self.HOP_BY_HOP_RESPONSE_HEADERS:
+            headers.pop(header, None)
+        exchange.response.set_body_stream(
+            self.time_upstream(chunks, exchange), int(content_length) if content_length else None
+        )
+        exchange.response.set_status_code(res.status_code)
+        exchange.response.set_headers(**headers)
+        exchange.response.commit()
+
+    @staticmethod
+    def time_upstream(chunks: Iterable[bytes], exchange: ServerWebExchange) -> Iterator[bytes]:
+        """
+        Counts the time waiting for the upstream pieces as the upstream time,
+        while the time relaying them to the client is the overhead of the gateway.
+        """
+        iterator = iter(chunks)
+        while True:
+            start = time.perf_counter()
+            chunk = next(iterator, None)
+            add_upstream_time(exchange, time.perf_counter() - start)
+            if chunk is None:
+                return
+            yield chunk
+
     @classmethod
     def compose_url(cls, uri: str, path: str):
         return uri + path
@@ -86,6 +187,161 @@ class RestTemplateRouteFilter(GlobalFilter):
         headers.pop("Host", None)
         headers.pop("X-Forwarded-For", None)
 
+    def restrict_accept_encoding(self, headers: Dict[str, str]):
+        """
+        The compressed body is relayed as is, so the upstream must not compress it
+        unless the client itself accepts the compression.
+        """
+        if not any(key.lower() == "accept-encoding" for key in headers):
+            headers["Accept-Encoding"] = "identity"
+
     def modify_content_headers(self, headers: Dict[str, str], body: bytes):
-        headers.pop("Content-Encoding", None)
+        if not self.passthrough_compressed:
+            headers.pop("Content-Encoding", None)
+        # the hop-by-hop headers describe the upstream connection, not the one to the client
+        for header in self.HOP_BY_HOP_RESPONSE_HEADERS:
+            headers.pop(header, None)
         headers["Content-Length"] = str(len(body))
+
+
+class AsyncRestTemplateRouteFilter(RestTemplateRouteFilter, AsyncGlobalFilter):
+    """
+    Routes to the upstream service like RestTemplateRouteFilter, but awaits the upstream with aiohttp
+    on the event loop, so the waits of thousands of requests overlap in one thread instead of a thread each.
+    The rest template only intercepts the requests, e.g., resolving the service instances by the discovery client.
+    """
+
+    DEFAULT_MAX_CONNECTIONS = 1000
+
+    def __init__(
+        self,
+        rest_template: RestTemplate,
+        streaming: bool = False,
+        buffer_size: int = RestTemplateRouteFilter.DEFAULT_BUFFER_SIZE,
+        passthrough_compressed: bool = False,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+    ):
+        """
+        Args:
+            max_connections: the maximum number of the concurrent connections to the upstream services
+        """
+        super().__init__(rest_template, streaming, buffer_size, passthrough_compressed)
+        self.logger = logging.getLogger("spring_cloud.gateway.AsyncRestTemplateRouteFilter")
+        self.max_connections = max_connections
+        # a session (and its connection pool) only works in the loop it's created in
+        self.__sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+    def get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        session = self.__sessions.get(loop)
+        if session is None or session.closed:
+            session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                auto_decompress=not self.passthrough_compressed,
+                # the cookies of each request are relayed by the filter, never kept between the requests
+                cookie_jar=aiohttp.DummyCookieJar(),
+            )
+            self.__sessions[loop] = session
+        return session
+
+    async def close(self):
+        """
+        Closes the session of the running loop.
+        """
+        session = self.__sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None:
+            await session.close()
+
+    async def filter(self, exchange: ServerWebExchange, chain: AsyncGatewayFilterChain):
+        self.logger.trace("Filtering...")
+        if is_already_routed(exchange):
+            return await chain.filter(exchange)
+        set_already_routed(exchange)
+
+        method = exchange.request.method
+        route = exchange.attributes[GATEWAY_ROUTE_ATTR]
+
+        url = self.compose_url(route.uri, exchange.request.path)
+        filtered_headers = HttpHeadersFilter.filter_request(HEADER_FILTERS, exchange)
+        headers = self.compose_headers(exchange.request.cookies, filtered_headers)
+        self.remove_host_headers(headers)
+        if self.passthrough_compressed:
+            self.restrict_accept_encoding(headers)
+        url, kwargs = self.api.intercept_request(
+            method.lower(), url, {"headers": headers, "params": exchange.request.query}
+        )
+        params = [(key, value) for key, values in kwargs["params"].items() for value in values]
+        loop = asyncio.get_running_loop()
+        # reading the body may wait for the client, which must not block the loop
+        body_stream = exchange.request.body_stream
+        data = await loop.run_in_executor(None, body_stream.read) if body_stream.has_body else None
+
+        start = time.perf_counter()
+        res = await self.get_session().request(
+            method, url, headers=kwargs["headers"], params=params, data=data, allow_redirects=method.upper() != "HEAD"
+        )
+        add_upstream_time(exchange, time.perf_counter() - start)
+        self.logger.trace("Receive the response from the downstream service, now return it back to the client.")
+        try:
+            if self.streaming and self.is_streamable(method, res):
+                await self.send_stream_async(res, exchange)
+            else:
+                await self.send_async(res, exchange)
+        finally:
+            res.release()
+        self.logger.trace("Successfully responded.")
+
+    def is_streamable(self, method: str, res: aiohttp.ClientResponse) -> bool:
+        return method.upper() != "HEAD" and res.status not in self.BODILESS_STATUS_CODES
+
+    async def send_async(self, res: aiohttp.ClientResponse, exchange: ServerWebExchange):
+        start = time.perf_counter()
+        # the body has been decompressed by the session unless it's relayed compressed
+        body = await res.read()
+        add_upstream_time(exchange, time.perf_counter() - start)
+        headers = self.response_headers(res)
+        self.modify_content_headers(headers, body)
+        exchange.response.set_body(body)
+        exchange.response.set_status_code(res.status)
+        exchange.response.set_headers(**headers)
+        exchange.response.commit()
+
+    async def send_stream_async(self, res: aiohttp.ClientResponse, exchange: ServerWebExchange):
+        """
+        The response is committed on the loop's executor, relaying the pieces read from the upstream on the loop,
+        since the servers write a streamed body to the client in a blocking manner.
+        """
+        loop = asyncio.get_running_loop()
+        headers = self.response_headers(res)
+        if self.passthrough_compressed:
+            content_length = headers.get("Content-Length")
+        else:
+            content_length = None if headers.pop("Content-Encoding", None) else headers.get("Content-Length")
+        headers.pop("Content-Length", None)
+        for header in self.HOP_BY_HOP_RESPONSE_HEADERS:
+            headers.pop(header, None)
+        chunks = self.read_chunks(res, loop)
+        exchange.response.set_body_stream(
+            self.time_upstream(chunks, exchange), int(content_length) if content_length else None
+        )
+        exchange.response.set_status_code(res.status)
+        exchange.response.set_headers(**headers)
+        await loop.run_in_executor(None, exchange.response.commit)
+
+    def read_chunks(self, res: aiohttp.ClientResponse, loop: asyncio.AbstractEventLoop) -> Iterator[bytes]:
+        while True:
+            chunk = asyncio.run_coroutine_threadsafe(res.content.read(self.buffer_size), loop).result()
+            if not chunk:
+                return
+            yield chunk
+
+    @staticmethod
+    def response_headers(res: aiohttp.ClientResponse) -> CaseInsensitiveDict:
+        """
+        Returns:
+            (CaseInsensitiveDict) the headers of the response, the repeated ones are joined like `requests` does
+        """
+        headers = CaseInsensitiveDict()
+        for key, value in res.headers.items():
+            headers[key] = f"{headers[key]}, {value}" if key in headers else value
+        return headers
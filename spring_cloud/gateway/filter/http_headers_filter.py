@@ -10,35 +10,51 @@ __license__ = "Apache 2.0"
 
 # standard library
 from enum import Enum
-from typing import Dict, List
+from typing import List, Mapping
 
 # scip plugin
-from spring_cloud.gateway.server import ServerWebExchange
+from spring_cloud.gateway.server import HttpHeaders, ServerWebExchange
 from spring_cloud.gateway.server.utils import GATEWAY_ORIGINAL_REQUEST_URL_ATTR, GATEWAY_REQUEST_URL_ATTR
 
 
 class HttpHeadersFilter(ABC):
+    """
+    The filters of the headers passed between the client and the upstream service.
+    The headers are copied once per request into a case-insensitive multimap (see HttpHeaders),
+    which every filter then modifies in place by a few lookups instead of copying and scanning the headers again.
+    """
+
     @staticmethod
-    def filter_request(filters: List[HttpHeadersFilter], exchange: ServerWebExchange) -> Dict[str, str]:
+    def filter_request(filters: List[HttpHeadersFilter], exchange: ServerWebExchange) -> HttpHeaders:
         return HttpHeadersFilter.filter_(filters, exchange.request.headers, exchange, Type.REQUEST)
 
     @staticmethod
     def filter_(
-        filters: List[HttpHeadersFilter], headers: Dict[str, str], exchange: ServerWebExchange, type: Type
-    ) -> Dict[str, str]:
-
-        response_headers = headers
+        filters: List[HttpHeadersFilter], headers: Mapping[str, str], exchange: ServerWebExchange, type: Type
+    ) -> HttpHeaders:
+        filtered_headers = HttpHeaders.copy_of(headers)
         for header_filter in filters:
             if header_filter.supports(type):
-                response_headers = header_filter.filter(response_headers, exchange)
-
-        return response_headers
+                header_filter.apply(filtered_headers, exchange)
+        return filtered_headers
 
     def supports(self, type: Type):
         return type == Type.REQUEST
 
+    def filter(self, original: Mapping[str, str], exchange: ServerWebExchange) -> HttpHeaders:
+        """
+        Returns:
+            (HttpHeaders) the filtered copy of the headers
+        """
+        headers = HttpHeaders.copy_of(original)
+        self.apply(headers, exchange)
+        return headers
+
     @abstractmethod
-    def filter(self, original: Dict[str, str], exchange: ServerWebExchange) -> Dict[str, str]:
+    def apply(self, headers: HttpHeaders, exchange: ServerWebExchange) -> None:
+        """
+        Filters the headers in place.
+        """
         raise NotImplemented
 
 
@@ -50,12 +66,10 @@ class Type(Enum):
 class ForwardedHeadersFilter(HttpHeadersFilter):
     FORWARDED_HEADER = "Forwarded"
 
-    def filter(self, original: Dict[str, str], exchange: ServerWebExchange) -> Dict[str, str]:
+    def apply(self, headers: HttpHeaders, exchange: ServerWebExchange) -> None:
         forwardeds = []
-        updated = {key: val for key, val in original.items() if key.lower() != self.FORWARDED_HEADER.lower()}
-
-        if original.get(self.FORWARDED_HEADER):
-            forwardeds.append(original.get(self.FORWARDED_HEADER))
+        if headers.get(self.FORWARDED_HEADER):
+            forwardeds.append(headers[self.FORWARDED_HEADER])
 
         forwardeds.append(f'host="{exchange.request.host}"')
         # TODO: the scheme should also be a variable
@@ -64,8 +78,7 @@ class ForwardedHeadersFilter(HttpHeadersFilter):
         if exchange.request.remote_addr:
             forwardeds.append(f'for="{exchange.request.remote_addr[0]}:{exchange.request.remote_addr[1]}"')
 
-        updated[self.FORWARDED_HEADER] = self.to_header_value(forwardeds)
-        return updated
+        headers[self.FORWARDED_HEADER] = self.to_header_value(forwardeds)
 
     def to_header_value(self, forwardeds: List[str]):
         return ";".join(forwardeds)
@@ -160,16 +173,15 @@ class XForwardedHeadersFilter(HttpHeadersFilter):
     def host_append(self, host_append: bool):
         self.__host_append = host_append
 
-    def filter(self, original: Dict[str, str], exchange: ServerWebExchange) -> Dict[str, str]:
-        updated = original.copy()
+    def apply(self, headers: HttpHeaders, exchange: ServerWebExchange) -> None:
         request = exchange.request
 
         if self.for_enabled and request.remote_addr:
             local_addr = request.local_addr
-            self.write(updated, self.X_FORWARDED_FOR_HEADER, local_addr[0], self.for_append)
+            self.write(headers, self.X_FORWARDED_FOR_HEADER, local_addr[0], self.for_append)
 
         if self.proto_enabled:
-            self.write(updated, self.X_FORWARDED_PROTO_HEADER, "http", self.proto_append)
+            self.write(headers, self.X_FORWARDED_PROTO_HEADER, "http", self.proto_append)
 
         # TODO: Implement X-Forwarded-Prefix header
         if self.prefix_enabled:
@@ -179,14 +191,12 @@ class XForwardedHeadersFilter(HttpHeadersFilter):
                 pass
 
         if self.port_enabled:
-            self.write(updated, self.X_FORWARDED_PORT_HEADER, str(request.port), self.port_append)
+            self.write(headers, self.X_FORWARDED_PORT_HEADER, str(request.port), self.port_append)
 
         if self.host_enabled:
-            self.write(updated, self.X_FORWARDED_HOST_HEADER, f"{request.host}:{request.port}", self.host_append)
-
-        return updated
+            self.write(headers, self.X_FORWARDED_HOST_HEADER, f"{request.host}:{request.port}", self.host_append)
 
-    def write(self, headers: Dict[str, str], key: str, value: str, append: bool):
+    def write(self, headers: HttpHeaders, key: str, value: str, append: bool):
         if append and headers.get(key):
             values = headers[key]
             headers[key] = f"{values},{value}"
@@ -195,24 +205,28 @@ class XForwardedHeadersFilter(HttpHeadersFilter):
 
 
 class RemoveHopByHopHeadersFilter(HttpHeadersFilter):
-    HEADERS_REMOVED_ON_REQUEST = {
-        "connection",
-        "keep-alive",
-        "transfer-encoding",
-        "te",
-        "trailer",
-        "proxy-authorization",
-        "proxy-authenticate",
-        "x-application-context",
-        "upgrade",
-    }
-
-    def filter(self, original: Dict[str, str], exchange: ServerWebExchange) -> Dict[str, str]:
-        return {
-            key: value
-            for key, value in original.items()
-            if not any(key.lower() == header.lower() for header in self.HEADERS_REMOVED_ON_REQUEST)
+    # lower-cased
+    HEADERS_REMOVED_ON_REQUEST = frozenset(
+        {
+            "connection",
+            "keep-alive",
+            "transfer-encoding",
+            "te",
+            "trailer",
+            "proxy-authorization",
+            "proxy-authenticate",
+            "x-application-context",
+            "upgrade",
         }
+    )
+
+    def apply(self, headers: HttpHeaders, exchange: ServerWebExchange) -> None:
+        # the headers listed by the Connection header are hop-by-hop as well (RFC 7230, section 6.1)
+        for connection in headers.get_all("Connection"):
+            for header in connection.split(","):
+                headers.pop(header.strip(), None)
+        for header in self.HEADERS_REMOVED_ON_REQUEST:
+            headers.pop(header, None)
 
 
 HEADER_FILTERS = [ForwardedHeadersFilter(), XForwardedHeadersFilter(), RemoveHopByHopHeadersFilter()]
@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
+from __future__ import annotations
+
 # standard library
-from typing import List, Optional
+import asyncio
+import threading
+import time
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Tuple, Union
+from weakref import WeakKeyDictionary
 
 # scip plugin
 from spring_cloud.utils import logging
@@ -9,8 +15,19 @@ __author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
 __license__ = "Apache 2.0"
 
 # scip plugin
-from spring_cloud.gateway.filter import GatewayFilter, GatewayFilterChain, GlobalFilter
-from spring_cloud.gateway.route import Route
+from spring_cloud.commons.helpers import LruCacheManager
+from spring_cloud.gateway.filter import (
+    AsyncGatewayFilter,
+    AsyncGatewayFilterChain,
+    AsyncGlobalFilter,
+    GatewayFilter,
+    GatewayFilterChain,
+    GlobalFilter,
+    OrderedGatewayFilter,
+    PhasedGatewayFilter,
+)
+from spring_cloud.gateway.handler.predicate.core import request_host
+from spring_cloud.gateway.handler.route_index import RouteIndex
 from spring_cloud.gateway.route.builder.route_locator import RouteLocator
 from spring_cloud.gateway.server import (
     GATEWAY_HANDLER_MAPPER_ATTR,
@@ -18,23 +35,106 @@ from spring_cloud.gateway.server import (
     GATEWAY_ROUTE_ATTR,
     ServerWebExchange,
 )
-from spring_cloud.utils.functional_operators import filter_get_first
+from spring_cloud.gateway.server.metrics import GatewayMetrics
+from spring_cloud.gateway.server.utils import GATEWAY_RESPONSE_CACHE_ATTR, GATEWAY_UPSTREAM_TIME_ATTR
 from spring_cloud.utils.logging import getLogger
+from spring_cloud.utils.ordered import Ordered, get_order
+
+if TYPE_CHECKING:
+    # the route package imports the predicates of this package, which initializes the handlers first
+    # scip plugin
+    from spring_cloud.gateway.route import Route
 
 
 class FilteringWebHandler:
-    def __init__(self, global_filters: List[GlobalFilter]):
+    """
+    Runs the route's filters together with the global filters, sorted by their orders (see Ordered).
+    The route's own filters which are not Ordered keep their positions (1, 2, ...),
+    and the global ones which are not Ordered come last, e.g., routing to the upstream service.
+
+    The combined filter chain of each route is sorted once and frozen into a tuple,
+    which lives as long as the route itself, i.e., until the route table is replaced.
+
+    The chains having any async filter (see AsyncGatewayFilter) are awaited on the event loop,
+    which is the server's loop if served asynchronously, otherwise a loop of this handler's own.
+    """
+
+    def __init__(self, global_filters: List[Union[GlobalFilter, AsyncGlobalFilter]]):
         self.__global_filters = self.load_filters(global_filters)
+        self.__route_filters: WeakKeyDictionary[Route, DefaultGatewayFilterChain.Filters] = WeakKeyDictionary()
+        self.__event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.__event_loop_lock = threading.Lock()
 
-    def load_filters(self, global_filters: List[GlobalFilter]):
-        return [GatewayFilterAdapter(global_filter) for global_filter in global_filters]
+    def load_filters(self, global_filters: List[Union[GlobalFilter, AsyncGlobalFilter]]) -> List[GatewayFilter]:
+        gateway_filters = []
+        for global_filter in global_filters:
+            if isinstance(global_filter, AsyncGlobalFilter):
+                gateway_filter = AsyncGatewayFilterAdapter(global_filter)
+            else:
+                gateway_filter = GatewayFilterAdapter(global_filter)
+            if isinstance(global_filter, Ordered):
+                gateway_filter = OrderedGatewayFilter(gateway_filter, global_filter.get_order())
+            gateway_filters.append(gateway_filter)
+        return gateway_filters
 
-    # TODO: gateway_filters must be sorted by order
     def handle(self, exchange: ServerWebExchange) -> None:
         route: Route = exchange.attributes[GATEWAY_ROUTE_ATTR]
-        gateway_filters = route.filters
-        gateway_filters.extend(self.__global_filters)
-        return DefaultGatewayFilterChain(gateway_filters).filter(exchange)
+        compiled_filters = self.get_compiled_filters(route)
+        if compiled_filters.asynchronous_until:
+            coroutine = DefaultAsyncGatewayFilterChain(compiled_filters).filter(exchange)
+            return asyncio.run_coroutine_threadsafe(coroutine, self.event_loop).result()
+        return compiled_filters.chains[0].filter(exchange)
+
+    def get_filters(self, route: Route) -> Tuple[GatewayFilter, ...]:
+        """
+        Returns:
+            (Tuple[GatewayFilter, ...]) the sorted filters of the route and the global filters
+        """
+        return self.get_compiled_filters(route).filters
+
+    def get_compiled_filters(self, route: Route) -> DefaultGatewayFilterChain.Filters:
+        compiled_filters = self.__route_filters.get(route)
+        if compiled_filters is None:
+            # racing requests may sort the same filters, whichever stored last wins, both are equal
+            compiled_filters = DefaultGatewayFilterChain.Filters(self.combine_filters(route.filters))
+            self.__route_filters[route] = compiled_filters
+        return compiled_filters
+
+    def combine_filters(self, route_filters: Sequence[GatewayFilter]) -> Tuple[GatewayFilter, ...]:
+        ordered_filters = [(get_order(f, position), f) for position, f in enumerate(route_filters, start=1)]
+        ordered_filters += [(get_order(f), f) for f in self.__global_filters]
+        # stable, the filters of the same order keep their positions
+        ordered_filters.sort(key=lambda ordered_filter: ordered_filter[0])
+        # the orders are no longer needed once sorted, unwrap the filters to call them directly
+        return tuple(f.delegate if isinstance(f, OrderedGatewayFilter) else f for _, f in ordered_filters)
+
+    async def handle_async(self, exchange: ServerWebExchange) -> None:
+        """
+        The asynchronous entry point of the filter chain.
+        The chain having any async filter is awaited on the running loop (see DefaultAsyncGatewayFilterChain),
+        otherwise the (blocking) filter chain runs on the event loop's executor,
+        so a slow upstream only occupies a worker thread instead of the event loop.
+        """
+        route: Route = exchange.attributes[GATEWAY_ROUTE_ATTR]
+        compiled_filters = self.get_compiled_filters(route)
+        if compiled_filters.asynchronous_until:
+            return await DefaultAsyncGatewayFilterChain(compiled_filters).filter(exchange)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.handle, exchange)
+
+    @property
+    def event_loop(self) -> asyncio.AbstractEventLoop:
+        """
+        The loop running the async filters of the synchronously handled exchanges,
+        started on its first use and kept for the whole process, e.g., to keep the upstream connections alive.
+        """
+        if self.__event_loop is None:
+            with self.__event_loop_lock:
+                if self.__event_loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name="gateway-filters-loop", daemon=True).start()
+                    self.__event_loop = loop
+        return self.__event_loop
 
 
 class GatewayFilterAdapter(GatewayFilter):
@@ -45,28 +145,156 @@ class GatewayFilterAdapter(GatewayFilter):
         return self.__delegate.filter(exchange, chain)
 
 
+class AsyncGatewayFilterAdapter(AsyncGatewayFilter):
+    def __init__(self, delegate: AsyncGlobalFilter):
+        self.__delegate = delegate
+
+    async def filter(self, exchange: ServerWebExchange, chain: AsyncGatewayFilterChain) -> None:
+        return await self.__delegate.filter(exchange, chain)
+
+
 class DefaultGatewayFilterChain(GatewayFilterChain):
-    def __init__(self, filters: List[GatewayFilter], index=None):
+    """
+    Walks the filters compiled once per route instead of a list of the filters.
+
+    The phased filters (see PhasedGatewayFilter) are run in a loop, their pre hooks in order
+    and then their post hooks in the reverse order, so they take no stack frame or chain object of their own.
+    Any other filter is called with the chain of the rest of the filters, which it calls back to continue.
+    The chains hold no state of a request, so the chain of each position is created once along with the filters.
+
+    Note that only the phased filters keep the stack depth constant: a non-phased filter calls the rest of the chain
+    from its own frame, so each of them still nests a frame or two, as the chain created per filter did.
+    """
+
+    __slots__ = ("__filters", "__index")
+
+    class Filters:
+        """
+        The filters compiled once for the chains, e.g., once per route.
+        """
+
+        __slots__ = ("filters", "phased", "asynchronous", "asynchronous_until", "chains")
+
+        def __init__(self, filters: Sequence[Union[GatewayFilter, AsyncGatewayFilter]]):
+            self.filters = tuple(filters)
+            self.phased = tuple(isinstance(f, PhasedGatewayFilter) for f in self.filters)
+            self.asynchronous = tuple(isinstance(f, AsyncGatewayFilter) for f in self.filters)
+            # the position past the last async filter, the rest from which is all sync, 0 if there's none
+            self.asynchronous_until = max(
+                (position + 1 for position, asynchronous in enumerate(self.asynchronous) if asynchronous), default=0
+            )
+            # the chain continuing from each position, the last one is the empty chain
+            self.chains = tuple(DefaultGatewayFilterChain(self, index) for index in range(len(self.filters) + 1))
+
+    def __init__(self, filters: Union[Sequence[GatewayFilter], DefaultGatewayFilterChain.Filters], index=None):
+        self.__filters = filters if isinstance(filters, DefaultGatewayFilterChain.Filters) else self.Filters(filters)
         self.__index = index or 0
-        self.__gateway_filters = filters
 
     @staticmethod
-    def create(gateway_filters: List[GatewayFilter], index: int):
+    def create(gateway_filters: Sequence[GatewayFilter], index: int):
         return DefaultGatewayFilterChain(gateway_filters, index)
 
     def filter(self, exchange: ServerWebExchange):
         """
         Traverse filters
         """
-        if self.__index < len(self.__gateway_filters):
-            gateway_filter = self.__gateway_filters[self.__index]
-            chain = self.create(self.__gateway_filters, self.__index + 1)
-            gateway_filter.filter(exchange, chain)
+        compiled_filters, start = self.__filters, self.__index
+        filters, phased = compiled_filters.filters, compiled_filters.phased
+        if start < len(filters) and not phased[start]:
+            filters[start].filter(exchange, compiled_filters.chains[start + 1])
+            return
+        index = start
+        next_exchange = exchange
+        while index < len(filters) and phased[index]:
+            next_exchange = filters[index].pre(next_exchange)
+            index += 1
+            if next_exchange is None:
+                break
+        else:
+            if index < len(filters):
+                filters[index].filter(next_exchange, compiled_filters.chains[index + 1])
+        # the post hooks of the phased filters whose pre hooks have run, see the exchange this chain was called with
+        for position in range(index - 1, start - 1, -1):
+            filters[position].post(exchange)
+
+
+class DefaultAsyncGatewayFilterChain(AsyncGatewayFilterChain):
+    """
+    Walks the filters like DefaultGatewayFilterChain on the event loop, awaiting the async filters.
+
+    The phased filters run on the loop, while any other sync filter may block (e.g., on the upstream service),
+    so it runs on the loop's executor, with the rest of the chain given as a BlockingGatewayFilterChain.
+    """
+
+    __slots__ = ("__filters", "__index")
+
+    def __init__(self, filters: DefaultGatewayFilterChain.Filters, index: int = 0):
+        self.__filters = filters
+        self.__index = index
+
+    async def filter(self, exchange: ServerWebExchange) -> None:
+        compiled_filters = self.__filters
+        filters, phased = compiled_filters.filters, compiled_filters.phased
+        start = index = self.__index
+        next_exchange = exchange
+        while index < len(filters):
+            gateway_filter = filters[index]
+            index += 1
+            if phased[index - 1]:
+                next_exchange = gateway_filter.pre(next_exchange)
+                if next_exchange is None:
+                    break
+                continue
+            if compiled_filters.asynchronous[index - 1]:
+                # the filter calls back this chain to continue from the next filter
+                self.__index = index
+                await gateway_filter.filter(next_exchange, self)
+            else:
+                loop = asyncio.get_running_loop()
+                chain = BlockingGatewayFilterChain(compiled_filters, index, loop)
+                await loop.run_in_executor(None, gateway_filter.filter, next_exchange, chain)
+            break
+        for position in range(index - 1, start - 1, -1):
+            if phased[position]:
+                filters[position].post(exchange)
+        self.__index = start
+
+
+class BlockingGatewayFilterChain(GatewayFilterChain):
+    """
+    The rest of an async filter chain called back by a sync filter off the event loop.
+    The rest runs on the calling thread once it's all sync, otherwise the thread waits for it to run on the loop.
+    """
+
+    __slots__ = ("__filters", "__index", "__loop")
+
+    def __init__(self, filters: DefaultGatewayFilterChain.Filters, index: int, loop: asyncio.AbstractEventLoop):
+        self.__filters = filters
+        self.__index = index
+        self.__loop = loop
+
+    def filter(self, exchange: ServerWebExchange) -> None:
+        if self.__index >= self.__filters.asynchronous_until:
+            return self.__filters.chains[self.__index].filter(exchange)
+        coroutine = DefaultAsyncGatewayFilterChain(self.__filters, self.__index).filter(exchange)
+        return asyncio.run_coroutine_threadsafe(coroutine, self.__loop).result()
 
 
 class RoutePredicateHandlerMapping:
-    def __init__(self, route_locator: RouteLocator):
+    def __init__(self, route_locator: RouteLocator, indexed: bool = True, cache_size: int = 0):
+        """
+        Args:
+            route_locator: the locator of the routes to look up
+            indexed: whether to index the routes by their path patterns,
+                so that a lookup only tests the routes which may match the path instead of all of them
+            cache_size: the maximum number of the (method, host, path) keys whose matched routes are cached,
+                0 to disable the cache. Only the lookups that merely tested the pure predicates are cached.
+        """
         self.__route_locator = route_locator
+        self.__indexed = indexed
+        self.route_cache: Optional[LruCacheManager] = LruCacheManager(cache_size) if cache_size > 0 else None
+        # (the routes returned by the locator, the index of them), swapped as a whole to be thread-safe
+        self.__route_index: Optional[Tuple[List[Route], RouteIndex]] = None
         self.logger = getLogger(name="spring_cloud.gateway.handler.RoutePredicateHandlerMapping")
 
     def map_route(self, route: Route, exchange: ServerWebExchange):
@@ -81,7 +309,19 @@ class RoutePredicateHandlerMapping:
         if here is no matched route, return None
         """
         routes = self.__route_locator.get_routes()
-        route = filter_get_first(lambda route: route.predicate.test(exchange), routes)
+        route_index = self.get_route_index(routes)
+        method, host = exchange.request.method.upper(), request_host(exchange.request)
+        cache_key = (method, host, exchange.request.path)
+        cached = self.route_cache.retrieve_value(cache_key) if self.route_cache is not None else None
+        # the cached route is only valid for the route table it was looked up in
+        if cached and cached[0] is route_index:
+            route = cached[1]
+        else:
+            if self.__indexed:
+                routes = route_index.candidates(exchange.request.path, method, host)
+            route, pure = self.__test_routes(routes, exchange)
+            if self.route_cache is not None and pure:
+                self.route_cache.put(cache_key, (route_index, route))
 
         if route:
             self.logger.info(f"Route matched: {route.route_id}")
@@ -90,6 +330,39 @@ class RoutePredicateHandlerMapping:
             self.logger.info(f"No route matched.")
             return None
 
+    def get_route_index(self, routes: List[Route]) -> RouteIndex:
+        """
+        The index is rebuilt whenever the route locator returns the different routes.
+        The locators usually return the same (cached) list, which is told by its identity and length at no cost,
+        otherwise the routes are compared one by one before rebuilding the index.
+        """
+        if self.__route_index is not None:
+            indexed_routes, route_index = self.__route_index
+            if routes is indexed_routes and len(routes) == len(route_index.routes):
+                return route_index
+            if tuple(routes) == route_index.routes:
+                self.__route_index = (routes, route_index)
+                return route_index
+        route_index = RouteIndex(tuple(routes))
+        self.__route_index = (routes, route_index)
+        if self.route_cache is not None:
+            self.route_cache.clear()
+        return route_index
+
+    @staticmethod
+    def __test_routes(routes: Iterable[Route], exchange: ServerWebExchange) -> Tuple[Optional[Route], bool]:
+        """
+        Returns:
+            (Tuple[Optional[Route], bool]) the first matched route,
+                and whether all the tested predicates are pure (hence the result is cacheable)
+        """
+        pure = True
+        for route in routes:
+            pure = pure and route.predicate.pure
+            if route.predicate.test(exchange):
+                return route, pure
+        return None, pure
+
     # TODO: return exchange.request information for debug
     @staticmethod
     def get_exchange_description(exchange: ServerWebExchange):
@@ -97,21 +370,59 @@ class RoutePredicateHandlerMapping:
 
 
 class DispatcherHandler:
-    def __init__(self, route_mapping: RoutePredicateHandlerMapping, filtering_web_handler: FilteringWebHandler):
+    def __init__(
+        self,
+        route_mapping: RoutePredicateHandlerMapping,
+        filtering_web_handler: FilteringWebHandler,
+        metrics: Optional[GatewayMetrics] = None,
+    ):
         self.__logger = logging.getLogger("spring_cloud.gateway.DispatcherHandler")
         self.filtering_web_handler = filtering_web_handler
         self.__route_mapping = route_mapping
+        self.metrics = metrics or GatewayMetrics()
+        route_cache = getattr(route_mapping, "route_cache", None)
+        if route_cache is not None:
+            self.metrics.track_route_cache(route_cache)
 
     def handle(self, exchange: ServerWebExchange):
         self.__logger.debug("Dispatching ...")
+        start = time.perf_counter()
         route = self.__route_mapping.lookup_route(exchange)
         self.__route_mapping.map_route(route, exchange)
         if route:
-            self.filtering_web_handler.handle(exchange)
+            self.metrics.start(route.route_id)
+            try:
+                self.filtering_web_handler.handle(exchange)
+            finally:
+                self.finish_metrics(route, exchange, start)
         else:
+            self.metrics.record_unmatched()
             self.send_not_found_response(exchange)
         self.__logger.debug("Complete dispatching.")
 
+    async def handle_async(self, exchange: ServerWebExchange):
+        self.__logger.debug("Dispatching asynchronously ...")
+        start = time.perf_counter()
+        route = self.__route_mapping.lookup_route(exchange)
+        self.__route_mapping.map_route(route, exchange)
+        if route:
+            self.metrics.start(route.route_id)
+            try:
+                await self.filtering_web_handler.handle_async(exchange)
+            finally:
+                self.finish_metrics(route, exchange, start)
+        else:
+            self.metrics.record_unmatched()
+            self.send_not_found_response(exchange)
+        self.__logger.debug("Complete dispatching.")
+
+    def finish_metrics(self, route: Route, exchange: ServerWebExchange, start: float):
+        upstream_seconds = exchange.attributes.get(GATEWAY_UPSTREAM_TIME_ATTR, 0.0)
+        response_cache_result = exchange.attributes.get(GATEWAY_RESPONSE_CACHE_ATTR)
+        self.metrics.finish(
+            route.route_id, exchange.response.status_code, start, upstream_seconds, response_cache_result
+        )
+
     @staticmethod
     def send_not_found_response(exchange):
         exchange.response.set_status_code(404)
@@ -13,6 +13,21 @@ class RoutePredicateFactory(ABC):
     def apply(self, config) -> Predicate:
         pass
 
+    @property
+    def name(self) -> str:
+        """
+        Returns:
+            (str) the name referred to by the predicate definitions, e.g., 'Path' of PathRoutePredicateFactory
+        """
+        name = type(self).__name__
+        return name[: -len("RoutePredicateFactory")] if name.endswith("RoutePredicateFactory") else name
+
+    def new_config(self, **args):
+        """
+        Creates the config from the args of the predicate definition.
+        """
+        raise NotImplementedError(f"{type(self).__name__} can't create the config from the args.")
+
 
 class AbstractRoutePredicateFactory(RoutePredicateFactory, ABC):
     pass
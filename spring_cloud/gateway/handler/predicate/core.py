@@ -4,6 +4,7 @@ from __future__ import annotations
 # standard library
 import re
 from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
 
 __author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
 __license__ = "Apache 2.0"
@@ -12,25 +13,73 @@ __license__ = "Apache 2.0"
 from spring_cloud.gateway.handler.predicate import Predicate
 from spring_cloud.gateway.handler.predicate.base import RoutePredicateFactory
 from spring_cloud.gateway.pathpattern import PathPatternParser
-from spring_cloud.gateway.server import ServerWebExchange
+from spring_cloud.gateway.server import ServerWebExchange, put_uri_template_variables
+from spring_cloud.gateway.server.headers import HttpHeaders
+from spring_cloud.gateway.server.http_request import ServerHTTPRequest
 
 
 class AfterRoutePredicateFactory(RoutePredicateFactory):
     def apply(self, config) -> Predicate:
         return AfterRoutePredicate(config)
 
+    def new_config(self, date_time) -> AfterRoutePredicate.Config:
+        # the date time is written in ISO 8601 in the definition files
+        if isinstance(date_time, str):
+            date_time = datetime.fromisoformat(date_time)
+        return AfterRoutePredicate.Config(date_time)
+
 
 class PathRoutePredicateFactory(RoutePredicateFactory):
     def apply(self, config) -> Predicate:
         return PathRoutePredicate(config)
 
+    def new_config(self, pattern) -> PathRoutePredicate.Config:
+        return PathRoutePredicate.Config(pattern)
+
 
 class CookieRoutePredicateFactory(RoutePredicateFactory):
     def apply(self, config) -> Predicate:
         return CookieRoutePredicate(config)
 
+    def new_config(self, cookie_name, cookie_regexp) -> CookieRoutePredicate.Config:
+        return CookieRoutePredicate.Config(cookie_name, cookie_regexp)
+
+
+class HostRoutePredicateFactory(RoutePredicateFactory):
+    def apply(self, config) -> Predicate:
+        return HostRoutePredicate(config)
+
+    def new_config(self, patterns) -> HostRoutePredicate.Config:
+        return HostRoutePredicate.Config([patterns] if isinstance(patterns, str) else patterns)
+
+
+class MethodRoutePredicateFactory(RoutePredicateFactory):
+    def apply(self, config) -> Predicate:
+        return MethodRoutePredicate(config)
+
+    def new_config(self, methods) -> MethodRoutePredicate.Config:
+        return MethodRoutePredicate.Config([methods] if isinstance(methods, str) else methods)
+
+
+class HeaderRoutePredicateFactory(RoutePredicateFactory):
+    def apply(self, config) -> Predicate:
+        return HeaderRoutePredicate(config)
+
+    def new_config(self, header, regexp=None) -> HeaderRoutePredicate.Config:
+        return HeaderRoutePredicate.Config(header, regexp)
+
+
+class QueryRoutePredicateFactory(RoutePredicateFactory):
+    def apply(self, config) -> Predicate:
+        return QueryRoutePredicate(config)
+
+    def new_config(self, param, regexp=None) -> QueryRoutePredicate.Config:
+        return QueryRoutePredicate.Config(param, regexp)
+
 
 class AfterRoutePredicate(Predicate):
+    cost = 5
+
     def __init__(self, config: AfterRoutePredicate.Config, now_datetime_func=None):
         self.now_datetime_func = now_datetime_func
         self.config = config
@@ -48,13 +97,24 @@ class AfterRoutePredicate(Predicate):
 
 
 class PathRoutePredicate(Predicate):
+    pure = True
+    cost = 1
+
     def __init__(self, config: PathRoutePredicate.Config):
         self.config = config
+        # compiled once when the route is built rather than on every request
+        self.path_pattern = PathPatternParser.parse(config.pattern)
+        # capturing the uri variables into the exchange is a side effect, such a lookup mustn't be cached
+        self.pure = self.side_effect_free = not self.path_pattern.variable_names
 
     def test(self, exchange: ServerWebExchange) -> bool:
-        request_path = exchange.request.path
-        path_pattern = PathPatternParser.parse(self.config.pattern)
-        return path_pattern.matches(request_path)
+        if not self.path_pattern.variable_names:
+            return self.path_pattern.matches(exchange.request.path)
+        variables = self.path_pattern.match_and_extract(exchange.request.path)
+        if variables is None:
+            return False
+        put_uri_template_variables(exchange, variables)
+        return True
 
     def __str__(self):
         return f"[Path:'{self.config.pattern}']"
@@ -65,18 +125,15 @@ class PathRoutePredicate(Predicate):
 
 
 class CookieRoutePredicate(Predicate):
+    cost = 4
+
     def __init__(self, config: CookieRoutePredicate.Config):
         self.config = config
+        self.__regex = re.compile(config.cookie_regexp)
 
     def test(self, exchange: ServerWebExchange) -> bool:
-        http_request_cookies = exchange.request.cookies
-        for key, value in http_request_cookies.items():
-            if self.__match_cookie(key, value):
-                return True
-        return False
-
-    def __match_cookie(self, key: str, value: str):
-        return self.config.cookie_name == key and re.match(self.config.cookie_regexp, value)
+        value = exchange.request.cookies.get(self.config.cookie_name)
+        return value is not None and self.__regex.match(value) is not None
 
     def __str__(self):
         return f"[Cookie:'{self.config.cookie_name}'=Regex('{self.config.cookie_regexp}')]"
@@ -85,3 +142,157 @@ class CookieRoutePredicate(Predicate):
         def __init__(self, cookie_name=None, cookie_regexp=None):
             self.cookie_name = cookie_name
             self.cookie_regexp = cookie_regexp
+
+
+class HostRoutePredicate(Predicate):
+    """
+    Matches the host name of the request (the 'Host' header without the port) against the glob patterns,
+    where '*' matches within a label and '**' matches any number of labels, e.g., '**.example.org'.
+    """
+
+    # the host is a part of the route cache key
+    pure = True
+    cost = 2
+
+    def __init__(self, config: HostRoutePredicate.Config):
+        self.config = config
+        self.__regex = re.compile("|".join(f"(?:{host_pattern_regex(p)})" for p in config.patterns), re.IGNORECASE)
+        # the index metadata: the host must end with one of the suffixes, or None if it can be anything
+        suffixes = tuple(host_pattern_suffix(pattern) for pattern in config.patterns)
+        self.host_suffixes: Optional[Tuple[str, ...]] = None if "" in suffixes else suffixes
+
+    def test(self, exchange: ServerWebExchange) -> bool:
+        return self.__regex.fullmatch(request_host(exchange.request)) is not None
+
+    def __str__(self):
+        return f"[Host:{self.config.patterns}]"
+
+    class Config:
+        def __init__(self, patterns: List[str] = None):
+            self.patterns = patterns or []
+
+
+class MethodRoutePredicate(Predicate):
+    pure = True
+    cost = 1
+
+    def __init__(self, config: MethodRoutePredicate.Config):
+        self.config = config
+        # the index metadata: the request methods which may match
+        self.methods = frozenset(method.upper() for method in config.methods)
+
+    def test(self, exchange: ServerWebExchange) -> bool:
+        return exchange.request.method.upper() in self.methods
+
+    def __str__(self):
+        return f"[Method:{sorted(self.methods)}]"
+
+    class Config:
+        def __init__(self, methods: List[str] = None):
+            self.methods = methods or []
+
+
+class HeaderRoutePredicate(Predicate):
+    """
+    Matches if any value of the header matches the regexp, or the header is present if there's no regexp.
+    """
+
+    cost = 3
+
+    def __init__(self, config: HeaderRoutePredicate.Config):
+        self.config = config
+        self.__regex = re.compile(config.regexp) if config.regexp is not None else None
+
+    def test(self, exchange: ServerWebExchange) -> bool:
+        return matches_any(self.__regex, header_values(exchange.request.headers, self.config.header))
+
+    def __str__(self):
+        return f"[Header:'{self.config.header}'=Regex('{self.config.regexp}')]"
+
+    class Config:
+        def __init__(self, header=None, regexp=None):
+            self.header = header
+            self.regexp = regexp
+
+
+class QueryRoutePredicate(Predicate):
+    """
+    Matches if any value of the query param matches the regexp, or the param is present if there's no regexp.
+    """
+
+    cost = 3
+
+    def __init__(self, config: QueryRoutePredicate.Config):
+        self.config = config
+        self.__regex = re.compile(config.regexp) if config.regexp is not None else None
+
+    def test(self, exchange: ServerWebExchange) -> bool:
+        return matches_any(self.__regex, exchange.request.query.get(self.config.param))
+
+    def __str__(self):
+        return f"[Query:'{self.config.param}'=Regex('{self.config.regexp}')]"
+
+    class Config:
+        def __init__(self, param=None, regexp=None):
+            self.param = param
+            self.regexp = regexp
+
+
+def matches_any(regex: Optional[re.Pattern], values: Optional[Iterable[str]]) -> bool:
+    if not values:
+        return False
+    return regex is None or any(regex.match(value) for value in values)
+
+
+def header_values(headers, name: str) -> List[str]:
+    if isinstance(headers, HttpHeaders):
+        return headers.get_all(name)
+    value = headers.get(name)
+    return [] if value is None else [value]
+
+
+def request_host(request: ServerHTTPRequest) -> str:
+    """
+    Returns:
+        (str) the lower-cased host name in the 'Host' header without the port, '' if absent
+    """
+    host = (request.headers.get("Host") or "").strip().lower()
+    if host.startswith("["):
+        # IPv6 literal, e.g., [::1]:8080
+        return host[: host.find("]") + 1]
+    return host.partition(":")[0]
+
+
+def host_pattern_regex(pattern: str) -> str:
+    labels = pattern.lower().split(".")
+    regex = ""
+    for i, label in enumerate(labels):
+        last = i == len(labels) - 1
+        if label == "**":
+            if not last:
+                # any number of the leading labels including none, e.g., '**.example.org' matches 'example.org'
+                regex += r"(?:[^.]+\.)*"
+            elif regex:
+                regex = regex[: -len(r"\.")] + r"(?:\.[^.]+)*"
+            else:
+                regex = ".*"
+        elif label == "*":
+            regex += "[^.]+" + ("" if last else r"\.")
+        else:
+            regex += "".join("[^.]*" if c == "*" else "[^.]" if c == "?" else re.escape(c) for c in label)
+            regex += "" if last else r"\."
+    return regex
+
+
+def host_pattern_suffix(pattern: str) -> str:
+    """
+    Returns:
+        (str) the literal labels after the last wildcard which every matched host ends with, e.g., 'example.org'
+    """
+    labels = pattern.lower().split(".")
+    literal_labels = []
+    for label in reversed(labels):
+        if "*" in label or "?" in label:
+            break
+        literal_labels.append(label)
+    return ".".join(reversed(literal_labels))
@@ -3,37 +3,81 @@
 __author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
 __license__ = "Apache 2.0"
 
+# standard library
+from abc import ABC
+from typing import Tuple
+
 from .predicate import Predicate
 
 
-class OrGatewayPredicate(Predicate):
-    def __init__(self, left: Predicate, right: Predicate):
-        self.left = left
-        self.right = right
+class CompositeGatewayPredicate(Predicate, ABC):
+    """
+    The n-ary logical operator, the operands are tested in order until the result is determined.
+    `left` and `right` view it as the binary operator, where `right` combines the rest of the operands.
+    """
+
+    def __init__(self, left: Predicate, right: Predicate, *others: Predicate):
+        self.predicates: Tuple[Predicate, ...] = (left, right, *others)
+
+    @property
+    def left(self) -> Predicate:
+        return self.predicates[0]
+
+    @property
+    def right(self) -> Predicate:
+        return self.predicates[1] if len(self.predicates) == 2 else type(self)(*self.predicates[1:])
+
+    @property
+    def pure(self) -> bool:
+        return all(predicate.pure for predicate in self.predicates)
+
+    @property
+    def side_effect_free(self) -> bool:
+        return all(predicate.side_effect_free for predicate in self.predicates)
 
+    @property
+    def cost(self) -> float:
+        return sum(predicate.cost for predicate in self.predicates)
+
+
+class OrGatewayPredicate(CompositeGatewayPredicate):
     def test(self, obj) -> bool:
-        return self.left.test(obj) or self.right.test(obj)
+        for predicate in self.predicates:
+            if predicate.test(obj):
+                return True
+        return False
 
     def __str__(self):
-        return f"({self.left} || {self.right})"
-
+        return f"({' || '.join(map(str, self.predicates))})"
 
-class AndGatewayPredicate(Predicate):
-    def __init__(self, left: Predicate, right: Predicate):
-        self.left = left
-        self.right = right
 
+class AndGatewayPredicate(CompositeGatewayPredicate):
     def test(self, obj) -> bool:
-        return self.left.test(obj) and self.right.test(obj)
+        for predicate in self.predicates:
+            if not predicate.test(obj):
+                return False
+        return True
 
     def __str__(self):
-        return f"({self.left} && {self.right})"
+        return f"({' && '.join(map(str, self.predicates))})"
 
 
 class NegateGatewayPredicate(Predicate):
     def __init__(self, p: Predicate):
         self.p = p
 
+    @property
+    def pure(self) -> bool:
+        return self.p.pure
+
+    @property
+    def side_effect_free(self) -> bool:
+        return self.p.side_effect_free
+
+    @property
+    def cost(self) -> float:
+        return self.p.cost
+
     def test(self, obj) -> bool:
         return not self.p.test(obj)
 
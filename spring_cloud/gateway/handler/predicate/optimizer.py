@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+The optimizer rewriting a predicate tree into an equivalent but cheaper one to test:
+
+1. The negations are pushed down to the leaves by De Morgan's laws, e.g., !(a && b) -> (!a || !b).
+2. The nested operators of the same kind are flattened into one n-ary operator, e.g., ((a && b) && c) -> (a && b && c).
+3. The constants are folded, e.g., (a && TRUE) -> a.
+4. The operands are sorted by their estimated costs, so that the cheap ones (e.g., Path)
+   short-circuit the expensive ones (e.g., Cookie, After).
+
+The operands with side effects (e.g., the Path capturing the uri variables) are never reordered or skipped.
+"""
+# standard library
+from typing import List
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+from .operator_gateway_predicate import AndGatewayPredicate, NegateGatewayPredicate, OrGatewayPredicate
+from .predicate import FALSE, TRUE, Predicate, StaticPredicate
+
+__all__ = ["optimize"]
+
+
+def optimize(predicate: Predicate, negated: bool = False) -> Predicate:
+    """
+    Args:
+        predicate: the predicate tree to optimize
+        negated: whether to optimize the negation of the predicate instead
+    """
+    if isinstance(predicate, NegateGatewayPredicate):
+        return optimize(predicate.p, not negated)
+    if isinstance(predicate, (AndGatewayPredicate, OrGatewayPredicate)):
+        # De Morgan's laws: the negated AND is the OR of the negated operands, and vice versa
+        conjunction = isinstance(predicate, AndGatewayPredicate) != negated
+        operator = AndGatewayPredicate if conjunction else OrGatewayPredicate
+        operands = []
+        for operand in predicate.predicates:
+            operand = optimize(operand, negated)
+            if isinstance(operand, operator):
+                operands.extend(operand.predicates)
+            else:
+                operands.append(operand)
+        return combine(conjunction, operands)
+    if isinstance(predicate, StaticPredicate):
+        return (FALSE if predicate.value else TRUE) if negated else predicate
+    return NegateGatewayPredicate(predicate) if negated else predicate
+
+
+def combine(conjunction: bool, operands: List[Predicate]) -> Predicate:
+    # TRUE is the identity of AND and FALSE absorbs it, and vice versa for OR
+    identity, absorbing = (TRUE, FALSE) if conjunction else (FALSE, TRUE)
+    operands = [operand for operand in operands if not is_static(operand, identity.value)]
+    side_effect_free = all(operand.side_effect_free for operand in operands)
+    if side_effect_free and any(is_static(operand, absorbing.value) for operand in operands):
+        return absorbing
+    if not operands:
+        return identity
+    if len(operands) == 1:
+        return operands[0]
+    if side_effect_free:
+        # stable, the operands of the same cost are tested in their defined order
+        operands.sort(key=lambda operand: operand.cost)
+    operator = AndGatewayPredicate if conjunction else OrGatewayPredicate
+    return operator(*operands)
+
+
+def is_static(predicate: Predicate, value: bool) -> bool:
+    return isinstance(predicate, StaticPredicate) and predicate.value == value
@@ -7,6 +7,14 @@ __license__ = "Apache 2.0"
 
 
 class Predicate(ABC):
+    # whether the result of test() only depends on the method, the host and the path of the request,
+    # so that it's safe to cache the result by them
+    pure = False
+    # whether test() leaves the tested object untouched, so that it's safe to reorder or skip it
+    side_effect_free = True
+    # the estimated relative cost of test(), the cheaper operands of AND/OR are tested first
+    cost = 10
+
     @abstractmethod
     def test(self, obj) -> bool:
         pass
@@ -17,6 +25,9 @@ class GatewayPredicate(Predicate, ABC):
 
 
 class StaticPredicate(Predicate):
+    pure = True
+    cost = 0
+
     def __init__(self, value: bool):
         self.value = value
 
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+"""
+The route index narrowing down the routes to test by the path of the request.
+
+The routes are indexed in a segment trie by the literal prefixes of their path patterns,
+e.g., the route with the predicate Path('/api/users/**') is kept under the node api -> users.
+Looking up a path walks down the trie along its segments and only collects the routes on the way,
+plus the routes whose predicates are not path-indexable (the fallback bucket, e.g., Cookie or Not(Path)).
+The candidates are further pruned by the methods and the host suffixes their predicates accept
+(e.g., Method('GET') or Host('**.example.org')) without being tested.
+The candidates are tested in their original positions, hence the first matched route is the same one
+a linear scan over all the routes would return.
+"""
+
+from __future__ import annotations
+
+# standard library
+from heapq import merge
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# scip plugin
+from spring_cloud.gateway.handler.predicate import Predicate
+from spring_cloud.gateway.handler.predicate.core import HostRoutePredicate, MethodRoutePredicate, PathRoutePredicate
+from spring_cloud.gateway.handler.predicate.operator_gateway_predicate import AndGatewayPredicate, OrGatewayPredicate
+
+if TYPE_CHECKING:
+    # the route package imports the predicates of this package
+    # scip plugin
+    from spring_cloud.gateway.route import Route
+
+SEPARATOR = "/"
+
+
+class RouteIndex:
+    def __init__(self, routes: Sequence[Route]):
+        self.routes = routes
+        self.__root = RouteIndex.Node()
+        # the positions of the routes that must always be tested
+        self.__fallback: List[int] = []
+        # the methods and the host suffixes each route accepts, None if any
+        self.__methods: List[Optional[FrozenSet[str]]] = [route_methods(route.predicate) for route in routes]
+        self.__host_suffixes: List[Optional[Tuple[str, ...]]] = [host_suffixes(route.predicate) for route in routes]
+        for position, route in enumerate(routes):
+            prefixes = path_prefixes(route.predicate)
+            if prefixes is None:
+                self.__fallback.append(position)
+            else:
+                for prefix in set(prefixes):
+                    self.__root.insert(prefix, position)
+
+    def candidates(self, path: str, method: Optional[str] = None, host: Optional[str] = None) -> Iterator[Route]:
+        """
+        Args:
+            method: the upper-cased method of the request, the routes are not pruned by the methods if None
+            host: the lower-cased host name of the request, the routes are not pruned by the hosts if None
+        Returns:
+            (Iterator[Route]) the routes which may match the request, in their original order
+        """
+        positions = [self.__fallback]
+        node = self.__root
+        if path.startswith(SEPARATOR):
+            for segment in path.split(SEPARATOR)[1:]:
+                if node.positions:
+                    positions.append(node.positions)
+                node = node.children.get(segment)
+                if node is None:
+                    break
+        if node is not None and node.positions:
+            positions.append(node.positions)
+
+        last_position = -1
+        for position in merge(*positions):
+            # a route indexed by several prefixes (e.g., an Or of paths) is tested only once
+            if position != last_position:
+                last_position = position
+                methods, suffixes = self.__methods[position], self.__host_suffixes[position]
+                if method is not None and methods is not None and method not in methods:
+                    continue
+                if host is not None and suffixes is not None and not host.endswith(suffixes):
+                    continue
+                yield self.routes[position]
+
+    class Node:
+        def __init__(self):
+            self.children: Dict[str, RouteIndex.Node] = {}
+            # the positions are inserted in ascending order, hence always sorted
+            self.positions: List[int] = []
+
+        def insert(self, prefix: Tuple[str, ...], position: int):
+            node = self
+            for segment in prefix:
+                node = node.children.setdefault(segment, RouteIndex.Node())
+            node.positions.append(position)
+
+
+def path_prefixes(predicate: Predicate) -> Optional[List[Tuple[str, ...]]]:
+    """
+    Returns:
+        (Optional[List[Tuple[str, ...]]]) the literal prefixes of which every path matching the predicate
+            must start with one, or None if the predicate may match the paths without any common prefix
+    """
+
+    def leaf_prefixes(leaf: Predicate):
+        if isinstance(leaf, PathRoutePredicate) and leaf.path_pattern.literal_prefix is not None:
+            return [leaf.path_pattern.literal_prefix]
+        return None
+
+    # prefer the longest prefixes
+    return index_keys(predicate, leaf_prefixes, lambda prefixes: min(map(len, prefixes), default=0))
+
+
+def route_methods(predicate: Predicate) -> Optional[FrozenSet[str]]:
+    """
+    Returns:
+        (Optional[FrozenSet[str]]) the methods of the requests which may match the predicate, or None if any
+    """
+
+    def leaf_methods(leaf: Predicate):
+        return list(leaf.methods) if isinstance(leaf, MethodRoutePredicate) else None
+
+    # prefer the fewest methods
+    methods = index_keys(predicate, leaf_methods, lambda methods: -len(methods))
+    return None if methods is None else frozenset(methods)
+
+
+def host_suffixes(predicate: Predicate) -> Optional[Tuple[str, ...]]:
+    """
+    Returns:
+        (Optional[Tuple[str, ...]]) the suffixes of which the host of every request matching the predicate
+            must end with one, or None if the predicate may match any host
+    """
+
+    def leaf_suffixes(leaf: Predicate):
+        if isinstance(leaf, HostRoutePredicate) and leaf.host_suffixes is not None:
+            return list(leaf.host_suffixes)
+        return None
+
+    # prefer the longest suffixes
+    suffixes = index_keys(predicate, leaf_suffixes, lambda suffixes: min(map(len, suffixes), default=0))
+    return None if suffixes is None else tuple(suffixes)
+
+
+def index_keys(
+    predicate: Predicate, leaf_keys: Callable[[Predicate], Optional[list]], specificity: Callable
+) -> Optional[list]:
+    """
+    Args:
+        leaf_keys: the keys of a leaf predicate of which any matched request has one, or None if unconstrained
+        specificity: the key function of the keys to choose for an AND, the higher the more specific
+    Returns:
+        (Optional[list]) the keys of which any request matching the predicate has one, or None if unconstrained
+    """
+    if isinstance(predicate, AndGatewayPredicate):
+        # all the operands must be satisfied, any operand's keys will do, prefer the most specific ones
+        candidates = [keys for keys in (index_keys(p, leaf_keys, specificity) for p in predicate.predicates) if keys]
+        return max(candidates, key=specificity, default=None)
+    if isinstance(predicate, OrGatewayPredicate):
+        keys = []
+        for operand in predicate.predicates:
+            operand_keys = index_keys(operand, leaf_keys, specificity)
+            if operand_keys is None:
+                return None
+            keys += operand_keys
+        return keys
+    return leaf_keys(predicate)
@@ -1,7 +1,7 @@
 # -*- coding: utf-8 -*-
 # standard library
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, Tuple
 
 __author__ = "Waterball (johnny850807@gmail.com)"
 __license__ = "Apache 2.0"
@@ -10,6 +10,9 @@ __all__ = ["PathElement"]
 
 
 class PathElement(ABC):
+    # the names of the uri variables the element captures
+    variable_names: Tuple[str, ...] = ()
+
     def __init__(self, pos: int, separator):
         self.pos = pos
         self.separator = separator
@@ -25,5 +28,14 @@ class PathElement(ABC):
     def text(self) -> str:
         raise NotImplemented
 
+    @property
+    @abstractmethod
+    def regex(self) -> str:
+        """
+        Returns:
+            (str) the regular expression matching what the element matches
+        """
+        raise NotImplemented
+
     def has_no_next_element(self) -> bool:
         return self.next is None
@@ -2,13 +2,26 @@
 """
 The expression elements
 """
+# standard library
+import re
+from typing import Optional, Tuple
+
 from ..pattern import MatchingContext, PathContainer
 from .base import PathElement
 
 __author__ = "Waterball (johnny850807@gmail.com)"
 __license__ = "Apache 2.0"
 
-__all__ = ["LiteralPathElement", "SeparatorPathElement", "WildcardTheRestPathElement"]
+__all__ = [
+    "LiteralPathElement",
+    "SeparatorPathElement",
+    "WildcardTheRestPathElement",
+    "SegmentPathElement",
+    "WildcardPathElement",
+    "CaptureVariablePathElement",
+    "RegexPathElement",
+    "CaptureTheRestPathElement",
+]
 
 
 class LiteralPathElement(PathElement):
@@ -34,6 +47,10 @@ class LiteralPathElement(PathElement):
     def text(self) -> str:
         return self.literal_text
 
+    @property
+    def regex(self) -> str:
+        return re.escape(self.literal_text)
+
 
 class SeparatorPathElement(PathElement):
     def __init__(self, pos: int, separator):
@@ -51,6 +68,10 @@ class SeparatorPathElement(PathElement):
     def text(self) -> str:
         return self.separator
 
+    @property
+    def regex(self) -> str:
+        return re.escape(self.separator)
+
 
 class WildcardTheRestPathElement(PathElement):
     def __init__(self, pos: int, separator):
@@ -63,3 +84,118 @@ class WildcardTheRestPathElement(PathElement):
     @property
     def text(self) -> str:
         return self.separator + "**"
+
+    @property
+    def regex(self) -> str:
+        # nothing more, or anything starting with the separator
+        return f"(?:{re.escape(self.separator)}.*)?"
+
+
+class SegmentPathElement(PathElement):
+    """
+    The element matching a whole path segment by its regular expression.
+    """
+
+    def __init__(self, pos: int, separator):
+        super().__init__(pos, separator)
+        self.__segment_regex = None
+
+    def matches(self, path_index: int, context: MatchingContext) -> bool:
+        if path_index >= context.path_length:
+            return False
+        element = context.get_element(path_index)
+        if not isinstance(element, PathContainer.PathSegment) or not self.matches_segment(element.text):
+            return False
+        if self.has_no_next_element():
+            return path_index + 1 == context.path_length
+        else:
+            return self.next.matches(path_index + 1, context)
+
+    def matches_segment(self, segment: str) -> bool:
+        if self.__segment_regex is None:
+            self.__segment_regex = re.compile(self.regex, re.DOTALL)
+        return self.__segment_regex.fullmatch(segment) is not None
+
+    def segment_characters(self) -> str:
+        """
+        Returns:
+            (str) the regular expression of a character within a segment
+        """
+        return f"[^{re.escape(self.separator)}]"
+
+
+class WildcardPathElement(SegmentPathElement):
+    """
+    The '*' segment, matching any non-empty segment.
+    """
+
+    @property
+    def text(self) -> str:
+        return "*"
+
+    @property
+    def regex(self) -> str:
+        return f"{self.segment_characters()}+"
+
+
+class CaptureVariablePathElement(SegmentPathElement):
+    """
+    The '{name}' or '{name:regex}' segment, capturing the segment as the uri variable.
+    """
+
+    def __init__(self, pos: int, variable_name: str, constraint: Optional[str], separator):
+        super().__init__(pos, separator)
+        self.variable_name = variable_name
+        self.constraint = constraint
+        self.variable_names = (variable_name,)
+
+    @property
+    def text(self) -> str:
+        return f"{{{self.variable_name}}}" if self.constraint is None else f"{{{self.variable_name}:{self.constraint}}}"
+
+    @property
+    def regex(self) -> str:
+        constraint = f"{self.segment_characters()}+" if self.constraint is None else f"(?:{self.constraint})"
+        return f"(?P<{self.variable_name}>{constraint})"
+
+
+class RegexPathElement(SegmentPathElement):
+    """
+    The segment mixing the literals, '*' and the uri variables, e.g., '*.json' or '{name}.{extension}'.
+    """
+
+    def __init__(self, pos: int, segment_text: str, segment_regex: str, variable_names: Tuple[str, ...], separator):
+        super().__init__(pos, separator)
+        self.segment_text = segment_text
+        self.segment_regex = segment_regex
+        self.variable_names = variable_names
+
+    @property
+    def text(self) -> str:
+        return self.segment_text
+
+    @property
+    def regex(self) -> str:
+        return self.segment_regex
+
+
+class CaptureTheRestPathElement(PathElement):
+    """
+    The trailing '/{*name}', matching the rest of the path as '/**' does and capturing it (with the leading separator).
+    """
+
+    def __init__(self, pos: int, variable_name: str, separator):
+        super().__init__(pos, separator)
+        self.variable_name = variable_name
+        self.variable_names = (variable_name,)
+
+    def matches(self, path_index: int, context: MatchingContext) -> bool:
+        return path_index >= context.path_length or context.is_separator(path_index)
+
+    @property
+    def text(self) -> str:
+        return f"{self.separator}{{*{self.variable_name}}}"
+
+    @property
+    def regex(self) -> str:
+        return f"(?P<{self.variable_name}>(?:{re.escape(self.separator)}.*)?)"
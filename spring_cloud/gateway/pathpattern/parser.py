@@ -4,16 +4,30 @@ Parser that applies interpreter pattern.
 
 Reference: https://github.com/spring-projects/spring-framework/blob/8ac39a50feda71194e33a456c0f8207169a5a3a9/spring-web/src/main/java/org/springframework/web/util/pattern/InternalPathPatternParser.java#L300
 """
+# standard library
+import re
+import threading
+from typing import Dict, List, Optional
+
 # scip plugin
 from spring_cloud.utils.validate import not_none
 
-from .elements import LiteralPathElement, PathElement, SeparatorPathElement, WildcardTheRestPathElement
+from .elements import (
+    CaptureTheRestPathElement,
+    CaptureVariablePathElement,
+    LiteralPathElement,
+    PathElement,
+    RegexPathElement,
+    SeparatorPathElement,
+    WildcardPathElement,
+    WildcardTheRestPathElement,
+)
 from .pattern import PathPattern
 
 __author__ = "Waterball (johnny850807@gmail.com)"
 __license__ = "Apache 2.0"
 
-__all__ = ["PathPatternParser"]
+__all__ = ["PathPatternParser", "PatternParserException"]
 
 SEPARATOR = "/"
 
@@ -23,9 +37,34 @@ class PatternParserException(Exception):
 
 
 class PathPatternParser:
+    """
+    The parsed patterns are interned, so that the identical patterns share one compiled PathPattern
+    and a pattern is only parsed once no matter how many routes use it.
+    The PathPattern is never mutated after being parsed, hence sharing it across threads is safe.
+    """
+
+    # the patterns come from the route definitions, the limit only guards against the unbounded growth
+    # when the patterns are parsed from the untrusted inputs
+    MAX_CACHED_PATTERNS = 4096
+
+    __cache: Dict[str, PathPattern] = {}
+    __lock = threading.Lock()
+
     @staticmethod
     def parse(path_pattern: str) -> PathPattern:
-        return InternalPathPatternParser().parse(path_pattern)
+        cache = PathPatternParser.__cache
+        pattern = cache.get(path_pattern)
+        if pattern is None:
+            pattern = InternalPathPatternParser().parse(path_pattern)
+            with PathPatternParser.__lock:
+                if len(cache) < PathPatternParser.MAX_CACHED_PATTERNS:
+                    pattern = cache.setdefault(path_pattern, pattern)
+        return pattern
+
+    @staticmethod
+    def clear_cache():
+        with PathPatternParser.__lock:
+            PathPatternParser.__cache.clear()
 
 
 class InternalPathPatternParser:
@@ -34,6 +73,16 @@ class InternalPathPatternParser:
         ^
     The algorithm that parses tha pattern into the abstract syntax tree (though in our case,
         it's barely a linked-list rather than a tree)
+
+    The grammar:
+        /               the separator
+        api             the literal segment
+        *               any non-empty segment
+        {name}          any non-empty segment, captured as the uri variable 'name'
+        {name:[a-z]+}   the segment matching the regex, captured as the uri variable 'name'
+        *.{extension}   the segment mixing the above
+        /**             the rest of the path (only at the end)
+        /{*rest}        the rest of the path captured as the uri variable 'rest' (only at the end)
     """
 
     def __init__(self):
@@ -43,6 +92,8 @@ class InternalPathPatternParser:
         self.path_element_start = -1
         self.head_path_element: PathElement = None
         self.current_path_element: PathElement = None
+        self.brace_depth = 0
+        self.variable_names: List[str] = []
 
     def parse(self, path_pattern: str) -> PathPattern:
         self.path_pattern = not_none(path_pattern)
@@ -52,12 +103,13 @@ class InternalPathPatternParser:
         while self.pos < len(self.path_pattern):
             self.__parse_next_character()
 
-        # handle the final literal (no trailing separator)
+        if self.brace_depth:
+            raise PatternParserException(f"Missing the closing '}}' in the pattern '{self.path_pattern}'")
+
+        # handle the final segment (no trailing separator)
         # e.g., `/api/users`, the `users` part is handled here
         if self.path_element_start != -1:
-            self.__push_path_element(
-                LiteralPathElement(self.path_element_start, self.__extract_path_element_text(), self.separator)
-            )
+            self.__push_path_element(self.__create_segment_element())
 
         return PathPattern(path_pattern, self.separator, self.head_path_element)
 
@@ -67,19 +119,29 @@ class InternalPathPatternParser:
     def __parse_next_character(self):
         ch = self.path_pattern[self.pos]
 
-        if ch == self.separator:
+        # the separators within the braces belong to the regex of the uri variable
+        if ch == self.separator and not self.brace_depth:
             if self.path_element_start != -1:
-                # handle the literal followed by a separator
+                # handle the segment followed by a separator
                 # e.g., `api/`, `api` will be extracted here
-                self.__push_path_element(
-                    LiteralPathElement(self.path_element_start, self.__extract_path_element_text(), self.separator)
-                )
+                self.__push_path_element(self.__create_segment_element())
+            rest_variable_name = self.peek_capture_the_rest()
             if self.peek_double_wildcard():  # peek '/**'
                 self.__push_path_element(WildcardTheRestPathElement(self.pos, self.separator))
                 self.pos += 2
+            elif rest_variable_name:  # peek '/{*rest}'
+                self.__add_variable_name(rest_variable_name)
+                self.__push_path_element(CaptureTheRestPathElement(self.pos, rest_variable_name, self.separator))
+                self.pos = len(self.path_pattern) - 1
             else:
                 self.__push_path_element(SeparatorPathElement(self.pos, self.separator))
         else:
+            if ch == "{":
+                self.brace_depth += 1
+            elif ch == "}":
+                if not self.brace_depth:
+                    raise PatternParserException(f"Unexpected '}}' at {self.pos} in the pattern '{self.path_pattern}'")
+                self.brace_depth -= 1
             if self.path_element_start == -1:
                 self.path_element_start = self.pos
 
@@ -99,6 +161,83 @@ class InternalPathPatternParser:
     def __extract_path_element_text(self):
         return self.path_pattern[self.path_element_start : self.pos]
 
+    def __create_segment_element(self) -> PathElement:
+        pos, text = self.path_element_start, self.__extract_path_element_text()
+        if "{*" in text:
+            raise PatternParserException(f"'{{*...}}' must follow a separator at the end of '{self.path_pattern}'")
+        if "{" not in text and "*" not in text:
+            return LiteralPathElement(pos, text, self.separator)
+        if text == "*":
+            return WildcardPathElement(pos, self.separator)
+        if "**" in text:
+            raise PatternParserException(f"'**' is only allowed as '/**' at the end of '{self.path_pattern}'")
+        # the whole segment being a single uri variable, e.g., '{name}' or '{name:[a-z]+}'
+        if text.startswith("{") and self.__find_closing_brace(text, 0) == len(text) - 1:
+            variable_name, _, constraint = text[1:-1].partition(":")
+            self.__add_variable_name(variable_name)
+            return CaptureVariablePathElement(pos, variable_name, self.__validate_regex(constraint), self.separator)
+        return self.__create_regex_element(pos, text)
+
+    def __create_regex_element(self, pos: int, text: str) -> RegexPathElement:
+        segment_characters = f"[^{re.escape(self.separator)}]"
+        fragments, variable_names = [], []
+        i = 0
+        while i < len(text):
+            if text[i] == "*":
+                fragments.append(f"{segment_characters}*")
+                i += 1
+            elif text[i] == "{":
+                end = self.__find_closing_brace(text, i)
+                variable_name, _, constraint = text[i + 1 : end].partition(":")
+                self.__add_variable_name(variable_name)
+                variable_names.append(variable_name)
+                constraint = self.__validate_regex(constraint) or f"{segment_characters}+"
+                fragments.append(f"(?P<{variable_name}>(?:{constraint}))")
+                i = end + 1
+            else:
+                fragments.append(re.escape(text[i]))
+                i += 1
+        return RegexPathElement(pos, text, "".join(fragments), tuple(variable_names), self.separator)
+
+    @staticmethod
+    def __find_closing_brace(text: str, start: int) -> int:
+        depth = 0
+        for i in range(start, len(text)):
+            if text[i] == "{":
+                depth += 1
+            elif text[i] == "}":
+                depth -= 1
+                if not depth:
+                    return i
+        raise PatternParserException(f"Missing the closing '}}' in '{text}'")
+
+    def __add_variable_name(self, variable_name: str):
+        if not variable_name.isidentifier():
+            raise PatternParserException(f"Invalid uri variable name '{variable_name}' in '{self.path_pattern}'")
+        if variable_name in self.variable_names:
+            raise PatternParserException(f"Duplicate uri variable name '{variable_name}' in '{self.path_pattern}'")
+        self.variable_names.append(variable_name)
+
+    def __validate_regex(self, regex: Optional[str]) -> Optional[str]:
+        if regex:
+            try:
+                re.compile(regex)
+            except re.error as err:
+                raise PatternParserException(f"Invalid regex '{regex}' in '{self.path_pattern}': {err}")
+        return regex or None
+
+    def peek_capture_the_rest(self) -> Optional[str]:
+        """
+        Returns:
+            (Optional[str]) the variable name if the following characters are '/{*name}', otherwise None
+        """
+        rest = self.path_pattern[self.pos + 1 :]
+        if not rest.startswith("{*"):
+            return None
+        if not rest.endswith("}") or self.separator in rest:
+            raise PatternParserException(f"No more pattern data allowed after '{{*...}}' in '{self.path_pattern}'")
+        return rest[2:-1]
+
     def peek_double_wildcard(self):
         """
         Returns:
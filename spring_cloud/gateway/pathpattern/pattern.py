@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 # standard library
+import re
 from abc import ABC
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 # scip plugin
 import spring_cloud.utils.validate as validate
@@ -74,17 +75,85 @@ class MatchingContext:
 
 
 class PathPattern:
+    """
+    The element chain is compiled into a single regular expression, matching a path
+    with it scans the string once without building the PathContainer and the MatchingContext per request,
+    and captures the uri variables in the same pass.
+    The element chain is still walked when a PathContainer is given.
+    """
+
     def __init__(self, path_pattern: str, separator, head_path_element: PathElement):
         self.head = head_path_element
         self.separator = separator
         self.path_pattern = path_pattern
+        self.regex = re.compile(self.__compile_regex(head_path_element), re.DOTALL)
+        self.variable_names: Tuple[str, ...] = self.__collect_variable_names(head_path_element)
+        # the variables except '{*rest}' must not span the segments, even if their custom regexes allow
+        self.__segment_variable_names = self.__collect_variable_names(head_path_element, segment_only=True)
+
+    @staticmethod
+    def __compile_regex(head_path_element: Optional[PathElement]) -> str:
+        fragments = []
+        element = head_path_element
+        while element:
+            fragments.append(element.regex)
+            element = element.next
+        return "".join(fragments)
+
+    @staticmethod
+    def __collect_variable_names(head_path_element: Optional[PathElement], segment_only=False) -> Tuple[str, ...]:
+        # the elements are imported here to avoid the circular import between the pattern and the elements
+        from .elements import SegmentPathElement
+
+        variable_names = []
+        element = head_path_element
+        while element:
+            if not segment_only or isinstance(element, SegmentPathElement):
+                variable_names.extend(element.variable_names)
+            element = element.next
+        return tuple(variable_names)
+
+    @property
+    def literal_prefix(self) -> Optional[Tuple[str, ...]]:
+        """
+        Returns:
+            (Optional[Tuple[str, ...]]) the leading literal segments every matched path starts with,
+                e.g., ('api', 'users') of '/api/users/**', or None if the pattern doesn't start with the separator
+        """
+        # the elements are imported here to avoid the circular import between the pattern and the elements
+        from .elements import LiteralPathElement, SeparatorPathElement
+
+        if not isinstance(self.head, SeparatorPathElement):
+            return None
+        segments = []
+        element = self.head
+        while isinstance(element, SeparatorPathElement) and isinstance(element.next, LiteralPathElement):
+            segments.append(element.next.text)
+            element = element.next.next
+        return tuple(segments)
 
     def matches(self, path: str = None, path_container: Optional[PathContainer] = None):
         if path_container:
             return self.__matches_path_container(path_container)
         else:
             validate.not_none(path)
-            return self.matches(path_container=PathContainer.from_path(path, self.separator))
+            if self.variable_names:
+                return self.match_and_extract(path) is not None
+            return self.regex.fullmatch(path) is not None
+
+    def match_and_extract(self, path: str) -> Optional[Dict[str, str]]:
+        """
+        Returns:
+            (Optional[Dict[str, str]]) the uri variables captured from the path, or None if the path doesn't match
+        """
+        match = self.regex.fullmatch(path)
+        if match is None:
+            return None
+        variables = match.groupdict()
+        for name in self.__segment_variable_names:
+            if self.separator in variables[name]:
+                return None
+        return variables
 
     def __matches_path_container(self, path_container: PathContainer):
         if not self.head:
@@ -2,16 +2,22 @@
 from __future__ import annotations
 
 # standard library
+import threading
 from abc import ABC, abstractmethod
-from typing import List
+from typing import TYPE_CHECKING, List, Sequence, Tuple
 
 __author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
 __license__ = "Apache 2.0"
 
 # scip plugin
 from spring_cloud.commons.helpers import CacheManager
-from spring_cloud.gateway.route import Route
 from spring_cloud.utils.functional_operators import flat_map
+from spring_cloud.utils.logging import getLogger
+
+if TYPE_CHECKING:
+    # the route package imports the handlers which depend on the route locators
+    # scip plugin
+    from spring_cloud.gateway.route import Route
 
 
 class RouteLocator(ABC):
@@ -50,6 +56,51 @@ class CachingRouteLocator(RouteLocator):
     def get_routes(self) -> List[Route]:
         return self.__cache_manager.get(self.CACHE_NAME).on_cache_miss(lambda: self.delegate.get_routes())
 
+    def evict(self):
+        self.__cache_manager.evict(self.CACHE_NAME)
+
+    def refresh(self) -> List[Route]:
+        """
+        Reloads the routes from the delegate into the cache.
+        """
+        self.evict()
+        return self.get_routes()
+
+
+class RefreshableRouteLocator(RouteLocator):
+    """
+    Serves an immutable snapshot (tuple) of the delegate's routes, which is replaced as a whole on refresh.
+
+    get_routes() takes no lock, it reads a single attribute which is swapped atomically,
+    so the in-flight requests keep using the table they got while a new one is being compiled.
+    If the refresh fails (e.g., a malformed route file), the current table is kept.
+    """
+
+    def __init__(self, delegate: RouteLocator):
+        self.delegate = delegate
+        self.logger = getLogger("spring_cloud.gateway.route.RefreshableRouteLocator")
+        # serializes the refreshes, the readers never take it
+        self.__refresh_lock = threading.Lock()
+        self.__routes: Tuple[Route, ...] = tuple(delegate.get_routes())
+
+    def get_routes(self) -> Sequence[Route]:
+        return self.__routes
+
+    def refresh(self) -> bool:
+        """
+        Returns:
+            (bool) whether the routes have been replaced
+        """
+        with self.__refresh_lock:
+            try:
+                routes = tuple(self.delegate.get_routes())
+            except Exception as err:
+                self.logger.error(f"Failed to refresh the routes, keep the current {len(self.__routes)} routes: {err}")
+                return False
+            self.__routes = routes
+        self.logger.info(f"Refreshed the routes, {len(routes)} routes in total.")
+        return True
+
 
 class RouteLocatorBuilder:
     def routes(self) -> RouteLocatorBuilder.Builder:
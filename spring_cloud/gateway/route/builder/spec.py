@@ -19,9 +19,17 @@ from spring_cloud.gateway.filter import GatewayFilter
 from spring_cloud.gateway.filter.factory.core import (
     AddRequestHeaderGatewayFilterFactory,
     AddResponseHeaderGatewayFilterFactory,
+    LocalResponseCacheGatewayFilter,
+    LocalResponseCacheGatewayFilterFactory,
     NameValueConfig,
     PrefixPathGatewayFilter,
     PrefixPathGatewayFilterFactory,
+    RequestRateLimiterGatewayFilter,
+    RequestRateLimiterGatewayFilterFactory,
+    ResponseCompressionGatewayFilter,
+    ResponseCompressionGatewayFilterFactory,
+    SetPathGatewayFilter,
+    SetPathGatewayFilterFactory,
 )
 from spring_cloud.gateway.handler.predicate import NOT, Predicate
 from spring_cloud.gateway.handler.predicate.core import (
@@ -29,8 +37,16 @@ from spring_cloud.gateway.handler.predicate.core import (
     AfterRoutePredicateFactory,
     CookieRoutePredicate,
     CookieRoutePredicateFactory,
+    HeaderRoutePredicate,
+    HeaderRoutePredicateFactory,
+    HostRoutePredicate,
+    HostRoutePredicateFactory,
+    MethodRoutePredicate,
+    MethodRoutePredicateFactory,
     PathRoutePredicate,
     PathRoutePredicateFactory,
+    QueryRoutePredicate,
+    QueryRoutePredicateFactory,
 )
 from spring_cloud.gateway.route import Route
 from spring_cloud.gateway.route.builder.route_locator import RouteLocatorBuilder
@@ -105,6 +121,54 @@ class PredicateSpec(UriSpec):
         config = CookieRoutePredicate.Config(name, value)
         return self.predicate(CookieRoutePredicateFactory().apply(config))
 
+    def host(self, *patterns: str) -> BooleanSpec:
+        """
+        A predicate that checks if the host of the request matches any of the given glob patterns.
+        Args:
+            patterns: the host patterns, '*' matches within a label and '**' matches any labels, e.g., '**.example.org'
+
+        Returns: return a BooleanSpec to be used to add logical operators
+        """
+        config = HostRoutePredicate.Config(list(patterns))
+        return self.predicate(HostRoutePredicateFactory().apply(config))
+
+    def method(self, *methods: str) -> BooleanSpec:
+        """
+        A predicate that checks if the method of the request is any of the given methods.
+        Args:
+            methods: the http methods, e.g., 'GET'
+
+        Returns: return a BooleanSpec to be used to add logical operators
+        """
+        config = MethodRoutePredicate.Config(list(methods))
+        return self.predicate(MethodRoutePredicateFactory().apply(config))
+
+    def header(self, header: str, regexp: str = None) -> BooleanSpec:
+        """
+        A predicate that checks if a header of the request matches a given regular expression.
+        Args:
+            header: the name of the header
+            regexp: the values of the header will be evaluated against this regular expression,
+                the header only has to be present if None
+
+        Returns: return a BooleanSpec to be used to add logical operators
+        """
+        config = HeaderRoutePredicate.Config(header, regexp)
+        return self.predicate(HeaderRoutePredicateFactory().apply(config))
+
+    def query(self, param: str, regexp: str = None) -> BooleanSpec:
+        """
+        A predicate that checks if a query param of the request matches a given regular expression.
+        Args:
+            param: the name of the query param
+            regexp: the values of the param will be evaluated against this regular expression,
+                the param only has to be present if None
+
+        Returns: return a BooleanSpec to be used to add logical operators
+        """
+        config = QueryRoutePredicate.Config(param, regexp)
+        return self.predicate(QueryRoutePredicateFactory().apply(config))
+
 
 class Operator(Enum):
     AND = "AND"
@@ -228,6 +292,66 @@ class GatewayFilterSpec(UriSpec):
         config = PrefixPathGatewayFilter.Config(prefix)
         return self.filter(PrefixPathGatewayFilterFactory().apply(config))
 
+    def set_path(self, template: str) -> GatewayFilterSpec:
+        """
+        Sets the path of the request with the uri variables captured by the Path predicate.
+        Args:
+            template: the path template, e.g., '/{segment}' for the predicate Path('/api/{segment}')
+
+        Returns: a GatewayFilterSpec that can be used to apply additional filters
+        """
+        config = SetPathGatewayFilter.Config(template)
+        return self.filter(SetPathGatewayFilterFactory().apply(config))
+
+    def compress_response(self, min_size: int = 1024, level: int = 6) -> GatewayFilterSpec:
+        """
+        Compresses the response with gzip or deflate, whichever the client accepts.
+        Args:
+            min_size: the minimum size in bytes of the response body to compress
+            level: the compression level, from 1 (fastest) to 9 (smallest)
+
+        Returns: a GatewayFilterSpec that can be used to apply additional filters
+        """
+        config = ResponseCompressionGatewayFilter.Config(min_size=min_size, level=level)
+        return self.filter(ResponseCompressionGatewayFilterFactory().apply(config))
+
+    def request_rate_limiter(
+        self,
+        replenish_rate: float,
+        burst_capacity: float = None,
+        key_resolver: str = "remote_addr",
+        header: str = None,
+    ) -> GatewayFilterSpec:
+        """
+        Rejects the requests beyond the rate of their keys with 429.
+        Args:
+            replenish_rate: the steady requests per second of a key
+            burst_capacity: the requests of a burst, default to the rate
+            key_resolver: the key of a request, one of 'remote_addr', 'header' and 'route'
+            header: the name of the header if the key is resolved from a header
+
+        Returns: a GatewayFilterSpec that can be used to apply additional filters
+        """
+        config = RequestRateLimiterGatewayFilter.Config(
+            replenish_rate, burst_capacity, key_resolver=key_resolver, header=header
+        )
+        return self.filter(RequestRateLimiterGatewayFilterFactory().apply(config))
+
+    def local_response_cache(
+        self, max_bytes: int = 64 * 1024 * 1024, time_to_live: float = 60, vary_headers: List[str] = (),
+    ) -> GatewayFilterSpec:
+        """
+        Serves the GET requests from the responses cached in memory.
+        Args:
+            max_bytes: the memory budget of the cached responses
+            time_to_live: the seconds to cache the responses without a Cache-Control max-age
+            vary_headers: the request headers whose values key the responses too
+
+        Returns: a GatewayFilterSpec that can be used to apply additional filters
+        """
+        config = LocalResponseCacheGatewayFilter.Config(max_bytes, time_to_live, tuple(vary_headers))
+        return self.filter(LocalResponseCacheGatewayFilterFactory().apply(config))
+
 
 class RouteSpec:
     def __init__(self, builder: RouteLocatorBuilder.Builder):
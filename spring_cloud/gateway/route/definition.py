@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 # standard library
+import json
+import os
 import uuid
 from abc import ABC, abstractmethod
 from typing import List
@@ -84,3 +86,91 @@ class CachingRouteDefinitionLocator(RouteDefinitionLocator):
     @property
     def route_definitions(self) -> List[RouteDefinition]:
         return self.__cache_manager.get(self.CACHE_NAME).on_cache_miss(lambda: self.delegate.route_definitions)
+
+    def evict(self):
+        self.__cache_manager.evict(self.CACHE_NAME)
+
+    def refresh(self) -> List[RouteDefinition]:
+        """
+        Reloads the definitions from the delegate into the cache.
+        """
+        self.evict()
+        return self.route_definitions
+
+
+class FileRouteDefinitionLocator(RouteDefinitionLocator):
+    """
+    Loads the route definitions from a JSON or YAML file on every access,
+    wrap it with a caching or refreshable locator to load it only when needed.
+
+    The file format:
+        routes:
+          - id: users
+            uri: http://users-service
+            order: 0
+            predicates:
+              - name: Path
+                args: {pattern: /api/users/**}
+            filters:
+              - name: PrefixPath
+                args: {prefix: /v1}
+            metadata: {team: cats}
+
+    Loading a YAML file requires PyYAML, which is installed with the 'yaml' extra,
+    e.g., pip install spring_cloud[yaml].
+    """
+
+    YAML_EXTENSIONS = (".yml", ".yaml")
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @property
+    def route_definitions(self) -> List[RouteDefinition]:
+        with open(self.path, encoding="utf-8") as file:
+            content = file.read()
+        if os.path.splitext(self.path)[1].lower() in self.YAML_EXTENSIONS:
+            try:
+                # pypi/conda library
+                import yaml
+            except ImportError:
+                raise ImportError(
+                    "PyYAML is required to load the routes from a YAML file, install the 'yaml' extra "
+                    "or use a JSON file instead."
+                )
+            document = yaml.safe_load(content)
+        else:
+            document = json.loads(content)
+        return self.parse(document)
+
+    @staticmethod
+    def parse(document) -> List[RouteDefinition]:
+        """
+        Args:
+            document: the parsed file, either a list of the routes or a mapping with the key 'routes'
+        """
+        routes = (document or {}).get("routes") if isinstance(document, dict) else document
+        if not isinstance(routes, list):
+            raise ValueError("The routes must be a list.")
+        definitions = []
+        for i, route in enumerate(routes):
+            if not isinstance(route, dict) or not route.get("uri"):
+                raise ValueError(f"The route #{i} must be a mapping with the 'uri'.")
+            predicates = [parse_definition(PredicateDefinition, p) for p in route.get("predicates") or []]
+            filters = [parse_definition(FilterDefinition, f) for f in route.get("filters") or []]
+            metadata = route.get("metadata") or {}
+            definitions.append(
+                RouteDefinition(route.get("id"), predicates, filters, route["uri"], route.get("order", 0), **metadata)
+            )
+        return definitions
+
+
+def parse_definition(definition_class, definition):
+    """
+    Args:
+        definition_class: PredicateDefinition or FilterDefinition
+        definition: the mapping of the 'name' and the 'args'
+    """
+    if not isinstance(definition, dict) or not definition.get("name"):
+        raise ValueError(f"The predicate or filter must be a mapping with the 'name': {definition}")
+    return definition_class(definition["name"], **(definition.get("args") or {}))
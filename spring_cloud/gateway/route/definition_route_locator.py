@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+"""
+The route locator compiling the route definitions (e.g., loaded from a route file) into the routes.
+
+The predicates and the filters are created by the factories registered under their names,
+e.g., the definition {name: Path, args: {pattern: /api/**}} is created by PathRoutePredicateFactory.
+The definitions of the identical names and args share one compiled predicate or filter,
+also across the compiles, so that refreshing thousands of mostly unchanged routes is cheap.
+The stateful filters (e.g., the rate limiters) are never shared between the routes,
+but an unchanged route keeps its own ones (and their state) across the compiles.
+"""
+# standard library
+import hashlib
+import json
+import threading
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# scip plugin
+from spring_cloud.gateway.filter import GatewayFilter
+from spring_cloud.gateway.filter.factory.base import GatewayFilterFactory
+from spring_cloud.gateway.filter.factory.core import (
+    AddRequestHeaderGatewayFilterFactory,
+    AddResponseHeaderGatewayFilterFactory,
+    LocalResponseCacheGatewayFilterFactory,
+    PrefixPathGatewayFilterFactory,
+    RequestRateLimiterGatewayFilterFactory,
+    ResponseCompressionGatewayFilterFactory,
+    SetPathGatewayFilterFactory,
+)
+from spring_cloud.gateway.handler.predicate import AND, TRUE, Predicate
+from spring_cloud.gateway.handler.predicate.base import RoutePredicateFactory
+from spring_cloud.gateway.handler.predicate.core import (
+    AfterRoutePredicateFactory,
+    CookieRoutePredicateFactory,
+    HeaderRoutePredicateFactory,
+    HostRoutePredicateFactory,
+    MethodRoutePredicateFactory,
+    PathRoutePredicateFactory,
+    QueryRoutePredicateFactory,
+)
+from spring_cloud.gateway.route import Route
+from spring_cloud.gateway.route.builder.route_locator import RouteLocator
+from spring_cloud.gateway.route.definition import (
+    FilterDefinition,
+    PredicateDefinition,
+    RouteDefinition,
+    RouteDefinitionLocator,
+)
+
+
+def default_predicate_factories() -> List[RoutePredicateFactory]:
+    return [
+        AfterRoutePredicateFactory(),
+        PathRoutePredicateFactory(),
+        CookieRoutePredicateFactory(),
+        HostRoutePredicateFactory(),
+        MethodRoutePredicateFactory(),
+        HeaderRoutePredicateFactory(),
+        QueryRoutePredicateFactory(),
+    ]
+
+
+def default_filter_factories() -> List[GatewayFilterFactory]:
+    return [
+        AddRequestHeaderGatewayFilterFactory(),
+        AddResponseHeaderGatewayFilterFactory(),
+        PrefixPathGatewayFilterFactory(),
+        SetPathGatewayFilterFactory(),
+        ResponseCompressionGatewayFilterFactory(),
+        RequestRateLimiterGatewayFilterFactory(),
+        LocalResponseCacheGatewayFilterFactory(),
+    ]
+
+
+class RouteDefinitionRouteLocator(RouteLocator):
+    def __init__(
+        self,
+        route_definition_locator: RouteDefinitionLocator,
+        predicate_factories: Optional[Iterable[RoutePredicateFactory]] = None,
+        filter_factories: Optional[Iterable[GatewayFilterFactory]] = None,
+    ):
+        """
+        Args:
+            predicate_factories: the factories of the predicates, default to all the built-in ones
+            filter_factories: the factories of the filters, default to all the built-in ones
+        """
+        self.route_definition_locator = route_definition_locator
+        self.predicate_factories: Dict[str, RoutePredicateFactory] = {
+            factory.name: factory for factory in predicate_factories or default_predicate_factories()
+        }
+        self.filter_factories: Dict[str, GatewayFilterFactory] = {
+            factory.name: factory for factory in filter_factories or default_filter_factories()
+        }
+        # the predicates and filters compiled by the last compile, keyed by their names and args
+        self.__compiled: Dict[Tuple[str, Hashable], object] = {}
+        self.__compile_lock = threading.Lock()
+
+    def get_routes(self) -> List[Route]:
+        definitions = self.route_definition_locator.route_definitions
+        with self.__compile_lock:
+            previous, compiled = self.__compiled, {}
+            routes = [
+                self.__compile_route(i, definition, previous, compiled) for i, definition in enumerate(definitions)
+            ]
+            # only keep what the current definitions refer to, the removed ones are released
+            self.__compiled = compiled
+        return routes
+
+    def __compile_route(self, position: int, definition: RouteDefinition, previous: dict, compiled: dict) -> Route:
+        content_key = definition_key(definition)
+        # the id of a definition without one is stable across the compiles, as long as it's unchanged
+        route_id = definition.id or f"route-{position}-{hashlib.sha1(content_key.encode()).hexdigest()[:12]}"
+        predicate = TRUE
+        for predicate_definition in definition.predicates:
+            operand = self.__compile_predicate(predicate_definition, previous, compiled)
+            predicate = operand if predicate is TRUE else AND(predicate, operand)
+
+        builder = (
+            Route.Builder()
+            .set_route_id(route_id)
+            .set_uri(definition.uri)
+            .set_order(definition.order)
+            .set_predicate(predicate)
+        )
+        for i, filter_definition in enumerate(definition.filters):
+            builder.filter(self.__compile_filter(filter_definition, (route_id, content_key, i), previous, compiled))
+        for meta_key, meta_value in definition.metadata.items():
+            builder.set_metadata(meta_key, meta_value)
+        return builder.build()
+
+    def __compile_predicate(self, definition: PredicateDefinition, previous: dict, compiled: dict) -> Predicate:
+        factory = self.__find_factory(self.predicate_factories, "predicate", definition.name)
+        return memoize(
+            ("predicate", definition.name, args_key(definition.args)),
+            lambda: factory.apply(factory.new_config(**definition.args)),
+            previous,
+            compiled,
+        )
+
+    def __compile_filter(
+        self, definition: FilterDefinition, route_key: tuple, previous: dict, compiled: dict
+    ) -> GatewayFilter:
+        """
+        Args:
+            route_key: the route id, the route definition key and the position of the filter in the route
+        """
+        factory = self.__find_factory(self.filter_factories, "filter", definition.name)
+        if not factory.shareable:
+            # the stateful filters (e.g., counting the requests) are never shared between the routes,
+            # only the same filter of the unchanged route gets the one of the last compile
+            return memoize(
+                ("stateful filter", route_key),
+                lambda: factory.apply(factory.new_config(**definition.args)),
+                previous,
+                compiled,
+            )
+        return memoize(
+            ("filter", definition.name, args_key(definition.args)),
+            lambda: factory.apply(factory.new_config(**definition.args)),
+            previous,
+            compiled,
+        )
+
+    @staticmethod
+    def __find_factory(factories: dict, kind: str, name: str):
+        factory = factories.get(name)
+        if factory is None:
+            raise ValueError(f"Unknown {kind} '{name}', expected one of {sorted(factories)}.")
+        return factory
+
+
+def args_key(args: dict) -> str:
+    """
+    Returns:
+        (str) the canonical form of the args, the same for the equal args regardless of their order
+    """
+    return json.dumps(args, sort_keys=True, default=str)
+
+
+def definition_key(definition: RouteDefinition) -> str:
+    """
+    Returns:
+        (str) the canonical form of the route definition except its id, the same for the equal definitions
+    """
+    return json.dumps(
+        [
+            definition.uri,
+            definition.order,
+            [[predicate.name, predicate.args] for predicate in definition.predicates],
+            [[gateway_filter.name, gateway_filter.args] for gateway_filter in definition.filters],
+            definition.metadata,
+        ],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def memoize(key, create, previous: dict, compiled: dict):
+    value = compiled.get(key)
+    if value is None:
+        value = previous.get(key)
+        if value is None:
+            value = create()
+        compiled[key] = value
+    return value
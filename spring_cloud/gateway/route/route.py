@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 # standard library
-from typing import List
+from typing import List, Tuple
 
 __author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
 __license__ = "Apache 2.0"
@@ -10,11 +10,12 @@ __license__ = "Apache 2.0"
 # scip plugin
 from spring_cloud.gateway.filter import GatewayFilter
 from spring_cloud.gateway.handler.predicate import AND, NOT, OR, Predicate
+from spring_cloud.gateway.handler.predicate.optimizer import optimize
 from spring_cloud.utils.validate import not_none
 
 
 class Route:
-    def __init__(self, route_id: int, uri: str, order: int, predicate: Predicate, gateway_filters: [], metadata: {}):
+    def __init__(self, route_id: int, uri: str, order: int, predicate: Predicate, gateway_filters: Tuple, metadata: {}):
         self.__route_id = route_id
         self.__uri = uri
         self.__order = order
@@ -39,7 +40,7 @@ class Route:
         return self.__predicate
 
     @property
-    def filters(self) -> []:
+    def filters(self) -> Tuple[GatewayFilter, ...]:
         return self.__gateway_filters
 
     @property
@@ -66,7 +67,7 @@ class Route:
             self.__order = None
 
         def filters(self, gateway_filters: List) -> Route.Builder:
-            self.__gateway_filters.extends(gateway_filters)
+            self.__gateway_filters.extend(gateway_filters)
             return self
 
         def filter(self, gateway_filter: GatewayFilter) -> Route.Builder:
@@ -113,6 +114,7 @@ class Route:
             not_none(self.__route_id)
             not_none(self.__uri)
             not_none(self.__predicate)
-            return Route(
-                self.__route_id, self.__uri, self.__order, self.__predicate, self.__gateway_filters, self.__metadata
-            )
+            # the predicate tree is optimized once here rather than tested as it's built by the specs
+            predicate = optimize(self.__predicate)
+            gateway_filters = tuple(self.__gateway_filters)
+            return Route(self.__route_id, self.__uri, self.__order, predicate, gateway_filters, self.__metadata)
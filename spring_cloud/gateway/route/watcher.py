@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+from __future__ import annotations
+
+# standard library
+import os
+import threading
+from typing import Callable, Optional, Tuple
+
+__author__ = "Waterball (johnny850807@gmail.com)"
+__license__ = "Apache 2.0"
+
+# scip plugin
+from spring_cloud.utils.logging import getLogger
+
+
+class FileWatcher:
+    """
+    Polls the modification time (and size) of a file in a daemon thread,
+    and calls back whenever it changes.
+
+    Usage:
+        watcher = FileWatcher("routes.json", route_locator.refresh).start()
+        ...
+        watcher.stop()
+    """
+
+    def __init__(self, path: str, on_change: Callable[[], object], interval: float = 1.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.logger = getLogger("spring_cloud.gateway.route.FileWatcher")
+        self.__stopped = threading.Event()
+        self.__thread: Optional[threading.Thread] = None
+        self.__last_stat = self.__stat()
+
+    def start(self) -> FileWatcher:
+        self.__thread = threading.Thread(target=self.__watch, name=f"file-watcher-{self.path}", daemon=True)
+        self.__thread.start()
+        return self
+
+    def stop(self):
+        self.__stopped.set()
+        if self.__thread:
+            self.__thread.join()
+
+    def check(self) -> bool:
+        """
+        Returns:
+            (bool) whether the file has changed since the last check, the callback has been called if so
+        """
+        stat = self.__stat()
+        if stat is None or stat == self.__last_stat:
+            return False
+        self.__last_stat = stat
+        self.logger.info(f"{self.path} has changed.")
+        self.on_change()
+        return True
+
+    def __watch(self):
+        while not self.__stopped.wait(self.interval):
+            try:
+                self.check()
+            except Exception as err:
+                self.logger.error(f"Failed to handle the change of {self.path}: {err}")
+
+    def __stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            # the file may be missing for a moment while it's being replaced
+            return None
+        return stat.st_mtime_ns, stat.st_size
@@ -1,4 +1,5 @@
 # -*- coding: utf-8 -*-
+from .headers import HttpHeaders, OverlayHttpHeaders
 from .http_request import DefaultServerHttpRequest, ServerHTTPRequest, StaticServerHttpRequest
 from .server import DefaultServerWebExchange, ServerHTTPResponse, ServerWebExchange
 from .utils import (
@@ -7,4 +8,7 @@ from .utils import (
     GATEWAY_PREDICATE_ROUTE_ATTR,
     GATEWAY_REQUEST_URL_ATTR,
     GATEWAY_ROUTE_ATTR,
+    GATEWAY_URI_TEMPLATE_VARIABLES_ATTR,
+    get_uri_template_variables,
+    put_uri_template_variables,
 )
@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+"""
+An asyncio-native HTTP/1.1 server for the api gateway.
+
+Every client connection is served by a coroutine, so idle or slow connections only cost
+a suspended coroutine instead of blocking the whole server.
+"""
+# standard library
+import asyncio
+import io
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from http.client import HTTPMessage, parse_headers
+from typing import Iterable, List, Optional, Tuple
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# scip plugin
+from spring_cloud.gateway.handler import DispatcherHandler
+from spring_cloud.gateway.server.http_request import DefaultServerHttpRequest
+from spring_cloud.gateway.server.metrics import PROMETHEUS_CONTENT_TYPE
+from spring_cloud.gateway.server.server import (
+    LAST_CHUNK,
+    DefaultServerWebExchange,
+    HttpResponseHandler,
+    ServerHTTPResponse,
+    encode_chunk,
+)
+from spring_cloud.gateway.server.utils import GATEWAY_HEALTH_CHECK_PATH, GATEWAY_METRICS_PATH
+from spring_cloud.gateway.server.writer import encode_response_head
+from spring_cloud.utils import logging
+
+logger = logging.getLogger("spring_cloud.gateway.AsyncHTTPServer")
+
+MAX_HEADERS = 100
+SERVER_VERSION = "AsyncHTTPServer"
+
+
+class BadRequestError(Exception):
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def parse_http_version(version: str) -> Tuple[int, int]:
+    """
+    Returns:
+        (Tuple[int, int]) the major and minor numbers of the version, e.g., (1, 1) of 'HTTP/1.1'
+    """
+    major, _, minor = version[len("HTTP/") :].partition(".")
+    if not version.startswith("HTTP/") or not major.isdigit() or not minor.isdigit():
+        raise BadRequestError(f"Bad http version {version!r}")
+    return int(major), int(minor)
+
+
+class AsyncHttpResponseHandler(HttpResponseHandler):
+    """
+    Collects the response written by ServerHTTPResponse and flushes it into the connection
+    once the exchange has been handled, so that the filter chain never touches the transport directly.
+
+    A streamed body is the exception: it's written to the connection piece by piece from the executor thread,
+    waiting for the transport to drain, so at most one piece per connection is held in memory.
+    """
+
+    def __init__(
+        self,
+        request_version: str = "HTTP/1.1",
+        writer: Optional[asyncio.StreamWriter] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        self.__request_version = request_version
+        self.__writer = writer
+        self.__loop = loop
+        self.__status_code = None
+        self.__headers: List[Tuple[str, str]] = []
+        self.__body = []
+        self.__flushed = False
+        self.close_connection = False
+
+    @property
+    def committed(self) -> bool:
+        return self.__status_code is not None
+
+    @property
+    def chunked_encoding_supported(self) -> bool:
+        return parse_http_version(self.__request_version) >= (1, 1)
+
+    def send_status_code(self, status_code: int):
+        self.__status_code = status_code
+
+    def send_header(self, key: str, value: str):
+        if key.lower() == "connection":
+            # the connection header is decided by the server
+            self.close_connection = self.close_connection or value.lower() == "close"
+            return
+        self.__headers.append((key, value))
+
+    def end_headers(self):
+        pass
+
+    def send_body(self, body: bytes):
+        if body:
+            self.__body.append(body)
+
+    def send_body_stream(self, chunks: Iterable[bytes], chunked: bool):
+        if self.__writer is None:
+            super().send_body_stream(chunks, chunked)
+            return
+        self.__write(self.__head_bytes(has_body_framing=True))
+        self.__flushed = True
+        for chunk in chunks:
+            if chunk:
+                self.__write(encode_chunk(chunk) if chunked else chunk)
+        if chunked:
+            self.__write(LAST_CHUNK)
+
+    def __write(self, data: bytes):
+        # called from the executor thread, the event loop owns the transport
+        asyncio.run_coroutine_threadsafe(self.__drain_write(data), self.__loop).result()
+
+    async def __drain_write(self, data: bytes):
+        self.__writer.write(data)
+        await self.__writer.drain()
+
+    def __head_bytes(self, has_body_framing: bool) -> bytes:
+        headers = [("Server", SERVER_VERSION), ("Date", formatdate(usegmt=True))]
+        for key, value in self.__headers:
+            has_body_framing = has_body_framing or key.lower() in ("content-length", "transfer-encoding")
+            headers.append((key, value))
+        if not has_body_framing:
+            headers.append(("Content-Length", str(sum(len(body) for body in self.__body))))
+        if self.close_connection:
+            headers.append(("Connection", "close"))
+        return encode_response_head(self.__status_code, headers)
+
+    def to_buffers(self) -> List[bytes]:
+        """
+        Returns:
+            (List[bytes]) the part of the response that hasn't been flushed
+        """
+        if self.__flushed:
+            return list(self.__body)
+        return [self.__head_bytes(has_body_framing=False), *self.__body]
+
+
+class AsyncHTTPServer:
+    """
+    A drop-in replacement of `http.server.HTTPServer` (serve_forever / server_close) backed by asyncio.
+
+    The route lookup runs on the event loop, while the filter chain is entered through
+    `DispatcherHandler.handle_async`, so a slow upstream never stalls the other connections.
+    """
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        dispatcher_handler: DispatcherHandler,
+        keep_alive_timeout: Optional[float] = 15,
+        max_keep_alive_requests: Optional[int] = 100,
+        max_workers: Optional[int] = 256,
+        backlog: Optional[int] = 1024,
+        reuse_port: Optional[bool] = False,
+    ):
+        self.server_address = server_address
+        self.__dispatcher_handler = dispatcher_handler
+        self.__keep_alive_timeout = keep_alive_timeout
+        self.__max_keep_alive_requests = max_keep_alive_requests
+        self.__max_workers = max_workers
+        self.__backlog = backlog
+        self.__reuse_port = reuse_port
+        self.__server: Optional[asyncio.AbstractServer] = None
+        self.__loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def serve_forever(self):
+        asyncio.run(self.serve())
+
+    async def serve(self):
+        self.__loop = asyncio.get_running_loop()
+        # the blocking filter chains are executed on this executor
+        self.__loop.set_default_executor(ThreadPoolExecutor(max_workers=self.__max_workers))
+        host, port = self.server_address
+        self.__server = await asyncio.start_server(
+            self._handle_connection,
+            host,
+            port,
+            backlog=self.__backlog,
+            reuse_address=True,
+            reuse_port=self.__reuse_port or None,
+        )
+        self.server_address = self.__server.sockets[0].getsockname()[:2]
+        logger.debug(f"Serving asynchronously at {self.server_address}")
+        async with self.__server:
+            try:
+                await self.__server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    def shutdown(self):
+        if self.__loop and self.__server:
+            self.__loop.call_soon_threadsafe(self.__server.close)
+
+    def server_close(self):
+        if self.__server:
+            self.__server.close()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            keep_alive = True
+            handled_requests = 0
+            while keep_alive:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.__keep_alive_timeout)
+                except asyncio.TimeoutError:
+                    break
+                except ValueError:
+                    # the line exceeds the limit of the stream
+                    raise BadRequestError("Request line too long")
+                if not request_line:
+                    break
+                if request_line in (b"\r\n", b"\n"):
+                    continue
+                handled_requests += 1
+                is_last_request = bool(self.__max_keep_alive_requests) and (
+                    handled_requests >= self.__max_keep_alive_requests
+                )
+                keep_alive = await self._handle_request(request_line, reader, writer, is_last_request)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except BadRequestError as err:
+            logger.debug(f"Bad request: {err}")
+            handler = AsyncHttpResponseHandler()
+            handler.send_status_code(err.status_code)
+            handler.close_connection = True
+            writer.writelines(handler.to_buffers())
+        finally:
+            writer.close()
+
+    async def _handle_request(
+        self,
+        request_line: bytes,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        is_last_request: Optional[bool] = False,
+    ) -> bool:
+        """
+        Returns:
+            (bool) whether the connection should be kept alive
+        """
+        method, path, version = self.parse_request_line(request_line)
+        headers = await self.read_headers(reader)
+        body = await self.read_body(headers, reader)
+
+        response_handler = AsyncHttpResponseHandler(version, writer, asyncio.get_running_loop())
+        response_handler.close_connection = is_last_request or not self.is_keep_alive(version, headers)
+
+        http_request = DefaultServerHttpRequest(
+            headers, path, self, method, io.BytesIO(body), writer.get_extra_info("socket")
+        )
+        if http_request.path == GATEWAY_HEALTH_CHECK_PATH:
+            self._respond_health_check(response_handler)
+        elif http_request.path == GATEWAY_METRICS_PATH:
+            self._respond_metrics(response_handler)
+        else:
+            logger.trace(f"Handling request: {http_request}.")
+            exchange = DefaultServerWebExchange(http_request, ServerHTTPResponse(response_handler))
+            try:
+                await self.__dispatcher_handler.handle_async(exchange)
+            except Exception as err:
+                logger.error(f"Error occurred while handling the request: {err}")
+                if not response_handler.committed:
+                    response_handler = AsyncHttpResponseHandler(version)
+                    response_handler.send_status_code(500)
+                response_handler.close_connection = True
+
+        writer.writelines(response_handler.to_buffers())
+        await writer.drain()
+        return not response_handler.close_connection
+
+    @staticmethod
+    def parse_request_line(request_line: bytes) -> Tuple[str, str, str]:
+        words = request_line.decode("iso-8859-1").rstrip("\r\n").split()
+        if len(words) != 3 or not words[2].startswith("HTTP/"):
+            raise BadRequestError(f"Bad request line {request_line!r}")
+        parse_http_version(words[2])
+        return words[0], words[1], words[2]
+
+    @staticmethod
+    async def read_headers(reader: asyncio.StreamReader) -> HTTPMessage:
+        lines = []
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # the line exceeds the limit of the stream
+                raise BadRequestError("Header line too long", 431)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            lines.append(line)
+            if len(lines) > MAX_HEADERS:
+                raise BadRequestError("Too many headers", 431)
+        return parse_headers(io.BytesIO(b"".join(lines) + b"\r\n"))
+
+    @staticmethod
+    async def read_body(headers: HTTPMessage, reader: asyncio.StreamReader) -> bytes:
+        if "chunked" in headers.get("Transfer-Encoding", "").lower():
+            chunks = []
+            while True:
+                size_line = b""
+                try:
+                    size_line = await reader.readline()
+                    size = int(size_line.split(b";")[0].strip(), 16)
+                except ValueError:
+                    raise BadRequestError(f"Bad chunk size {size_line!r}")
+                if size == 0:
+                    # skip the trailers
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            body = b"".join(chunks)
+            # the body has been de-chunked, present it to the filters as a sized body
+            del headers["Transfer-Encoding"]
+            headers["Content-Length"] = str(len(body))
+            return body
+        content_length = headers.get("Content-Length")
+        if content_length:
+            try:
+                return await reader.readexactly(int(content_length))
+            except ValueError:
+                raise BadRequestError(f"Bad Content-Length {content_length!r}")
+        return b""
+
+    @staticmethod
+    def is_keep_alive(version: str, headers: HTTPMessage) -> bool:
+        connection = headers.get("Connection", "").lower()
+        if connection == "close":
+            return False
+        return parse_http_version(version) >= (1, 1)
+
+    @staticmethod
+    def _respond_health_check(response_handler: AsyncHttpResponseHandler):
+        message = b"The Api Gateway is ready."
+        response_handler.write_response(200, [("Content-Length", str(len(message)))], message)
+
+    def _respond_metrics(self, response_handler: AsyncHttpResponseHandler):
+        message = self.__dispatcher_handler.metrics.render().encode()
+        headers = [("Content-Length", str(len(message))), ("Content-Type", PROMETHEUS_CONTENT_TYPE)]
+        response_handler.write_response(200, headers, message)
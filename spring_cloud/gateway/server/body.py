@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+The streaming request body.
+"""
+from __future__ import annotations
+
+# standard library
+import io
+from typing import BinaryIO, Iterator, Optional
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+class BodyFormatError(Exception):
+    pass
+
+
+class RequestBodyStream:
+    """
+    A read-once, file-like view of a request body, which reads from the client connection on demand.
+
+    Both the fixed-length (Content-Length) and the chunked transfer-encoding bodies are supported,
+    the chunked framing is decoded while reading.
+    Iterating the stream yields the body piece by piece, so it can be piped to the upstream
+    in constant memory (e.g., `requests` takes it as `data`, the `len` attribute tells it the Content-Length).
+    """
+
+    def __init__(
+        self,
+        rfile: BinaryIO,
+        content_length: Optional[int] = 0,
+        chunked: Optional[bool] = False,
+        chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE,
+    ):
+        self.__rfile = rfile
+        self.__content_length = None if chunked else (content_length or 0)
+        self.__chunked = chunked
+        self.__chunk_size = chunk_size
+        # the remaining bytes of the body (fixed-length) or of the current chunk (chunked)
+        self.__remaining = 0 if chunked else self.__content_length
+        self.__eof = not chunked and self.__remaining == 0
+
+    @staticmethod
+    def of(body: bytes) -> RequestBodyStream:
+        return RequestBodyStream(io.BytesIO(body), len(body))
+
+    @property
+    def len(self) -> Optional[int]:
+        """
+        The length of the body (the remaining part), None if it's unknown in advance (chunked).
+        """
+        return None if self.__chunked else self.__remaining
+
+    @property
+    def content_length(self) -> Optional[int]:
+        return self.__content_length
+
+    @property
+    def chunked(self) -> bool:
+        return self.__chunked
+
+    @property
+    def has_body(self) -> bool:
+        return self.__chunked or bool(self.__content_length)
+
+    @property
+    def exhausted(self) -> bool:
+        return self.__eof
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return b"".join(iter(self))
+        if self.__eof or size == 0:
+            return b""
+        if self.__chunked and self.__remaining == 0:
+            self.__next_chunk()
+            if self.__eof:
+                return b""
+        data = self.__rfile.read(min(size, self.__remaining))
+        if not data:
+            raise BodyFormatError("The connection is closed before the whole body is read.")
+        self.__remaining -= len(data)
+        if self.__remaining == 0:
+            if self.__chunked:
+                self.__rfile.readline()  # the CRLF after the chunk data
+            else:
+                self.__eof = True
+        return data
+
+    def __next_chunk(self):
+        size_line = self.__rfile.readline()
+        try:
+            size = int(size_line.split(b";")[0].strip(), 16)
+        except ValueError:
+            size = -1
+        if size < 0:
+            raise BodyFormatError(f"Bad chunk size {size_line!r}")
+        if size == 0:
+            # skip the trailers
+            while self.__rfile.readline() not in (b"\r\n", b"\n", b""):
+                pass
+            self.__eof = True
+        self.__remaining = size
+
+    def __iter__(self) -> Iterator[bytes]:
+        while True:
+            data = self.read(self.__chunk_size)
+            if not data:
+                return
+            yield data
+
+    def discard(self, limit: Optional[int] = DEFAULT_CHUNK_SIZE) -> bool:
+        """
+        Skip the rest of the body, so that the next request on the same persistent connection
+        starts at the right position.
+        Returns:
+            (bool) whether the body has been fully skipped within the limit,
+                if not, the connection can't be reused.
+        """
+        skipped = 0
+        while not self.__eof:
+            if skipped > limit:
+                return False
+            skipped += len(self.read(self.__chunk_size))
+        return True
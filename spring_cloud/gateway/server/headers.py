@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+"""
+The case-insensitive, multi-value http headers.
+"""
+from __future__ import annotations
+
+# standard library
+from typing import Dict, Iterable, Iterator, List, Mapping, MutableMapping, Optional, Tuple, Union
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+
+class HttpHeaders(MutableMapping[str, str]):
+    """
+    The http headers looked up case-insensitively, the name first seen keeps its case.
+
+    A header may occur several times (e.g., 'Accept', 'X-Forwarded-For'),
+    `headers[name]` joins all of its values as RFC 7230 allows, while `get_all(name)` lists them.
+    """
+
+    __slots__ = ("__values",)
+
+    def __init__(self, headers: Union[Mapping[str, str], Iterable[Tuple[str, str]], None] = None):
+        # lower-cased name -> (name, values)
+        self.__values: Dict[str, Tuple[str, List[str]]] = {}
+        if headers is not None:
+            for key, value in headers.items() if isinstance(headers, Mapping) else headers:
+                self.add(key, value)
+
+    @staticmethod
+    def copy_of(headers: Mapping[str, str]) -> HttpHeaders:
+        """
+        Returns:
+            (HttpHeaders) a mutable copy of the headers, keeping every value of the repeated ones
+        """
+        if isinstance(headers, HttpHeaders):
+            return headers.copy()
+        if isinstance(headers, OverlayHttpHeaders):
+            return HttpHeaders((name, value) for name in headers for value in headers.get_all(name))
+        return HttpHeaders(headers)
+
+    def add(self, key: str, value: str):
+        entry = self.__values.get(key.lower())
+        if entry:
+            entry[1].append(value)
+        else:
+            self.__values[key.lower()] = (key, [value])
+
+    def get_all(self, key: str) -> List[str]:
+        entry = self.__values.get(key.lower())
+        return list(entry[1]) if entry else []
+
+    def name_of(self, key: str) -> Optional[str]:
+        """
+        Returns:
+            (Optional[str]) the name of the header in its original case
+        """
+        entry = self.__values.get(key.lower())
+        return entry and entry[0]
+
+    def __getitem__(self, key: str) -> str:
+        name, values = self.__values[key.lower()]
+        return self.join_values(name, values)
+
+    @staticmethod
+    def join_values(name: str, values: List[str]) -> str:
+        if len(values) == 1:
+            return values[0]
+        return ("; " if name.lower() == "cookie" else ", ").join(values)
+
+    def __setitem__(self, key: str, value: str):
+        entry = self.__values.get(key.lower())
+        self.__values[key.lower()] = (entry[0] if entry else key, [value])
+
+    def __delitem__(self, key: str):
+        del self.__values[key.lower()]
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and key.lower() in self.__values
+
+    def __iter__(self) -> Iterator[str]:
+        return (name for name, _ in self.__values.values())
+
+    def __len__(self) -> int:
+        return len(self.__values)
+
+    def copy(self) -> HttpHeaders:
+        headers = HttpHeaders()
+        for key, (name, values) in self.__values.items():
+            headers.__values[key] = (name, list(values))
+        return headers
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class OverlayHttpHeaders(MutableMapping[str, str]):
+    """
+    The headers layering the changes over the original headers without copying them (copy-on-write),
+    so that mutating a request costs the number of changed headers instead of the number of all headers.
+
+    An overlay of an overlay is flattened onto the same original headers,
+    hence the lookups stay flat in cost no matter how many filters have mutated the request.
+    """
+
+    __slots__ = ("__base", "__changes")
+
+    def __init__(self, base: HttpHeaders, changes: Optional[Dict[str, Optional[Tuple[str, List[str]]]]] = None):
+        self.__base = base
+        # lower-cased name -> (name, values), or None if the header has been deleted
+        self.__changes = changes or {}
+
+    @staticmethod
+    def overlay(headers: Mapping[str, str]) -> OverlayHttpHeaders:
+        if isinstance(headers, OverlayHttpHeaders):
+            changes = {key: entry and (entry[0], list(entry[1])) for key, entry in headers.__changes.items()}
+            return OverlayHttpHeaders(headers.__base, changes)
+        if not isinstance(headers, HttpHeaders):
+            headers = HttpHeaders(headers)
+        return OverlayHttpHeaders(headers)
+
+    def add(self, key: str, value: str):
+        name = self.name_of(key) or key
+        self.__changes[key.lower()] = (name, self.get_all(key) + [value])
+
+    def get_all(self, key: str) -> List[str]:
+        if key.lower() in self.__changes:
+            entry = self.__changes[key.lower()]
+            return list(entry[1]) if entry else []
+        return self.__base.get_all(key)
+
+    def name_of(self, key: str) -> Optional[str]:
+        if key.lower() in self.__changes:
+            entry = self.__changes[key.lower()]
+            return entry and entry[0]
+        return self.__base.name_of(key)
+
+    def __getitem__(self, key: str) -> str:
+        if key.lower() in self.__changes:
+            entry = self.__changes[key.lower()]
+            if entry is None:
+                raise KeyError(key)
+            return HttpHeaders.join_values(*entry)
+        return self.__base[key]
+
+    def __setitem__(self, key: str, value: str):
+        name = self.name_of(key) or key
+        self.__changes[key.lower()] = (name, [value])
+
+    def __delitem__(self, key: str):
+        if key not in self:
+            raise KeyError(key)
+        self.__changes[key.lower()] = None
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        if key.lower() in self.__changes:
+            return self.__changes[key.lower()] is not None
+        return key in self.__base
+
+    def __iter__(self) -> Iterator[str]:
+        for name in self.__base:
+            if name.lower() not in self.__changes:
+                yield name
+        for entry in self.__changes.values():
+            if entry:
+                yield entry[0]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def copy(self) -> OverlayHttpHeaders:
+        return OverlayHttpHeaders.overlay(self)
+
+    def __repr__(self):
+        return repr(dict(self.items()))
@@ -2,13 +2,12 @@
 from __future__ import annotations
 
 # standard library
-import re
 from abc import ABC, abstractmethod
 from email.message import Message
 from socket import socket
 from socketserver import BaseServer
-from typing import Dict, Optional
-from urllib.parse import urlparse
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlparse
 
 __author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
 __license__ = "Apache 2.0"
@@ -17,10 +16,14 @@ __license__ = "Apache 2.0"
 from typing.io import BinaryIO
 
 # scip plugin
+from spring_cloud.gateway.server.body import BodyFormatError, RequestBodyStream
+from spring_cloud.gateway.server.headers import HttpHeaders, OverlayHttpHeaders
 from spring_cloud.utils.validate import not_none
 
 
 class ServerHTTPRequest(ABC):
+    __slots__ = ()
+
     @property
     @abstractmethod
     def path(self) -> str:
@@ -28,7 +31,7 @@ class ServerHTTPRequest(ABC):
 
     @property
     @abstractmethod
-    def query(self) -> Dict[str, str]:
+    def query(self) -> Dict[str, List[str]]:
         raise NotImplemented
 
     @property
@@ -56,6 +59,13 @@ class ServerHTTPRequest(ABC):
     def body(self) -> bytes:
         raise NotImplemented
 
+    @property
+    def body_stream(self) -> RequestBodyStream:
+        """
+        The read-once stream of the body, the whole body is loaded in memory by default.
+        """
+        return RequestBodyStream.of(self.body)
+
     @property
     @abstractmethod
     def remote_addr(self) -> Optional[tuple]:
@@ -102,37 +112,66 @@ class ServerHTTPRequest(ABC):
 
 
 class DefaultServerHttpRequest(ServerHTTPRequest):
+    """
+    The request parsed from the client connection,
+    the path, query, cookies and headers are parsed once on first access and then cached.
+    """
+
+    __slots__ = (
+        "__message",
+        "__raw_path",
+        "__server",
+        "__rfile",
+        "__method",
+        "__request",
+        "__body",
+        "__body_stream",
+        "__path",
+        "__query",
+        "__cookies",
+        "__headers",
+    )
+
     def __init__(self, headers: Message, path: str, server: BaseServer, method: str, rfile: BinaryIO, request: socket):
-        self.__headers = headers
-        self.__path = path
+        self.__message = headers
+        self.__raw_path = path
         self.__server = server
         self.__rfile = rfile
         self.__method = method
         self.__request = request
+        self.__body = None
+        self.__body_stream = None
+        self.__path = None
+        self.__query = None
+        self.__cookies = None
+        self.__headers = None
 
     @property
     def path(self) -> str:
-        return self.__path.split(r"?")[0]
+        if self.__path is None:
+            self.__path = self.__raw_path.partition("?")[0]
+        return self.__path
 
     @property
-    def query(self) -> Dict[str, str]:
-        token = self.__path.split(r"?")
-        query = {}
-        if len(token) == 2:
-            for segment in re.split(r"\s*&\s*", token[1]):
-                key, value = re.split(r"\s*=\s*", segment)[:2]
-                query[key] = value
-        return query
+    def query(self) -> Dict[str, List[str]]:
+        if self.__query is None:
+            query = {}
+            for key, value in parse_qsl(self.__raw_path.partition("?")[2], keep_blank_values=True):
+                query.setdefault(key, []).append(value)
+            self.__query = query
+        return self.__query
 
     @property
     def cookies(self) -> Dict[str, str]:
-        cookies = {}
-        value = self.__headers.get("Cookie")
-        if value:
-            for segment in re.split(r"\s*;\s*", value):
-                key, value = re.split(r"\s*=\s*", segment)[:2]
-                cookies[key] = value
-        return cookies
+        if self.__cookies is None:
+            cookies = {}
+            for value in self.headers.get_all("Cookie"):
+                for segment in value.split(";"):
+                    key, _, value_ = segment.partition("=")
+                    if key.strip():
+                        cookies[key.strip()] = value_.strip()
+            self.__cookies = cookies
+        return self.__cookies
 
     @property
     def method(self) -> str:
@@ -144,16 +183,58 @@ class DefaultServerHttpRequest(ServerHTTPRequest):
         return f"http://{self.host}:{self.port}"
 
     @property
-    def headers(self) -> Dict[str, str]:
-        return dict(self.__headers._headers)
+    def headers(self) -> HttpHeaders:
+        if self.__headers is None:
+            self.__headers = HttpHeaders(self.__message.items())
+        return self.__headers
 
     @property
     def body(self) -> bytes:
-        if "Content-Length" in self.__headers.keys():
-            content_len = int(self.__headers.get("Content-Length"))
-            return self.__rfile.read(content_len)
-        else:
-            return b""
+        if self.__body is None:
+            self.__body = self.__get_body_stream().read()
+        return self.__body
+
+    @property
+    def body_stream(self) -> RequestBodyStream:
+        """
+        The body is streamed from the connection unless it has been loaded by `body`.
+        """
+        if self.__body is not None:
+            return RequestBodyStream.of(self.__body)
+        return self.__get_body_stream()
+
+    def __get_body_stream(self) -> RequestBodyStream:
+        if self.__body_stream is None:
+            chunked = "chunked" in self.__message.get("Transfer-Encoding", "").lower()
+            content_len = 0
+            if not chunked:
+                content_length = self.__message.get("Content-Length") or "0"
+                try:
+                    content_len = int(content_length)
+                except ValueError:
+                    content_len = -1
+                if content_len < 0:
+                    raise BodyFormatError(f"Bad Content-Length {content_length!r}")
+            self.__body_stream = RequestBodyStream(self.__rfile, content_len, chunked)
+        return self.__body_stream
+
+    def validate_body_framing(self):
+        """
+        Raises:
+            BodyFormatError: if where the body ends can't be told, e.g., the Content-Length is malformed
+        """
+        self.__get_body_stream()
+
+    def discard_unread_body(self, limit: int = 65536) -> bool:
+        """
+        Skip the body that hasn't been read by anyone, so that the next request
+        on the same persistent connection starts at the right position.
+        Returns:
+            (bool) whether the body has been fully skipped, if not, the connection can't be reused.
+        """
+        if self.__body is not None:
+            return True
+        return self.__get_body_stream().discard(limit)
 
     @property
     def host(self) -> str:
@@ -181,7 +262,9 @@ class DefaultServerHttpRequestBuilder(ServerHTTPRequest.Builder):
         self.__method = original.method
         self.__uri = original.uri
         self.__path = original.path
+        # the original headers are shared until the first change
         self.__headers = original.headers
+        self.__headers_overlaid = False
         self.__original_request = original
 
     def method(self, method_: str) -> ServerHTTPRequest.Builder:
@@ -197,6 +280,9 @@ class DefaultServerHttpRequestBuilder(ServerHTTPRequest.Builder):
         return self
 
     def header(self, key: str, value: str) -> ServerHTTPRequest.Builder:
+        if not self.__headers_overlaid:
+            self.__headers = OverlayHttpHeaders.overlay(self.__headers)
+            self.__headers_overlaid = True
         self.__headers[key] = value
         return self
 
@@ -219,7 +305,7 @@ class MutatedServerHttpRequest(ServerHTTPRequest):
         return self.__path
 
     @property
-    def query(self) -> Dict[str, str]:
+    def query(self) -> Dict[str, List[str]]:
         return self.__original_request.query
 
     @property
@@ -242,6 +328,10 @@ class MutatedServerHttpRequest(ServerHTTPRequest):
     def body(self) -> bytes:
         return self.__original_request.body
 
+    @property
+    def body_stream(self) -> RequestBodyStream:
+        return self.__original_request.body_stream
+
     @property
     def remote_addr(self) -> Optional[tuple]:
         return self.__original_request.remote_addr
@@ -267,7 +357,7 @@ class StaticServerHttpRequest(ServerHTTPRequest):
         method: str = "GET",
         cookies: Dict[str, str] = {},
         body: bytearray = b"",
-        query: Dict[str, str] = {},
+        query: Dict[str, List[str]] = {},
         remote_addr: Optional[tuple] = ("10.0.0.1", 51630),
         local_addr: Optional[tuple] = ("10.0.0.1", 51333),
     ):
@@ -289,7 +379,7 @@ class StaticServerHttpRequest(ServerHTTPRequest):
         return self.__path
 
     @property
-    def query(self) -> Dict[str, str]:
+    def query(self) -> Dict[str, List[str]]:
         return self.__query
 
     @property
@@ -7,45 +7,170 @@ __license__ = "Apache 2.0"
 
 # standard library
 from http.server import HTTPServer, SimpleHTTPRequestHandler
+from typing import List, Optional, Tuple
 
 # scip plugin
 from spring_cloud.gateway.handler import DispatcherHandler
 from spring_cloud.gateway.server import DefaultServerHttpRequest, DefaultServerWebExchange, ServerHTTPResponse
+from spring_cloud.gateway.server.async_server import parse_http_version
+from spring_cloud.gateway.server.body import BodyFormatError
+from spring_cloud.gateway.server.metrics import PROMETHEUS_CONTENT_TYPE
 from spring_cloud.gateway.server.server import HttpResponseHandler
+from spring_cloud.gateway.server.utils import GATEWAY_HEALTH_CHECK_PATH, GATEWAY_METRICS_PATH
+from spring_cloud.gateway.server.writer import encode_response_head, send_buffers
 
 logger = logging.getLogger("spring_cloud.gateway.HTTPRequestHandler")
 
 
 class HTTPRequestHandler(SimpleHTTPRequestHandler, HttpResponseHandler):
-    def __init__(self, *args, dispatcher_handler: DispatcherHandler, directory=None, **kwargs):
+    """
+    Serves the persistent (HTTP/1.1 keep-alive) connection from a client, request after request.
+    The connection is closed once it has been idle for `keep_alive_timeout` seconds
+    or has served `max_keep_alive_requests` requests.
+
+    When served by a server which parks the idle connections (e.g., ThreadPoolHTTPServer),
+    the handler releases its thread once the connection is idle, and resumes once the next request arrives.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def __init__(
+        self,
+        *args,
+        dispatcher_handler: DispatcherHandler,
+        keep_alive_timeout: Optional[float] = 15,
+        max_keep_alive_requests: Optional[int] = 100,
+        directory=None,
+        **kwargs,
+    ):
         self.__dispatcher_handler = dispatcher_handler
+        # the socket timeout, it's applied in StreamRequestHandler.setup()
+        self.timeout = keep_alive_timeout
+        self.__max_keep_alive_requests = max_keep_alive_requests
+        self.__handled_requests = 0
+        self.__response_started = False
+        self.parked = False
         super().__init__(*args, directory=directory, **kwargs)
 
+    def handle(self):
+        self.parked = False
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection:
+            if hasattr(self.server, "park") and not self.has_buffered_request():
+                self.parked = True
+                return
+            self.handle_one_request()
+
+    def has_buffered_request(self) -> bool:
+        """
+        :return: whether the next (pipelined) request has been received, peeks without blocking.
+        """
+        self.connection.settimeout(0)
+        try:
+            return bool(self.rfile.peek(1))
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def resume(self):
+        """
+        Serves the next requests on the parked connection.
+        """
+        try:
+            self.handle()
+        finally:
+            self.finish()
+
+    def finish(self):
+        if self.parked:
+            # keep the connection open for the next request
+            self.wfile.flush()
+        else:
+            super().finish()
+
     def send_body(self, body: bytes):
         self.wfile.write(body)
 
     def send_status_code(self, status_code: int):
+        self.__response_started = True
         self.send_response(status_code)
 
+    def write_response(self, status_code: int, headers: List[Tuple[str, str]], body: bytes):
+        """
+        Sends the head and the body by a single vectored write instead of a write per header.
+        """
+        self.__response_started = True
+        self.log_request(status_code)
+        head_headers = [("Server", self.version_string()), ("Date", self.date_time_string())]
+        for key, value in headers:
+            if key.lower() == "connection":
+                if value.lower() == "close":
+                    self.close_connection = True
+                elif value.lower() == "keep-alive":
+                    self.close_connection = False
+            head_headers.append((key, value))
+        head = encode_response_head(status_code, head_headers, self.protocol_version)
+        send_buffers(self.connection, [head, body])
+
+    @property
+    def chunked_encoding_supported(self) -> bool:
+        return parse_http_version(self.request_version) >= (1, 1)
+
     def handle_(self):
+        self.__handled_requests += 1
+        self.__response_started = False
         http_request = DefaultServerHttpRequest(
             self.headers, self.path, self.server, self.command, self.rfile, self.request
         )
-        if http_request.path == "/api/gateway/_health_check":
+        try:
+            http_request.validate_body_framing()
+            self.__handle_request(http_request)
+            if not http_request.discard_unread_body():
+                self.close_connection = True
+        except BodyFormatError as err:
+            self.__respond_bad_request(err)
+            return
+        logger.trace("Successfully handling request.")
+
+    def __handle_request(self, http_request: DefaultServerHttpRequest):
+        if http_request.path == GATEWAY_HEALTH_CHECK_PATH:
             self._respond_health_check()
+        elif http_request.path == GATEWAY_METRICS_PATH:
+            self._respond_metrics()
         else:
             logger.trace(f"Handling request: {http_request}.")
             http_response = ServerHTTPResponse(self)
+            if self.is_last_request():
+                http_response.add_header("Connection", "close")
             exchange = DefaultServerWebExchange(http_request, http_response)
             self.__dispatcher_handler.handle(exchange)
-        logger.trace("Successfully handling request.")
+
+    def __respond_bad_request(self, err: BodyFormatError):
+        """
+        The rest of the stream can't be framed into requests anymore, so the connection is always closed,
+        and a 400 is sent unless a response has been (partly) sent already.
+        """
+        logger.warning(f"Bad request body from {self.client_address}: {err}")
+        self.close_connection = True
+        if not self.__response_started:
+            self.write_response(400, [("Content-Length", "0"), ("Connection", "close")], b"")
+
+    def is_last_request(self) -> bool:
+        return bool(self.__max_keep_alive_requests) and self.__handled_requests >= self.__max_keep_alive_requests
 
     def _respond_health_check(self):
-        message = b"The Api Gateway is ready."
-        self.send_status_code(200)
-        self.send_header("Content-Length", str(len(message)))
-        self.end_headers()
-        self.send_body(message)
+        self._respond_admin(b"The Api Gateway is ready.")
+
+    def _respond_metrics(self):
+        self._respond_admin(self.__dispatcher_handler.metrics.render().encode(), PROMETHEUS_CONTENT_TYPE)
+
+    def _respond_admin(self, message: bytes, content_type: Optional[str] = None):
+        headers = [("Content-Length", str(len(message)))]
+        if content_type:
+            headers.append(("Content-Type", content_type))
+        if self.is_last_request():
+            headers.append(("Connection", "close"))
+        self.write_response(200, headers, message)
 
     def do_GET(self):
         self.handle_()
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 # standard library
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
 
 __author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
 __license__ = "Apache 2.0"
@@ -30,13 +30,54 @@ class HttpResponseHandler(ABC):
     def send_body(self, body: bytes):
         raise NotImplemented
 
+    @property
+    def chunked_encoding_supported(self) -> bool:
+        """
+        Whether the client understands the chunked transfer-encoding (HTTP/1.1),
+        if not, a body of unknown length is delimited by closing the connection.
+        """
+        return True
+
+    def write_response(self, status_code: int, headers: List[Tuple[str, str]], body: bytes):
+        """
+        Sends the whole response, the handlers able to write it with a single system call override this.
+        """
+        self.send_status_code(status_code)
+        for key, value in headers:
+            self.send_header(key, value)
+        self.end_headers()
+        self.send_body(body)
+
+    def send_body_stream(self, chunks: Iterable[bytes], chunked: bool):
+        """
+        Sends the body piece by piece as the pieces arrive.
+        Args:
+            chunks: the pieces of the body
+            chunked: whether to frame the pieces in the chunked transfer-encoding
+        """
+        for chunk in chunks:
+            if chunk:
+                self.send_body(encode_chunk(chunk) if chunked else chunk)
+        if chunked:
+            self.send_body(LAST_CHUNK)
+
+
+LAST_CHUNK = b"0\r\n\r\n"
+
+
+def encode_chunk(chunk: bytes) -> bytes:
+    return b"%X\r\n%s\r\n" % (len(chunk), chunk)
+
 
 class ServerHTTPResponse:
     def __init__(self, handler: HttpResponseHandler):
         self.__status_code = None
         self.__cookies = {}
         self.__headers = {}
+        self.__filter_header_names = frozenset()
         self.__body = bytes()
+        self.__body_stream = None
+        self.__before_commit_actions = []
         self.__handler = handler
 
     @property
@@ -61,27 +102,95 @@ class ServerHTTPResponse:
         self.__headers[key] = value
 
     def set_headers(self, **headers: Dict[str, str]):
+        """
+        Sets the headers (e.g., of the upstream response) under the ones already added by the filters.
+        """
+        self.__filter_header_names = frozenset(self.__headers)
         self.__headers = {**headers, **self.__headers}
 
+    @property
+    def filter_header_names(self) -> FrozenSet[str]:
+        """
+        The names of the headers which had been added by the filters when the headers were set by set_headers.
+        """
+        return self.__filter_header_names
+
     @property
     def body(self):
         return self.__body
 
     def set_body(self, body: bytes):
         self.__body = body
+        self.__body_stream = None
+
+    @property
+    def body_stream(self) -> Optional[Iterable[bytes]]:
+        return self.__body_stream
+
+    def set_body_stream(self, body_stream: Iterable[bytes], content_length: Optional[int] = None):
+        """
+        Relays the body piece by piece on commit instead of sending it at once,
+        the chunked transfer-encoding is used if the content length is unknown.
+        """
+        self.__body_stream = body_stream
+        self.__body = bytes()
+        if content_length is not None:
+            self.__headers["Content-Length"] = str(content_length)
+
+    def before_commit(self, action: Callable[[ServerHTTPResponse], None]):
+        """
+        Registers an action to modify the response (e.g., its headers or body) right before it's committed,
+        the actions run in the order of registration.
+        """
+        self.__before_commit_actions.append(action)
 
     def commit(self):
         not_none(self.__status_code)
+        for action in self.__before_commit_actions:
+            action(self)
+        if self.__body_stream is None:
+            self.add_content_length_header()
+            self.__handler.write_response(self.__status_code, self.header_list(), self.__body)
+            return
+
+        chunked = self.add_transfer_encoding_header()
         self.__handler.send_status_code(self.__status_code)
-        self.add_cookie_header()
-        for key, value in self.__headers.items():
+        for key, value in self.header_list():
             self.__handler.send_header(key, value)
         self.__handler.end_headers()
-        self.__handler.send_body(self.__body)
-
-    def add_cookie_header(self):
-        cookies = [f"{key}={value}" for key, value in self.__cookies.items()]
-        self.__headers["Cookie"] = "; ".join(cookies)
+        self.__handler.send_body_stream(self.__body_stream, chunked)
+
+    def header_list(self) -> List[Tuple[str, str]]:
+        """
+        The headers to send, every cookie is set by its own 'Set-Cookie' header.
+        """
+        headers = list(self.__headers.items())
+        headers.extend(("Set-Cookie", f"{key}={value}") for key, value in self.__cookies.items())
+        return headers
+
+    def add_content_length_header(self):
+        """
+        The response must be framed for the client to reuse the persistent connection.
+        """
+        if not any(key.lower() in ("content-length", "transfer-encoding") for key in self.__headers):
+            self.__headers["Content-Length"] = str(len(self.__body))
+
+    def add_transfer_encoding_header(self) -> bool:
+        """
+        Frames the streamed body of unknown length.
+        Returns:
+            (bool) whether the body should be sent in the chunked transfer-encoding
+        """
+        for key in list(self.__headers):
+            if key.lower() == "content-length":
+                return False
+            if key.lower() == "transfer-encoding":
+                del self.__headers[key]
+        if self.__handler.chunked_encoding_supported:
+            self.__headers["Transfer-Encoding"] = "chunked"
+            return True
+        self.__headers["Connection"] = "close"
+        return False
 
 
 class ServerWebExchange(ABC):
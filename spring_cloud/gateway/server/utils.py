@@ -3,6 +3,9 @@
 __author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
 __license__ = "Apache 2.0"
 
+# standard library
+from typing import Dict
+
 # scip plugin
 from spring_cloud.gateway.server import ServerWebExchange
 
@@ -13,6 +16,13 @@ GATEWAY_REQUEST_URL_ATTR = "gatewayRequestUrl"
 GATEWAY_ALREADY_ROUTED_ATTR = "gatewayAlreadyRoutedAttr"
 GATEWAY_ORIGINAL_REQUEST_URL_ATTR = "gatewayOriginalRequestUrl"
 GATEWAY_ALREADY_PREFIXED_ATTR = "gatewayAlreadyPrefixed"
+GATEWAY_UPSTREAM_TIME_ATTR = "gatewayUpstreamTime"
+# "hit" or "miss" if the response cache has been looked up
+GATEWAY_RESPONSE_CACHE_ATTR = "gatewayResponseCache"
+GATEWAY_URI_TEMPLATE_VARIABLES_ATTR = "gatewayUriTemplateVariables"
+
+GATEWAY_HEALTH_CHECK_PATH = "/api/gateway/_health_check"
+GATEWAY_METRICS_PATH = "/api/gateway/_metrics"
 
 
 def is_already_routed(exchange: ServerWebExchange):
@@ -21,3 +31,15 @@ def is_already_routed(exchange: ServerWebExchange):
 
 def set_already_routed(exchange: ServerWebExchange):
     exchange.attributes[GATEWAY_ALREADY_ROUTED_ATTR] = True
+
+
+def add_upstream_time(exchange: ServerWebExchange, seconds: float):
+    exchange.attributes[GATEWAY_UPSTREAM_TIME_ATTR] = exchange.attributes.get(GATEWAY_UPSTREAM_TIME_ATTR, 0.0) + seconds
+
+
+def put_uri_template_variables(exchange: ServerWebExchange, variables: Dict[str, str]):
+    exchange.attributes[GATEWAY_URI_TEMPLATE_VARIABLES_ATTR] = {**get_uri_template_variables(exchange), **variables}
+
+
+def get_uri_template_variables(exchange: ServerWebExchange) -> Dict[str, str]:
+    return exchange.attributes.get(GATEWAY_URI_TEMPLATE_VARIABLES_ATTR) or {}
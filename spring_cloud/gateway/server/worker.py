@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+The worker model of the api gateway:
+    - ThreadPoolHTTPServer serves the connections from a bounded pool of threads.
+    - PreforkServer forks N worker processes sharing the listening address via SO_REUSEPORT.
+"""
+# standard library
+import os
+import queue
+import selectors
+import signal
+import socket
+import threading
+import time
+from http.server import HTTPServer
+from typing import Callable, List, Optional, Tuple
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# scip plugin
+from spring_cloud.utils import logging
+
+logger = logging.getLogger("spring_cloud.gateway.worker")
+
+SERVICE_UNAVAILABLE_RESPONSE = b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+
+
+def enable_reuse_port(sock: socket.socket):
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise OSError("SO_REUSEPORT is not supported on this platform.")
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
+
+class ThreadPoolHTTPServer(HTTPServer):
+    """
+    An HTTPServer whose connections are served by a fixed number of threads.
+    The accepted connections wait in a bounded queue, once the queue is full
+    the new connections are rejected with '503 Service Unavailable' instead of piling up.
+
+    A handler may park its idle keep-alive connection (by setting `handler.parked`) instead of
+    blocking a thread until the next request arrives. The parked connections are watched by a single selector,
+    a connection is put back into the queue once it's readable, and is closed once it has been idle
+    for `handler.timeout` seconds. Then the idle clients won't starve the others of the threads.
+    """
+
+    def __init__(
+        self,
+        server_address: Tuple[str, int],
+        RequestHandlerClass,
+        max_threads: Optional[int] = 32,
+        max_queue_size: Optional[int] = 128,
+        reuse_port: Optional[bool] = False,
+        bind_and_activate: Optional[bool] = True,
+    ):
+        if max_threads < 1 or max_queue_size < 1:
+            raise ValueError("Both max_threads and max_queue_size must be positive.")
+        self.reuse_port = reuse_port
+        self.__requests = queue.Queue(maxsize=max_queue_size)
+        self.__threads: List[threading.Thread] = []
+        self.__selector = selectors.DefaultSelector()
+        self.__parking_lock = threading.Lock()
+        self.__parking = []
+        self.__idle_deadlines = {}
+        self.__closed = False
+        self.__wakeup_receiver, self.__wakeup_sender = socket.socketpair()
+        self.__wakeup_receiver.setblocking(False)
+        self.__selector.register(self.__wakeup_receiver, selectors.EVENT_READ)
+        super().__init__(server_address, RequestHandlerClass, bind_and_activate)
+        for i in range(max_threads):
+            thread = threading.Thread(target=self.__work, name=f"gateway-worker-{i}", daemon=True)
+            thread.start()
+            self.__threads.append(thread)
+        self.__idle_thread = threading.Thread(
+            target=self.__watch_idle_connections, name="gateway-idle-connections", daemon=True
+        )
+        self.__idle_thread.start()
+
+    @property
+    def max_threads(self) -> int:
+        return len(self.__threads)
+
+    @property
+    def queue_size(self) -> int:
+        return self.__requests.qsize()
+
+    @property
+    def idle_connections(self) -> int:
+        return len(self.__idle_deadlines) + len(self.__parking)
+
+    def server_bind(self):
+        if self.reuse_port:
+            enable_reuse_port(self.socket)
+        super().server_bind()
+
+    def process_request(self, request, client_address):
+        try:
+            self.__requests.put_nowait((request, client_address))
+        except queue.Full:
+            logger.warning(f"The request queue is full, reject the connection from {client_address}.")
+            self.reject_request(request)
+
+    def reject_request(self, request):
+        try:
+            request.sendall(SERVICE_UNAVAILABLE_RESPONSE)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def finish_request(self, request, client_address):
+        return self.RequestHandlerClass(request, client_address, self)
+
+    def __work(self):
+        while True:
+            item = self.__requests.get()
+            if item is None:
+                return
+            handler = None
+            if isinstance(item, tuple):
+                request, client_address = item
+            else:
+                handler = item
+                request, client_address = handler.request, handler.client_address
+            try:
+                if handler is None:
+                    handler = self.finish_request(request, client_address)
+                else:
+                    handler.resume()
+            except Exception:
+                self.handle_error(request, client_address)
+                handler = None
+            if getattr(handler, "parked", False):
+                self.park(handler)
+            else:
+                self.shutdown_request(request)
+
+    def park(self, handler):
+        timeout = getattr(handler, "timeout", None)
+        deadline = time.monotonic() + timeout if timeout else None
+        with self.__parking_lock:
+            self.__parking.append((handler, deadline))
+        self.__wake_up()
+
+    def __wake_up(self):
+        try:
+            self.__wakeup_sender.send(b"\0")
+        except OSError:
+            # the wakeup buffer is full, the idle thread will wake up anyway
+            pass
+
+    def __watch_idle_connections(self):
+        while not self.__closed:
+            self.__register_parked_connections()
+            deadlines = [deadline for deadline in self.__idle_deadlines.values() if deadline is not None]
+            timeout = max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+            for key, _ in self.__selector.select(timeout):
+                if key.fileobj is self.__wakeup_receiver:
+                    self.__drain_wakeups()
+                    continue
+                handler = key.data
+                self.__unregister(handler)
+                try:
+                    self.__requests.put_nowait(handler)
+                except queue.Full:
+                    logger.warning(f"The request queue is full, close the connection from {handler.client_address}.")
+                    self.__close_idle(handler)
+            now = time.monotonic()
+            for handler, deadline in list(self.__idle_deadlines.items()):
+                if deadline is not None and deadline <= now:
+                    self.__unregister(handler)
+                    self.__close_idle(handler)
+        self.__register_parked_connections()
+        for handler in list(self.__idle_deadlines):
+            self.__unregister(handler)
+            self.__close_idle(handler)
+        self.__selector.close()
+        self.__wakeup_receiver.close()
+        self.__wakeup_sender.close()
+
+    def __register_parked_connections(self):
+        with self.__parking_lock:
+            parking, self.__parking = self.__parking, []
+        for handler, deadline in parking:
+            self.__idle_deadlines[handler] = deadline
+            self.__selector.register(handler.request, selectors.EVENT_READ, handler)
+
+    def __unregister(self, handler):
+        self.__selector.unregister(handler.request)
+        del self.__idle_deadlines[handler]
+
+    def __drain_wakeups(self):
+        try:
+            while self.__wakeup_receiver.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def __close_idle(self, handler):
+        handler.parked = False
+        try:
+            handler.finish()
+        except OSError:
+            pass
+        self.shutdown_request(handler.request)
+
+    def server_close(self):
+        super().server_close()
+        self.__closed = True
+        self.__wake_up()
+        for _ in self.__threads:
+            try:
+                self.__requests.put_nowait(None)
+            except queue.Full:
+                # the worker threads are daemons, they will be stopped with the process
+                break
+
+
+class PreforkServer:
+    """
+    Runs `serve` in N forked worker processes.
+
+    Everything built before `serve_forever()` (e.g., the compiled routes) is shared by the workers
+    through copy-on-write. Each worker binds its own listening socket with SO_REUSEPORT,
+    so the kernel balances the incoming connections across the workers (and the cores).
+    """
+
+    def __init__(self, workers: int, serve: Callable[[], None]):
+        if workers < 1:
+            raise ValueError(f"The number of workers must be positive, but got {workers}.")
+        if not hasattr(os, "fork"):
+            raise OSError("Forking worker processes is not supported on this platform.")
+        self.__workers = workers
+        self.__serve = serve
+        self.__pids: List[int] = []
+
+    @property
+    def pids(self) -> List[int]:
+        return list(self.__pids)
+
+    def serve_forever(self):
+        self.start()
+        previous_handler = signal.signal(signal.SIGTERM, self.__on_terminate)
+        try:
+            self.wait()
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+
+    def start(self):
+        for _ in range(self.__workers):
+            pid = os.fork()
+            if pid == 0:
+                self.__run_worker()
+            self.__pids.append(pid)
+        logger.info(f"Forked {self.__workers} workers: {self.__pids}")
+
+    def __run_worker(self):
+        exit_code = 0
+        try:
+            signal.signal(signal.SIGTERM, self.__on_terminate)
+            self.__serve()
+        except KeyboardInterrupt:
+            pass
+        except BaseException as err:
+            logger.error(f"Worker {os.getpid()} crashed: {err}")
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    @staticmethod
+    def __on_terminate(signum, frame):
+        raise KeyboardInterrupt
+
+    def wait(self):
+        for pid in self.__pids:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+
+    def server_close(self):
+        for pid in self.__pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        self.wait()
+        self.__pids.clear()
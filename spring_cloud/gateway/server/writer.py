@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+"""
+Writes a whole response to the connection at once:
+the status line and the headers are serialized into one buffer,
+which is sent together with the body by a single vectored write (sendmsg/writev) without copying the body.
+"""
+# standard library
+import socket
+from http import HTTPStatus
+from typing import Iterable, List, Tuple
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+
+def encode_response_head(status_code: int, headers: Iterable[Tuple[str, str]], version: str = "HTTP/1.1") -> bytes:
+    try:
+        phrase = HTTPStatus(status_code).phrase
+    except ValueError:
+        phrase = ""
+    lines = [f"{version} {status_code} {phrase}"]
+    lines.extend(f"{key}: {value}" for key, value in headers)
+    lines.append("\r\n")
+    # join() sizes the buffer once for all the lines
+    return "\r\n".join(lines).encode("latin-1", "strict")
+
+
+def send_buffers(sock: socket.socket, buffers: List[bytes]):
+    """
+    Sends all the buffers with as few system calls as possible, resuming after the partial writes.
+    """
+    views = [memoryview(buffer) for buffer in buffers if buffer]
+    if not hasattr(sock, "sendmsg"):
+        for view in views:
+            sock.sendall(view)
+        return
+    while views:
+        sent = sock.sendmsg(views)
+        while sent:
+            if sent >= len(views[0]):
+                sent -= len(views.pop(0))
+            else:
+                views[0] = views[0][sent:]
+                sent = 0
@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+"""
+The contract of the objects sorted by their orders, e.g., the filters of a filter chain.
+The lower the order, the higher the precedence.
+"""
+# standard library
+from abc import ABC, abstractmethod
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+
+class Ordered(ABC):
+    HIGHEST_PRECEDENCE = -(2 ** 31)
+    LOWEST_PRECEDENCE = 2 ** 31 - 1
+
+    @abstractmethod
+    def get_order(self) -> int:
+        pass
+
+
+def get_order(obj, default: int = Ordered.LOWEST_PRECEDENCE) -> int:
+    """
+    Returns:
+        (int) the order of the object, or the default if it's not Ordered
+    """
+    return obj.get_order() if isinstance(obj, Ordered) else default
@@ -1,7 +1,13 @@
 # -*- coding: utf-8 -*-
 # standard library
+import gzip
+import threading
+import zlib
 from unittest.mock import Mock
 
+# pypi/conda library
+import pytest
+
 __author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
 __license__ = "Apache 2.0"
 
@@ -9,10 +15,18 @@ __license__ = "Apache 2.0"
 from spring_cloud.gateway.filter.factory.core import (
     AddRequestHeaderGatewayFilter,
     AddResponseHeaderGatewayFilter,
+    CachedResponse,
+    LocalResponseCacheGatewayFilter,
     NameValueConfig,
     PrefixPathGatewayFilter,
+    RequestRateLimiterGatewayFilter,
+    ResponseCache,
+    ResponseCompressionGatewayFilter,
+    SetPathGatewayFilter,
+    TokenBucketTable,
 )
-from spring_cloud.gateway.server import ServerHTTPResponse, StaticServerHttpRequest
+from spring_cloud.gateway.server import ServerHTTPResponse, StaticServerHttpRequest, put_uri_template_variables
+from spring_cloud.gateway.server.utils import GATEWAY_RESPONSE_CACHE_ATTR
 from tests.gateway.server.server import StubServerWebExchange
 
 
@@ -34,6 +48,14 @@ class TestAddRequestHeaderGatewayFilter:
         assert self.exchange.request.headers["Hello"] == "World"
         self.filter_chain.filter.assert_called_with(self.exchange)
 
+    def test_Given_chained_filters_When_filter_Then_layer_every_header_over_the_original(self):
+        self.given_exchange()
+        original_headers = self.exchange.request.headers
+        for i in range(3):
+            AddRequestHeaderGatewayFilter(NameValueConfig(f"X-{i}", str(i))).filter(self.exchange, Mock())
+        assert dict(self.exchange.request.headers) == {"X-0": "0", "X-1": "1", "X-2": "2"}
+        assert original_headers == {}
+
 
 class TestAddResponseHeaderGatewayFilter:
     def given_exchange(self):
@@ -72,3 +94,324 @@ class TestPrefixPathGatewayFilter:
         self.gateway_filter.filter(self.exchange, self.filter_chain)
         assert self.exchange.request.path == "/prefix/get"
         self.filter_chain.filter.assert_called_with(self.exchange)
+
+
+class TestSetPathGatewayFilter:
+    def given_exchange(self, url: str, variables: dict):
+        http_request = StaticServerHttpRequest(url_=url)
+        self.exchange = StubServerWebExchange(http_request, Mock())
+        put_uri_template_variables(self.exchange, variables)
+
+    def given_gateway_filter_config(self, template: str):
+        self.filter_chain = Mock()
+        self.gateway_filter = SetPathGatewayFilter(SetPathGatewayFilter.Config(template))
+
+    def test_When_filter_Then_set_the_path_with_the_uri_variables(self):
+        self.given_exchange("http://127.0.0.1:8888/api/users/1", {"resource": "users", "id": "1"})
+        self.given_gateway_filter_config("/{resource}/{id}/profile")
+        self.gateway_filter.filter(self.exchange, self.filter_chain)
+        assert self.exchange.request.path == "/users/1/profile"
+        self.filter_chain.filter.assert_called_with(self.exchange)
+
+    def test_Given_variable_not_captured_When_filter_Then_leave_it(self):
+        self.given_exchange("http://127.0.0.1:8888/api/users/1", {})
+        self.given_gateway_filter_config("/{resource}")
+        self.gateway_filter.filter(self.exchange, self.filter_chain)
+        assert self.exchange.request.path == "/{resource}"
+
+
+class TestResponseCompressionGatewayFilter:
+    body = b"cat" * 1000
+
+    def given_exchange(self, accept_encoding: str = None, method: str = "GET"):
+        headers = {"Accept-Encoding": accept_encoding} if accept_encoding else {}
+        self.handler = Mock()
+        http_request = StaticServerHttpRequest(headers=headers, method=method)
+        self.exchange = StubServerWebExchange(http_request, ServerHTTPResponse(self.handler))
+        self.gateway_filter = ResponseCompressionGatewayFilter(ResponseCompressionGatewayFilter.Config(min_size=100))
+
+    def when_respond(self, body: bytes, **headers):
+        self.gateway_filter.filter(self.exchange, Mock())
+        self.exchange.response.set_status_code(200)
+        self.exchange.response.set_headers(**headers)
+        self.exchange.response.set_body(body)
+        self.exchange.response.commit()
+        status_code, headers, body = self.handler.write_response.call_args[0]
+        return dict(headers), body
+
+    def test_Given_client_accepts_gzip_When_respond_Then_compress_with_gzip(self):
+        self.given_exchange("gzip, deflate")
+        headers, body = self.when_respond(self.body, **{"Content-Length": str(len(self.body))})
+        assert headers["Content-Encoding"] == "gzip"
+        assert headers["Vary"] == "Accept-Encoding"
+        assert headers["Content-Length"] == str(len(body))
+        assert gzip.decompress(body) == self.body
+
+    def test_Given_client_prefers_deflate_When_respond_Then_compress_with_deflate(self):
+        self.given_exchange("gzip;q=0.5, deflate")
+        headers, body = self.when_respond(self.body)
+        assert headers["Content-Encoding"] == "deflate"
+        assert zlib.decompress(body) == self.body
+
+    def test_Given_small_body_When_respond_Then_not_compress(self):
+        self.given_exchange("gzip")
+        headers, body = self.when_respond(b"cat")
+        assert "Content-Encoding" not in headers
+        assert body == b"cat"
+
+    def test_Given_client_accepts_no_supported_encoding_When_respond_Then_not_compress(self):
+        self.given_exchange("br, gzip;q=0")
+        headers, body = self.when_respond(self.body)
+        assert "Content-Encoding" not in headers
+        assert body == self.body
+
+    def test_Given_wildcard_and_refused_gzip_When_respond_Then_compress_with_deflate(self):
+        self.given_exchange("gzip;q=0, *")
+        headers, body = self.when_respond(self.body)
+        assert headers["Content-Encoding"] == "deflate"
+        assert zlib.decompress(body) == self.body
+
+    def test_Given_strong_etag_When_compress_Then_weaken_the_etag(self):
+        self.given_exchange("gzip")
+        headers, body = self.when_respond(self.body, ETag='"cat"')
+        assert headers["Content-Encoding"] == "gzip"
+        assert headers["ETag"] == 'W/"cat"'
+
+    def test_Given_encoded_body_When_respond_Then_relay_it_untouched(self):
+        self.given_exchange("gzip")
+        compressed = gzip.compress(self.body)
+        headers, body = self.when_respond(compressed, **{"Content-Encoding": "gzip"})
+        assert body == compressed
+
+    def test_Given_streamed_body_When_respond_Then_compress_the_stream(self):
+        self.given_exchange("gzip")
+        self.gateway_filter.filter(self.exchange, Mock())
+        self.exchange.response.set_status_code(200)
+        self.exchange.response.set_body_stream(iter([self.body, self.body]), 2 * len(self.body))
+        self.exchange.response.commit()
+        chunks, chunked = self.handler.send_body_stream.call_args[0]
+        assert chunked
+        assert gzip.decompress(b"".join(chunks)) == 2 * self.body
+
+
+class TestTokenBucketTable:
+    def test_Given_burst_When_acquire_Then_admit_up_to_the_capacity_and_refill_by_the_rate(self):
+        buckets = TokenBucketTable(replenish_rate=2, capacity=3)
+        assert [buckets.try_acquire("cat", now=0)[0] for _ in range(4)] == [True, True, True, False]
+        assert buckets.try_acquire("cat", now=0.5) == (True, 0)
+        assert buckets.try_acquire("cat", now=10) == (True, 2)
+
+    def test_Given_other_key_When_acquire_Then_use_its_own_bucket(self):
+        buckets = TokenBucketTable(replenish_rate=1, capacity=1)
+        assert buckets.try_acquire("a", now=0)[0]
+        assert not buckets.try_acquire("a", now=0)[0]
+        assert buckets.try_acquire("b", now=0)[0]
+
+    def test_Given_more_keys_than_max_keys_When_acquire_Then_evict_the_least_recently_used(self):
+        buckets = TokenBucketTable(replenish_rate=1, capacity=1, max_keys=2, shards=1)
+        buckets.try_acquire("a", now=0)
+        buckets.try_acquire("b", now=0)
+        buckets.try_acquire("a", now=0)
+        buckets.try_acquire("c", now=0)
+        assert len(buckets) == 2
+        # the bucket of 'b' has been evicted, hence full again
+        assert buckets.try_acquire("b", now=0)[0]
+        assert not buckets.try_acquire("c", now=0)[0]
+
+    def test_Given_concurrent_requests_When_acquire_Then_admit_exactly_the_capacity(self):
+        buckets = TokenBucketTable(replenish_rate=1e-9, capacity=100)
+        admitted = []
+
+        def acquire():
+            admitted.extend(buckets.try_acquire("cat")[0] for _ in range(50))
+
+        threads = [threading.Thread(target=acquire) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert admitted.count(True) == 100
+
+
+class TestRequestRateLimiterGatewayFilter:
+    def given_exchange(self, headers=None, remote_addr=("10.0.0.1", 51630)):
+        http_request = StaticServerHttpRequest(headers=headers or {}, remote_addr=remote_addr)
+        self.exchange = StubServerWebExchange(http_request, ServerHTTPResponse(Mock()))
+
+    def given_gateway_filter_config(self, **args):
+        self.filter_chain = Mock()
+        self.gateway_filter = RequestRateLimiterGatewayFilter(RequestRateLimiterGatewayFilter.Config(**args))
+
+    def test_Given_requests_beyond_the_burst_When_filter_Then_reject_with_429_before_the_chain(self):
+        self.given_gateway_filter_config(replenish_rate=1, burst_capacity=2)
+        for _ in range(2):
+            self.given_exchange()
+            self.gateway_filter.filter(self.exchange, self.filter_chain)
+        assert self.filter_chain.filter.call_count == 2
+
+        self.given_exchange()
+        self.gateway_filter.filter(self.exchange, self.filter_chain)
+        assert self.filter_chain.filter.call_count == 2
+        assert self.exchange.response.status_code == 429
+        assert self.exchange.response.headers["X-RateLimit-Remaining"] == "0"
+        assert self.exchange.response.headers["Retry-After"] == "1"
+
+    def test_Given_header_key_When_filter_Then_limit_each_header_value(self):
+        self.given_gateway_filter_config(replenish_rate=1, key_resolver="header", header="X-Api-Key")
+        for api_key in ["a", "b", "a"]:
+            self.given_exchange({"X-Api-Key": api_key})
+            self.gateway_filter.filter(self.exchange, self.filter_chain)
+        assert self.filter_chain.filter.call_count == 2
+        assert self.exchange.response.status_code == 429
+
+    def test_Given_no_key_When_filter_Then_reject_with_403(self):
+        self.given_gateway_filter_config(replenish_rate=1)
+        self.given_exchange(remote_addr=None)
+        self.gateway_filter.filter(self.exchange, self.filter_chain)
+        self.filter_chain.filter.assert_not_called()
+        assert self.exchange.response.status_code == 403
+
+    def test_Given_unknown_key_resolver_When_config_Then_raise(self):
+        with pytest.raises(ValueError, match="Unknown key resolver 'cat'"):
+            RequestRateLimiterGatewayFilter.Config(replenish_rate=1, key_resolver="cat")
+
+
+class TestResponseCache:
+    @staticmethod
+    def cached_response(body: bytes, expires_at: float = 60) -> CachedResponse:
+        return CachedResponse(200, (), body, 0, expires_at)
+
+    def test_Given_expired_response_When_get_Then_miss(self):
+        cache = ResponseCache(max_bytes=1024)
+        cache.put("cat", self.cached_response(b"meow", expires_at=10))
+        assert cache.get("cat", now=5).body == b"meow"
+        assert cache.get("cat", now=10) is None
+        assert (cache.hits, cache.misses, cache.hit_ratio) == (1, 1, 0.5)
+        assert (len(cache), cache.size) == (0, 0)
+
+    def test_Given_responses_beyond_the_budget_When_put_Then_evict_the_least_recently_used(self):
+        response_size = self.cached_response(b"x" * 100).size
+        cache = ResponseCache(max_bytes=response_size * 2)
+        cache.put("a", self.cached_response(b"x" * 100))
+        cache.put("b", self.cached_response(b"x" * 100))
+        cache.get("a", now=0)
+        cache.put("c", self.cached_response(b"x" * 100))
+        assert cache.get("b", now=0) is None
+        assert cache.get("a", now=0) is not None
+        assert cache.size == response_size * 2
+
+    def test_Given_response_larger_than_the_budget_When_put_Then_skip_it(self):
+        cache = ResponseCache(max_bytes=10)
+        cache.put("cat", self.cached_response(b"x" * 100))
+        assert len(cache) == 0
+
+
+class TestLocalResponseCacheGatewayFilter:
+    def setup_method(self):
+        self.gateway_filter = LocalResponseCacheGatewayFilter(
+            LocalResponseCacheGatewayFilter.Config(vary_headers=("Accept",))
+        )
+        self.upstream_calls = 0
+
+    def request(self, path="/cats", query=None, method="GET", headers=None, upstream_headers=None, filter_headers=None):
+        http_request = StaticServerHttpRequest(
+            url_=f"http://127.0.0.1:8888{path}",
+            method=method,
+            headers=headers or {},
+            query={"b": ["2"], "a": ["1"]} if query is None else query,
+        )
+        self.handler = Mock()
+        exchange = StubServerWebExchange(http_request, ServerHTTPResponse(self.handler))
+
+        def upstream(exchange_):
+            self.upstream_calls += 1
+            # the headers added by the filters after the cache, before the upstream response
+            for name, value in (filter_headers or {}).items():
+                exchange_.response.add_header(name, value)
+            exchange_.response.set_status_code(200)
+            exchange_.response.set_headers(**(upstream_headers or {}))
+            exchange_.response.set_body(f"meow {self.upstream_calls}".encode())
+            exchange_.response.commit()
+
+        filter_chain = Mock()
+        filter_chain.filter.side_effect = upstream
+        self.gateway_filter.filter(exchange, filter_chain)
+        return exchange
+
+    def body(self) -> bytes:
+        return self.handler.write_response.call_args[0][2]
+
+    def test_Given_cached_response_When_filter_Then_serve_it_without_the_upstream(self):
+        assert self.request().attributes[GATEWAY_RESPONSE_CACHE_ATTR] == "miss"
+        exchange = self.request()
+        assert exchange.attributes[GATEWAY_RESPONSE_CACHE_ATTR] == "hit"
+        assert self.body() == b"meow 1"
+        assert self.upstream_calls == 1
+        assert exchange.response.headers["Age"] == "0"
+        assert self.gateway_filter.cache.hit_ratio == 0.5
+
+    def test_Given_other_path_query_or_vary_header_When_filter_Then_miss(self):
+        self.request()
+        self.request(path="/dogs")
+        self.request(query={"a": ["1"]})
+        self.request(headers={"Accept": "text/html"})
+        assert self.upstream_calls == 4
+        self.request(query={"a": ["1"], "b": ["2"]})
+        assert self.upstream_calls == 4
+
+    def test_Given_uncacheable_requests_When_filter_Then_call_the_upstream(self):
+        self.request(method="POST")
+        self.request(method="POST")
+        self.request(headers={"Cache-Control": "no-store"})
+        self.request(headers={"Cache-Control": "no-store"})
+        assert self.upstream_calls == 4
+
+    def test_Given_no_cache_request_When_filter_Then_refresh_the_cache(self):
+        self.request()
+        self.request(headers={"Cache-Control": "no-cache"})
+        self.request()
+        assert self.upstream_calls == 2
+        assert self.body() == b"meow 2"
+
+    @pytest.mark.parametrize(
+        "upstream_headers",
+        [
+            {"Cache-Control": "no-store"},
+            {"Cache-Control": "private, max-age=60"},
+            {"Cache-Control": "max-age=0"},
+            {"Set-Cookie": "cat=meow"},
+            {"Vary": "Accept, Cookie"},
+        ],
+    )
+    def test_Given_uncacheable_response_When_filter_Then_never_cache_it(self, upstream_headers):
+        self.request(upstream_headers=upstream_headers)
+        self.request(upstream_headers=upstream_headers)
+        assert self.upstream_calls == 2
+
+    @pytest.mark.parametrize("credential_header", ["Authorization", "Cookie"])
+    def test_Given_credentials_When_filter_Then_never_share_the_responses_between_them(self, credential_header):
+        self.request(headers={credential_header: "cat"})
+        self.request(headers={credential_header: "dog"})
+        self.request()
+        self.request(headers={credential_header: "cat"})
+        assert self.upstream_calls == 4
+        assert len(self.gateway_filter.cache) == 1
+
+    @pytest.mark.parametrize("cache_control", ["public", "s-maxage=60", "must-revalidate"])
+    def test_Given_credentials_and_shared_response_When_filter_Then_share_it(self, cache_control):
+        self.request(headers={"Authorization": "cat"}, upstream_headers={"Cache-Control": cache_control})
+        self.request(headers={"Authorization": "dog"})
+        self.request()
+        assert self.upstream_calls == 1
+
+    def test_Given_headers_added_by_filters_When_store_Then_only_cache_the_upstream_headers(self):
+        self.request(upstream_headers={"X-Cat": "meow"}, filter_headers={"X-RateLimit-Remaining": "9"})
+        exchange = self.request()
+        assert exchange.attributes[GATEWAY_RESPONSE_CACHE_ATTR] == "hit"
+        assert exchange.response.headers["X-Cat"] == "meow"
+        assert "X-RateLimit-Remaining" not in exchange.response.headers
+
+    def test_Given_max_age_When_store_Then_cache_it_for_the_max_age(self):
+        self.request(upstream_headers={"Cache-Control": "public, max-age=60", "Vary": "accept"})
+        cached_response = self.gateway_filter.cache.get(("GET", "/cats", (("a", ("1",)), ("b", ("2",))), ("",)))
+        assert cached_response.expires_at - cached_response.stored_at == 60
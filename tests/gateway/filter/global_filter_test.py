@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# standard library
+import asyncio
+from unittest.mock import Mock
+
+# pypi/conda library
+from aiohttp import web
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# scip plugin
+from spring_cloud.commons.http import ClientHttpRequestInterceptor, RestTemplate
+from spring_cloud.gateway.filter import StaticGatewayFilterChain
+from spring_cloud.gateway.filter.global_filter import AsyncRestTemplateRouteFilter
+from spring_cloud.gateway.handler.predicate import TRUE
+from spring_cloud.gateway.route import Route
+from spring_cloud.gateway.server import (
+    GATEWAY_ROUTE_ATTR,
+    DefaultServerWebExchange,
+    ServerHTTPResponse,
+    StaticServerHttpRequest,
+)
+from spring_cloud.gateway.server.utils import GATEWAY_UPSTREAM_TIME_ATTR
+
+
+async def echo(request: web.Request) -> web.Response:
+    body = await request.read()
+    return web.Response(
+        body=f"{request.method} {request.path_qs} {body.decode()}".encode(),
+        headers={"X-Cat": request.headers.get("X-Cat", ""), "Connection": "keep-alive"},
+    )
+
+
+async def slow(request: web.Request) -> web.Response:
+    await asyncio.sleep(0.2)
+    return web.Response(body=b"slow")
+
+
+class PortInterceptor(ClientHttpRequestInterceptor):
+    def __init__(self, port: int):
+        self.port = port
+
+    def intercept(self, http_request):
+        http_request.url = http_request.url.replace("a-cat", f"127.0.0.1:{self.port}")
+
+
+class TestAsyncRestTemplateRouteFilter:
+    async def route(self, exchanges, streaming: bool = False):
+        app = web.Application()
+        app.router.add_route("*", "/slow", slow)
+        app.router.add_route("*", "/{path:.*}", echo)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        route_filter = AsyncRestTemplateRouteFilter(RestTemplate([PortInterceptor(port)]), streaming=streaming)
+        try:
+            await asyncio.gather(*[route_filter.filter(exchange, StaticGatewayFilterChain()) for exchange in exchanges])
+        finally:
+            await route_filter.close()
+            await runner.cleanup()
+
+    @staticmethod
+    def given_exchange(**request) -> DefaultServerWebExchange:
+        handler = Mock()
+        exchange = DefaultServerWebExchange(StaticServerHttpRequest(**request), ServerHTTPResponse(handler))
+        exchange.attributes["handler"] = handler
+        route = Route.Builder().set_route_id("cat").set_uri("http://a-cat").set_predicate(TRUE).build()
+        exchange.attributes[GATEWAY_ROUTE_ATTR] = route
+        return exchange
+
+    def test_Given_request_When_filter_Then_relay_the_upstream_response(self):
+        exchange = self.given_exchange(
+            url_="http://127.0.0.1:8888/cats",
+            method="POST",
+            headers={"X-Cat": "meow"},
+            body=b"hello",
+            query={"name": ["a", "b"]},
+        )
+        asyncio.run(self.route([exchange]))
+
+        status_code, headers, body = exchange.attributes["handler"].write_response.call_args[0]
+        assert status_code == 200
+        assert body == b"POST /cats?name=a&name=b hello"
+        headers = dict(headers)
+        assert headers["X-Cat"] == "meow"
+        assert headers["Content-Length"] == str(len(body))
+        assert "Connection" not in headers
+        assert exchange.attributes[GATEWAY_UPSTREAM_TIME_ATTR] > 0
+
+    def test_Given_slow_upstream_When_filter_many_requests_Then_overlap_the_waits(self):
+        exchanges = [self.given_exchange(url_="http://127.0.0.1:8888/slow") for _ in range(50)]
+
+        loop = asyncio.new_event_loop()
+        try:
+            start = loop.time()
+            loop.run_until_complete(self.route(exchanges))
+            seconds = loop.time() - start
+        finally:
+            loop.close()
+
+        assert all(exchange.response.status_code == 200 for exchange in exchanges)
+        assert seconds < 2
+
+    def test_Given_streaming_When_filter_Then_relay_the_body_stream(self):
+        exchange = self.given_exchange(url_="http://127.0.0.1:8888/cats")
+        chunks = []
+        exchange.attributes["handler"].send_body_stream.side_effect = lambda body_stream, chunked: chunks.extend(
+            body_stream
+        )
+        asyncio.run(self.route([exchange], streaming=True))
+
+        assert b"".join(chunks) == b"GET /cats "
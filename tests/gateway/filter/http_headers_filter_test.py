@@ -9,11 +9,13 @@ from unittest.mock import Mock
 
 # scip plugin
 from spring_cloud.gateway.filter.http_headers_filter import (
+    HEADER_FILTERS,
     ForwardedHeadersFilter,
+    HttpHeadersFilter,
     RemoveHopByHopHeadersFilter,
     XForwardedHeadersFilter,
 )
-from spring_cloud.gateway.server import DefaultServerWebExchange, StaticServerHttpRequest
+from spring_cloud.gateway.server import DefaultServerWebExchange, HttpHeaders, StaticServerHttpRequest
 
 
 def dose_not_contains_key(headers: Dict[str, str], keys: List[str]):
@@ -122,3 +124,26 @@ class TestRemoveHopByHopHeadersFilter:
         self.given_http_request(hop_by_hop_headers)
         headers = self.filter.filter(self.exchange.request.headers, self.exchange)
         assert dose_not_contains_key(headers, self.filter.HEADERS_REMOVED_ON_REQUEST)
+
+    def test_Given_headers_listed_by_Connection_header_When_filter_Then_remove_them(self):
+        self.given_http_request({"Connection": "X-Trace-Hop, close", "x-trace-hop": "1", "X-Kept": "2"})
+        headers = self.filter.filter(self.exchange.request.headers, self.exchange)
+        assert "X-Trace-Hop" not in headers
+        assert headers["X-Kept"] == "2"
+
+
+class TestHttpHeadersFilter:
+    def test_Given_header_filters_When_filter_request_Then_filter_a_copy_of_the_headers(self):
+        original = HttpHeaders([("forwarded", "for=1.2.3.4"), ("Accept", "text/html"), ("Accept", "*/*")])
+        original["Connection"] = "keep-alive"
+        request = StaticServerHttpRequest(url_="http://127.0.0.1:8888/get", headers=original)
+        exchange = DefaultServerWebExchange(request, Mock())
+
+        headers = HttpHeadersFilter.filter_request(HEADER_FILTERS, exchange)
+
+        assert headers.get_all("Accept") == ["text/html", "*/*"]
+        assert headers.get_all("Forwarded") == ['for=1.2.3.4;host="127.0.0.1";proto=http;for="10.0.0.1:51630"']
+        assert headers["X-Forwarded-Port"] == "8888"
+        assert "Connection" not in headers
+        assert original["Connection"] == "keep-alive"
+        assert "X-Forwarded-Port" not in original
@@ -4,25 +4,47 @@ __author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
 __license__ = "Apache 2.0"
 
 # standard library
+import asyncio
+import inspect
+import threading
 from unittest.mock import Mock
 
 # scip plugin
-from spring_cloud.gateway.handler.handler import RoutePredicateHandlerMapping
+from spring_cloud.gateway.filter import (
+    AsyncGatewayFilter,
+    AsyncGlobalFilter,
+    GatewayFilter,
+    GlobalFilter,
+    OrderedGatewayFilter,
+    PhasedGatewayFilter,
+)
+from spring_cloud.gateway.handler.handler import (
+    DefaultAsyncGatewayFilterChain,
+    DefaultGatewayFilterChain,
+    FilteringWebHandler,
+    RoutePredicateHandlerMapping,
+)
 from spring_cloud.gateway.route.builder.route_locator import RouteLocatorBuilder
-from spring_cloud.gateway.server import DefaultServerWebExchange, ServerHTTPResponse, StaticServerHttpRequest
+from spring_cloud.gateway.server import (
+    GATEWAY_ROUTE_ATTR,
+    DefaultServerWebExchange,
+    ServerHTTPResponse,
+    StaticServerHttpRequest,
+)
+from spring_cloud.utils.ordered import Ordered
 
 
 class TestRoutePredicateHandlerMapping:
     def given_routes_with_path_predicate(self, path1: str, path2: str):
         builder = RouteLocatorBuilder()
-        route_locator = (
+        self.route_locator = (
             builder.routes()
             .route(lambda p: p.path(path1).uri("http://a_cat"), "route1")
             .route(lambda p: p.path(path2).uri("http://a_dog"), "route2")
             .build()
         )
         filtering_web_handler = Mock()
-        self.predicate_handler = RoutePredicateHandlerMapping(route_locator)
+        self.predicate_handler = RoutePredicateHandlerMapping(self.route_locator)
 
     def given_http_request(self, url: str):
         request = StaticServerHttpRequest(url_=url)
@@ -47,3 +69,268 @@ class TestRoutePredicateHandlerMapping:
         self.given_http_request("http://localhost:8888/api/users/1")
         route = self.predicate_handler.lookup_route(self.exchange)
         assert route.route_id == "route1"
+
+    def test_Given_many_routes_When_lookup_route_Then_return_the_first_matched_route_as_a_linear_scan(self):
+        builder = RouteLocatorBuilder().routes()
+        for i in range(100):
+            builder.route(lambda p, i=i: p.path(f"/api/{i % 10}/**").uri("http://a_cat"), f"route{i}")
+        builder.route(lambda p: p.path("/api/**").uri("http://a_cat"), "fallback")
+        route_locator = builder.build()
+        indexed_mapping = RoutePredicateHandlerMapping(route_locator)
+        linear_mapping = RoutePredicateHandlerMapping(route_locator, indexed=False)
+        for path in ["/api/3/cats", "/api/9", "/api/10", "/cats"]:
+            self.given_http_request(f"http://localhost:8888{path}")
+            assert indexed_mapping.lookup_route(self.exchange) is linear_mapping.lookup_route(self.exchange)
+
+    def test_Given_routes_changed_When_lookup_route_Then_rebuild_the_index(self):
+        self.given_routes_with_path_predicate(path1="/users", path2="/api")
+        self.given_http_request("http://localhost:8888/cats")
+        assert self.predicate_handler.lookup_route(self.exchange) is None
+        routes = self.route_locator.get_routes()
+        new_route_locator = RouteLocatorBuilder().routes().route(lambda p: p.path("/cats").uri("http://a_cat")).build()
+        routes.append(new_route_locator.get_routes()[0])
+        assert self.predicate_handler.lookup_route(self.exchange) is routes[-1]
+
+
+class TestRoutePredicateHandlerMappingCache:
+    def given_routes(self, *route_functions):
+        builder = RouteLocatorBuilder().routes()
+        for i, f_ in enumerate(route_functions):
+            builder.route(lambda p, f_=f_: f_(p).uri("http://a_cat"), f"route{i}")
+        self.route_locator = builder.build()
+        self.predicate_handler = RoutePredicateHandlerMapping(self.route_locator, cache_size=2)
+        self.route_cache = self.predicate_handler.route_cache
+
+    def lookup_route(self, url: str, cookies=None, headers=None):
+        request = StaticServerHttpRequest(url_=url, cookies=cookies or {}, headers=headers or {})
+        exchange = DefaultServerWebExchange(request, ServerHTTPResponse(Mock()))
+        return self.predicate_handler.lookup_route(exchange)
+
+    def test_Given_path_routes_When_lookup_the_same_path_Then_hit_the_cache(self):
+        self.given_routes(lambda p: p.path("/cats/**"), lambda p: p.path("/dogs/**"))
+        assert self.lookup_route("http://localhost:8888/dogs/1").route_id == "route1"
+        assert self.lookup_route("http://localhost:8888/dogs/1").route_id == "route1"
+        assert self.lookup_route("http://localhost:8888/birds") is None
+        assert self.lookup_route("http://localhost:8888/birds") is None
+        assert (self.route_cache.hits, self.route_cache.misses) == (2, 2)
+
+    def test_Given_cookie_route_tested_When_lookup_the_same_path_Then_not_cache_it(self):
+        self.given_routes(lambda p: p.path("/cats/**").and_().cookie("cat", "meow"), lambda p: p.path("/cats/**"))
+        assert self.lookup_route("http://localhost:8888/cats/1").route_id == "route1"
+        assert self.lookup_route("http://localhost:8888/cats/1", {"cat": "meow"}).route_id == "route0"
+        assert len(self.route_cache) == 0
+
+    def test_Given_routes_changed_When_lookup_route_Then_flush_the_cache(self):
+        self.given_routes(lambda p: p.path("/cats/**"))
+        assert self.lookup_route("http://localhost:8888/dogs") is None
+        routes = self.route_locator.get_routes()
+        new_route_locator = RouteLocatorBuilder().routes().route(lambda p: p.path("/dogs").uri("http://a_dog")).build()
+        routes.insert(0, new_route_locator.get_routes()[0])
+        assert self.lookup_route("http://localhost:8888/dogs") is routes[0]
+
+    def test_Given_full_cache_When_lookup_new_path_Then_evict_the_least_recently_used(self):
+        self.given_routes(lambda p: p.path("/**"))
+        for path in ["/a", "/b", "/a", "/c", "/a", "/b"]:
+            self.lookup_route(f"http://localhost:8888{path}")
+        assert (self.route_cache.hits, self.route_cache.misses) == (2, 4)
+
+    def test_Given_host_routes_When_lookup_the_same_path_of_other_hosts_Then_cache_them_apart(self):
+        self.given_routes(lambda p: p.host("**.cats.org").and_().path("/api/**"), lambda p: p.path("/api/**"))
+        assert self.lookup_route("http://localhost:8888/api/1", headers={"Host": "www.dogs.org"}).route_id == "route1"
+        assert self.lookup_route("http://localhost:8888/api/1", headers={"Host": "www.cats.org"}).route_id == "route0"
+        assert self.lookup_route("http://localhost:8888/api/1", headers={"Host": "www.cats.org"}).route_id == "route0"
+        assert (self.route_cache.hits, self.route_cache.misses) == (1, 2)
+
+
+class RecordingFilter(GatewayFilter, GlobalFilter):
+    def __init__(self, name: str):
+        self.name = name
+
+    def filter(self, exchange, chain):
+        exchange.attributes.setdefault("filtered", []).append(self.name)
+        return chain.filter(exchange)
+
+
+class OrderedRecordingFilter(RecordingFilter, Ordered):
+    def __init__(self, name: str, order: int):
+        super().__init__(name)
+        self.order = order
+
+    def get_order(self) -> int:
+        return self.order
+
+
+class TestFilteringWebHandler:
+    def given_route(self, *gateway_filters):
+        route_locator = (
+            RouteLocatorBuilder()
+            .routes()
+            .route(lambda p: p.path("/**").filters(lambda f: f.filters(list(gateway_filters))).uri("http://a_cat"))
+            .build()
+        )
+        self.route = route_locator.get_routes()[0]
+
+    def handle(self) -> list:
+        exchange = DefaultServerWebExchange(StaticServerHttpRequest(), ServerHTTPResponse(Mock()))
+        exchange.attributes[GATEWAY_ROUTE_ATTR] = self.route
+        self.web_handler.handle(exchange)
+        return exchange.attributes["filtered"]
+
+    def test_Given_unordered_filters_When_handle_Then_run_the_route_filters_before_the_global_filters(self):
+        self.given_route(RecordingFilter("a"), RecordingFilter("b"))
+        self.web_handler = FilteringWebHandler([RecordingFilter("global")])
+        assert self.handle() == ["a", "b", "global"]
+
+    def test_Given_ordered_filters_When_handle_Then_sort_them_by_order(self):
+        self.given_route(RecordingFilter("a"), OrderedGatewayFilter(RecordingFilter("first"), -1))
+        self.web_handler = FilteringWebHandler(
+            [OrderedRecordingFilter("last", Ordered.LOWEST_PRECEDENCE), OrderedRecordingFilter("second", 0)]
+        )
+        assert self.handle() == ["first", "second", "a", "last"]
+
+    def test_Given_many_requests_When_handle_Then_run_each_filter_once_per_request(self):
+        self.given_route(RecordingFilter("a"))
+        self.web_handler = FilteringWebHandler([RecordingFilter("global")])
+        for _ in range(3):
+            assert self.handle() == ["a", "global"]
+        assert len(self.route.filters) == 1
+        assert self.web_handler.get_filters(self.route) is self.web_handler.get_filters(self.route)
+
+
+class RecordingPhasedFilter(PhasedGatewayFilter):
+    def __init__(self, name: str, end_chain: bool = False):
+        self.name = name
+        self.end_chain = end_chain
+
+    def pre(self, exchange):
+        exchange.attributes.setdefault("filtered", []).append(f"pre-{self.name}")
+        exchange.attributes.setdefault("stack_depths", []).append(len(inspect.stack(0)))
+        return None if self.end_chain else exchange
+
+    def post(self, exchange):
+        exchange.attributes["filtered"].append(f"post-{self.name}")
+
+
+class RetryingFilter(GatewayFilter):
+    def filter(self, exchange, chain):
+        chain.filter(exchange)
+        chain.filter(exchange)
+
+
+class TestDefaultGatewayFilterChain:
+    def filter(self, *gateway_filters) -> DefaultServerWebExchange:
+        exchange = DefaultServerWebExchange(StaticServerHttpRequest(), ServerHTTPResponse(Mock()))
+        DefaultGatewayFilterChain(gateway_filters).filter(exchange)
+        return exchange
+
+    def test_Given_phased_filters_When_filter_Then_run_the_pre_hooks_in_order_and_the_post_hooks_in_reverse(self):
+        exchange = self.filter(RecordingPhasedFilter("a"), RecordingPhasedFilter("b"), RecordingFilter("c"))
+        assert exchange.attributes["filtered"] == ["pre-a", "pre-b", "c", "post-b", "post-a"]
+
+    def test_Given_many_phased_filters_When_filter_Then_keep_the_stack_depth_constant(self):
+        exchange = self.filter(*[RecordingPhasedFilter(str(i)) for i in range(50)])
+        assert len(set(exchange.attributes["stack_depths"])) == 1
+
+    def test_Given_pre_hook_ends_the_chain_When_filter_Then_skip_the_rest_but_run_the_post_hooks(self):
+        exchange = self.filter(
+            RecordingPhasedFilter("a"), RecordingPhasedFilter("b", end_chain=True), RecordingFilter("c")
+        )
+        assert exchange.attributes["filtered"] == ["pre-a", "pre-b", "post-b", "post-a"]
+
+    def test_Given_filter_calls_the_chain_twice_When_filter_Then_run_the_rest_twice(self):
+        exchange = self.filter(RecordingPhasedFilter("a"), RetryingFilter(), RecordingPhasedFilter("b"))
+        assert exchange.attributes["filtered"] == ["pre-a", "pre-b", "post-b", "pre-b", "post-b", "post-a"]
+
+    def test_Given_compiled_filters_When_filter_Then_call_back_the_chains_created_once(self):
+        chains = []
+        gateway_filter = Mock(spec=GatewayFilter)
+        gateway_filter.filter.side_effect = lambda exchange, chain: chains.append(chain)
+        compiled_filters = DefaultGatewayFilterChain.Filters([RecordingPhasedFilter("a"), gateway_filter])
+
+        for _ in range(2):
+            exchange = DefaultServerWebExchange(StaticServerHttpRequest(), ServerHTTPResponse(Mock()))
+            compiled_filters.chains[0].filter(exchange)
+        assert chains == [compiled_filters.chains[2]] * 2
+
+
+class AsyncRecordingFilter(AsyncGatewayFilter, AsyncGlobalFilter):
+    def __init__(self, name: str):
+        self.name = name
+
+    async def filter(self, exchange, chain):
+        await asyncio.sleep(0)
+        exchange.attributes.setdefault("filtered", []).append(self.name)
+        return await chain.filter(exchange)
+
+
+class ThreadRecordingFilter(GatewayFilter):
+    def filter(self, exchange, chain):
+        exchange.attributes["sync_filter_thread"] = threading.current_thread()
+        return chain.filter(exchange)
+
+
+class TestDefaultAsyncGatewayFilterChain:
+    def filter(self, *gateway_filters) -> DefaultServerWebExchange:
+        exchange = DefaultServerWebExchange(StaticServerHttpRequest(), ServerHTTPResponse(Mock()))
+        compiled_filters = DefaultGatewayFilterChain.Filters(gateway_filters)
+        asyncio.run(DefaultAsyncGatewayFilterChain(compiled_filters).filter(exchange))
+        return exchange
+
+    def test_Given_mixed_filters_When_filter_Then_run_them_in_order(self):
+        exchange = self.filter(
+            RecordingPhasedFilter("a"),
+            AsyncRecordingFilter("b"),
+            RecordingFilter("c"),
+            AsyncRecordingFilter("d"),
+            RecordingFilter("e"),
+        )
+        assert exchange.attributes["filtered"] == ["pre-a", "b", "c", "d", "e", "post-a"]
+
+    def test_Given_sync_filter_When_filter_Then_run_it_off_the_event_loop(self):
+        exchange = self.filter(AsyncRecordingFilter("a"), ThreadRecordingFilter(), AsyncRecordingFilter("b"))
+        assert exchange.attributes["filtered"] == ["a", "b"]
+        assert exchange.attributes["sync_filter_thread"] is not threading.current_thread()
+
+    def test_Given_pre_hook_ends_the_chain_When_filter_Then_skip_the_async_filters(self):
+        exchange = self.filter(RecordingPhasedFilter("a", end_chain=True), AsyncRecordingFilter("b"))
+        assert exchange.attributes["filtered"] == ["pre-a", "post-a"]
+
+    def test_Given_filter_calls_the_chain_twice_When_filter_Then_run_the_rest_twice(self):
+        exchange = self.filter(RetryingFilter(), AsyncRecordingFilter("a"))
+        assert exchange.attributes["filtered"] == ["a", "a"]
+
+    def test_Given_compiled_filters_Then_tell_where_the_async_filters_end(self):
+        compiled_filters = DefaultGatewayFilterChain.Filters(
+            [AsyncRecordingFilter("a"), RecordingFilter("b"), AsyncRecordingFilter("c"), RecordingFilter("d")]
+        )
+        assert compiled_filters.asynchronous == (True, False, True, False)
+        assert compiled_filters.asynchronous_until == 3
+        assert DefaultGatewayFilterChain.Filters([RecordingFilter("a")]).asynchronous_until == 0
+
+
+class TestFilteringWebHandlerWithAsyncFilters:
+    def setup_method(self):
+        route_locator = (
+            RouteLocatorBuilder()
+            .routes()
+            .route(lambda p: p.path("/**").filters(lambda f: f.filter(RecordingFilter("a"))).uri("http://a_cat"))
+            .build()
+        )
+        self.route = route_locator.get_routes()[0]
+        self.web_handler = FilteringWebHandler([AsyncRecordingFilter("global")])
+
+    def given_exchange(self) -> DefaultServerWebExchange:
+        exchange = DefaultServerWebExchange(StaticServerHttpRequest(), ServerHTTPResponse(Mock()))
+        exchange.attributes[GATEWAY_ROUTE_ATTR] = self.route
+        return exchange
+
+    def test_Given_async_global_filter_When_handle_async_Then_await_it(self):
+        exchange = self.given_exchange()
+        asyncio.run(self.web_handler.handle_async(exchange))
+        assert exchange.attributes["filtered"] == ["a", "global"]
+
+    def test_Given_async_global_filter_When_handle_Then_run_it_on_the_handlers_loop(self):
+        for _ in range(2):
+            exchange = self.given_exchange()
+            self.web_handler.handle(exchange)
+            assert exchange.attributes["filtered"] == ["a", "global"]
@@ -7,8 +7,22 @@ __author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
 __license__ = "Apache 2.0"
 
 # scip plugin
-from spring_cloud.gateway.handler.predicate.core import AfterRoutePredicate, CookieRoutePredicate, PathRoutePredicate
-from spring_cloud.gateway.server import DefaultServerWebExchange, ServerHTTPResponse, StaticServerHttpRequest
+from spring_cloud.gateway.handler.predicate.core import (
+    AfterRoutePredicate,
+    CookieRoutePredicate,
+    HeaderRoutePredicate,
+    HostRoutePredicate,
+    MethodRoutePredicate,
+    PathRoutePredicate,
+    QueryRoutePredicate,
+)
+from spring_cloud.gateway.server import (
+    DefaultServerWebExchange,
+    HttpHeaders,
+    ServerHTTPResponse,
+    StaticServerHttpRequest,
+    get_uri_template_variables,
+)
 
 
 class TestAfterRoutePredicate:
@@ -59,6 +73,21 @@ class TestPathRoutePredicate:
         self.given_http_request_url("http://localhost:8888/api/messages")
         assert not self.predicate.test(self.exchange)
 
+    def test_When_test_many_times_Then_parse_the_pattern_only_once(self, mocker):
+        parse = mocker.patch("spring_cloud.gateway.handler.predicate.core.PathPatternParser.parse")
+        self.given_config_pattern("/api/users/**")
+        self.given_http_request_url("http://localhost:8888/api/users/1")
+        for _ in range(3):
+            self.predicate.test(self.exchange)
+        parse.assert_called_once_with("/api/users/**")
+
+    def test_Given_pattern_with_variables_When_match_Then_capture_them_into_the_exchange(self):
+        self.given_config_pattern("/api/users/{user_id}/{*rest}")
+        self.given_http_request_url("http://localhost:8888/api/users/1/messages/2")
+        assert self.predicate.test(self.exchange)
+        assert get_uri_template_variables(self.exchange) == {"user_id": "1", "rest": "/messages/2"}
+        assert not self.predicate.pure
+
 
 class TestCookieRoutePredicate:
     def given_config_cookie(self, cookie_name, cookie_value):
@@ -95,3 +124,75 @@ class TestCookieRoutePredicate:
         self.given_config_cookie("my_cookie", "ch.p")
         self.give_http_cookies()
         assert not self.predicate.test(self.exchange)
+
+
+def given_exchange(**kwargs) -> DefaultServerWebExchange:
+    return DefaultServerWebExchange(StaticServerHttpRequest(**kwargs), ServerHTTPResponse(Mock()))
+
+
+class TestHostRoutePredicate:
+    def given_patterns(self, *patterns):
+        self.predicate = HostRoutePredicate(HostRoutePredicate.Config(list(patterns)))
+
+    def host_matches(self, host: str) -> bool:
+        return self.predicate.test(given_exchange(headers=HttpHeaders({"host": host})))
+
+    def test_Given_exact_host_When_test_Then_ignore_the_case_and_the_port(self):
+        self.given_patterns("api.example.org")
+        assert self.host_matches("API.example.org:8080")
+        assert not self.host_matches("www.example.org")
+
+    def test_Given_globs_When_test_Then_star_matches_a_label_and_double_star_matches_any_labels(self):
+        self.given_patterns("*.cats.org", "**.dogs.org")
+        assert self.host_matches("www.cats.org")
+        assert not self.host_matches("a.www.cats.org")
+        assert not self.host_matches("cats.org")
+        assert self.host_matches("dogs.org")
+        assert self.host_matches("a.b.dogs.org")
+        assert not self.host_matches("hotdogs.org")
+
+    def test_Given_patterns_Then_publish_the_host_suffixes(self):
+        self.given_patterns("*.cats.org", "**.dogs.org")
+        assert self.predicate.host_suffixes == ("cats.org", "dogs.org")
+        self.given_patterns("cats.*")
+        assert self.predicate.host_suffixes is None
+
+    def test_Given_no_host_header_When_test_Then_return_F(self):
+        self.given_patterns("*.cats.org")
+        assert not self.predicate.test(given_exchange())
+
+
+class TestMethodRoutePredicate:
+    def test_Given_methods_When_test_Then_match_them_case_insensitively(self):
+        predicate = MethodRoutePredicate(MethodRoutePredicate.Config(["get", "POST"]))
+        assert predicate.methods == {"GET", "POST"}
+        assert predicate.test(given_exchange(method="post"))
+        assert not predicate.test(given_exchange(method="DELETE"))
+        assert predicate.pure
+
+
+class TestHeaderRoutePredicate:
+    def test_Given_regexp_When_test_Then_match_any_value(self):
+        predicate = HeaderRoutePredicate(HeaderRoutePredicate.Config("X-Request-Id", r"\d+"))
+        headers = HttpHeaders([("x-request-id", "cat"), ("X-Request-Id", "123")])
+        assert predicate.test(given_exchange(headers=headers))
+        assert not predicate.test(given_exchange(headers=HttpHeaders({"X-Request-Id": "cat"})))
+        assert not predicate.pure
+
+    def test_Given_no_regexp_When_test_Then_match_the_presence(self):
+        predicate = HeaderRoutePredicate(HeaderRoutePredicate.Config("X-Cat"))
+        assert predicate.test(given_exchange(headers={"X-Cat": ""}))
+        assert not predicate.test(given_exchange(headers={}))
+
+
+class TestQueryRoutePredicate:
+    def test_Given_regexp_When_test_Then_match_any_value(self):
+        predicate = QueryRoutePredicate(QueryRoutePredicate.Config("color", "gree."))
+        assert predicate.test(given_exchange(query={"color": ["red", "green"]}))
+        assert not predicate.test(given_exchange(query={"color": ["red"]}))
+        assert not predicate.test(given_exchange(query={}))
+
+    def test_Given_no_regexp_When_test_Then_match_the_presence(self):
+        predicate = QueryRoutePredicate(QueryRoutePredicate.Config("debug"))
+        assert predicate.test(given_exchange(query={"debug": [""]}))
+        assert not predicate.test(given_exchange(query={"color": ["red"]}))
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+# standard library
+import itertools
+import random
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# scip plugin
+from spring_cloud.gateway.handler.predicate import AND, FALSE, NOT, OR, TRUE, Predicate
+from spring_cloud.gateway.handler.predicate.operator_gateway_predicate import (
+    AndGatewayPredicate,
+    NegateGatewayPredicate,
+    OrGatewayPredicate,
+)
+from spring_cloud.gateway.handler.predicate.optimizer import optimize
+
+
+class StubPredicate(Predicate):
+    """
+    Tests the value of its name in the given dict.
+    """
+
+    def __init__(self, name: str, cost: float = 10, side_effect_free: bool = True):
+        self.name = name
+        self.cost = cost
+        self.side_effect_free = side_effect_free
+
+    def test(self, obj) -> bool:
+        return obj[self.name]
+
+    def __str__(self):
+        return self.name
+
+
+a, b, c, d = StubPredicate("a", 1), StubPredicate("b", 2), StubPredicate("c", 3), StubPredicate("d", 4)
+
+
+class TestOptimizer:
+    def test_Given_nested_and_When_optimize_Then_flatten(self):
+        predicate = optimize(AND(AND(a, b), AND(c, d)))
+        assert isinstance(predicate, AndGatewayPredicate)
+        assert predicate.predicates == (a, b, c, d)
+
+    def test_Given_negated_and_When_optimize_Then_push_the_negation_down(self):
+        predicate = optimize(NOT(AND(a, OR(b, NOT(c)))))
+        assert str(predicate) == "(!a || (!b && c))"
+
+    def test_Given_double_negation_When_optimize_Then_cancel_it(self):
+        assert optimize(NOT(NOT(a))) is a
+
+    def test_Given_operands_When_optimize_Then_sort_them_by_cost(self):
+        predicate = optimize(OR(AND(c, AND(b, a)), d))
+        assert str(predicate) == "(d || (a && b && c))"
+        assert predicate.left is d
+        assert predicate.right.predicates == (a, b, c)
+
+    def test_Given_constants_When_optimize_Then_fold_them(self):
+        assert optimize(AND(a, TRUE)) is a
+        assert optimize(AND(a, FALSE)) is FALSE
+        assert optimize(OR(a, NOT(FALSE))) is TRUE
+        assert optimize(NOT(AND(TRUE, TRUE))) is FALSE
+
+    def test_Given_operand_with_side_effects_When_optimize_Then_keep_the_order(self):
+        capturing = StubPredicate("capturing", 1, side_effect_free=False)
+        predicate = optimize(AND(AND(d, capturing), FALSE))
+        assert isinstance(predicate, AndGatewayPredicate)
+        assert predicate.predicates == (d, capturing, FALSE)
+
+    def test_Given_random_trees_When_optimize_Then_evaluate_the_same(self):
+        rand = random.Random(0)
+        leaves = [a, b, c, d, TRUE, FALSE]
+
+        def random_tree(depth: int) -> Predicate:
+            if depth == 0 or rand.random() < 0.3:
+                return rand.choice(leaves)
+            operator = rand.choice([AND, OR, NOT])
+            if operator is NOT:
+                return NOT(random_tree(depth - 1))
+            return operator(random_tree(depth - 1), random_tree(depth - 1))
+
+        for _ in range(200):
+            predicate = random_tree(4)
+            optimized = optimize(predicate)
+            for values in itertools.product([True, False], repeat=4):
+                obj = dict(zip("abcd", values))
+                assert optimized.test(obj) == predicate.test(obj), f"{optimized} != {predicate}"
+
+    def test_Given_negated_leaf_When_optimize_Then_keep_the_negation(self):
+        predicate = optimize(NOT(a))
+        assert isinstance(predicate, NegateGatewayPredicate)
+        assert predicate.p is a
+
+    def test_Given_n_ary_or_When_view_as_binary_Then_right_combines_the_rest(self):
+        predicate = OrGatewayPredicate(a, b, c)
+        assert predicate.left is a
+        assert isinstance(predicate.right, OrGatewayPredicate)
+        assert predicate.right.predicates == (b, c)
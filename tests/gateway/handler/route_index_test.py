@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# scip plugin
+from spring_cloud.gateway.handler.route_index import RouteIndex, host_suffixes, path_prefixes, route_methods
+from spring_cloud.gateway.route.builder.route_locator import RouteLocatorBuilder
+
+
+class TestRouteIndex:
+    def given_routes(self, *route_functions):
+        builder = RouteLocatorBuilder().routes()
+        for i, f_ in enumerate(route_functions):
+            builder.route(lambda p, f_=f_: f_(p).uri("http://a_cat"), f"route{i}")
+        self.routes = builder.build().get_routes()
+        self.route_index = RouteIndex(tuple(self.routes))
+
+    def candidate_ids(self, path: str, method: str = None, host: str = None):
+        return [route.route_id for route in self.route_index.candidates(path, method, host)]
+
+    def test_Given_path_routes_When_candidates_Then_only_the_routes_on_the_path(self):
+        self.given_routes(
+            lambda p: p.path("/api/users/**"), lambda p: p.path("/api/messages"), lambda p: p.path("/api/**"),
+        )
+        assert self.candidate_ids("/api/users/1") == ["route0", "route2"]
+        assert self.candidate_ids("/api/messages") == ["route1", "route2"]
+        assert self.candidate_ids("/cats") == []
+
+    def test_Given_not_indexable_routes_When_candidates_Then_keep_them_in_their_order(self):
+        self.given_routes(
+            lambda p: p.cookie("cat", "meow"),
+            lambda p: p.path("/api/users/**"),
+            lambda p: p.path("/api/users/**").negate_(),
+            lambda p: p.path("/cats"),
+        )
+        assert self.candidate_ids("/api/users/1") == ["route0", "route1", "route2"]
+        assert self.candidate_ids("/dogs") == ["route0", "route2"]
+
+    def test_Given_or_of_paths_When_candidates_Then_test_the_route_only_once(self):
+        self.given_routes(lambda p: p.path("/cats/**").or_().path("/cats/kittens/**"))
+        assert self.candidate_ids("/cats/kittens/1") == ["route0"]
+        assert self.candidate_ids("/dogs") == []
+
+    def test_Given_and_of_path_and_cookie_When_path_prefixes_Then_indexed_by_the_path(self):
+        self.given_routes(lambda p: p.cookie("cat", "meow").and_().path("/cats/**"))
+        assert path_prefixes(self.routes[0].predicate) == [("cats",)]
+        assert self.candidate_ids("/dogs") == []
+
+    def test_Given_method_routes_When_candidates_Then_prune_the_other_methods(self):
+        self.given_routes(
+            lambda p: p.method("GET").and_().path("/cats/**"),
+            lambda p: p.method("POST", "PUT").and_().method("PUT"),
+            lambda p: p.method("GET").negate_(),
+        )
+        assert route_methods(self.routes[1].predicate) == {"PUT"}
+        assert self.candidate_ids("/cats/1", "GET") == ["route0", "route2"]
+        assert self.candidate_ids("/cats/1", "PUT") == ["route1", "route2"]
+        assert self.candidate_ids("/cats/1") == ["route0", "route1", "route2"]
+
+    def test_Given_host_routes_When_candidates_Then_prune_the_other_hosts(self):
+        self.given_routes(
+            lambda p: p.host("**.cats.org").or_().host("cats.com"),
+            lambda p: p.host("dogs.*"),
+            lambda p: p.host("*.dogs.org").and_().path("/dogs/**"),
+        )
+        assert host_suffixes(self.routes[0].predicate) == ("cats.org", "cats.com")
+        assert self.candidate_ids("/dogs/1", host="cats.org") == ["route0", "route1"]
+        assert self.candidate_ids("/dogs/1", host="www.dogs.org") == ["route1", "route2"]
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+The micro-benchmark of the compiled path pattern matcher against walking the element chain.
+
+Usage:
+    python -m tests.gateway.pathpattern.matcher_benchmark
+"""
+# standard library
+import random
+import timeit
+
+__author__ = "Waterball (johnny850807@gmail.com)"
+__license__ = "Apache 2.0"
+
+# scip plugin
+from spring_cloud.gateway.pathpattern import PathContainer, PathPatternParser
+
+PATTERNS = [
+    "/api/users/**",
+    "/api/users",
+    "/api/v1/orders/**",
+    "/api/v1/orders/items",
+    "/api/v2/payments/**",
+    "/static/**",
+    "/health",
+    "/api/messages/inbox",
+]
+
+
+def realistic_paths(count: int, seed: int = 0):
+    rand = random.Random(seed)
+    resources = ["users", "orders", "payments", "messages", "items", "inbox", "static", "health"]
+    paths = []
+    for _ in range(count):
+        depth = rand.randint(1, 6)
+        segments = [rand.choice(["api", "static", "health"])]
+        segments += [rand.choice(resources + ["v1", "v2", str(rand.randint(1, 10 ** 6))]) for _ in range(depth)]
+        paths.append("/" + "/".join(segments))
+    return paths
+
+
+def match_by_element_chain(path_patterns, paths):
+    for path in paths:
+        for path_pattern in path_patterns:
+            path_pattern.matches(path_container=PathContainer.from_path(path, path_pattern.separator))
+
+
+def match_by_compiled_regex(path_patterns, paths):
+    for path in paths:
+        for path_pattern in path_patterns:
+            path_pattern.matches(path=path)
+
+
+def main(number: int = 20):
+    path_patterns = [PathPatternParser.parse(pattern) for pattern in PATTERNS]
+    paths = realistic_paths(1000)
+    matches = len(path_patterns) * len(paths)
+    for name, benchmark in [("element chain", match_by_element_chain), ("compiled regex", match_by_compiled_regex)]:
+        seconds = min(timeit.repeat(lambda: benchmark(path_patterns, paths), number=number, repeat=3)) / number
+        print(f"{name:>15}: {seconds / matches * 1e9:8.1f} ns/match")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,14 @@
 # -*- coding: utf-8 -*-
+# pypi/conda library
+import pytest
+
 # scip plugin
 from spring_cloud.gateway.pathpattern import (
     LiteralPathElement,
+    PathContainer,
     PathElement,
     PathPatternParser,
+    PatternParserException,
     SeparatorPathElement,
     WildcardTheRestPathElement,
 )
@@ -67,3 +72,79 @@ class TestParser:
         self.should_not_match("/api/messages")
         self.should_not_match("/api/api/users")
         self.should_not_match("/apiusers")
+
+    def test_identical_patterns_share_one_parsed_pattern(self):
+        assert parser.parse("/api/users/**") is parser.parse("/api/users/**")
+        assert parser.parse("/api/users/**") is not parser.parse("/api/users")
+
+    def test_Given_cache_cleared_When_parse_Then_parse_again(self):
+        path_pattern = parser.parse("/api/orders")
+        PathPatternParser.clear_cache()
+        assert parser.parse("/api/orders") is not path_pattern
+        assert parser.parse("/api/orders").matches(path="/api/orders")
+
+    def test_compiled_regex_matches_as_the_element_chain(self):
+        paths = ["/", "/api", "/api/users", "/api/users/", "/api/users/1/2", "/api/userss", "/apiusers", "/x/api/users"]
+        for pattern in ["/api/users", "/api/users/**", "/**", "/api/users/1"]:
+            self.given_pattern(pattern)
+            for path in paths:
+                path_container = PathContainer.from_path(path)
+                assert self.path_pattern.matches(path=path) == self.path_pattern.matches(path_container=path_container)
+
+    def test_trailing_separator_pattern(self):
+        self.given_pattern("/")
+        self.should_match("/")
+        self.should_not_match("/api")
+
+    def should_extract(self, path: str, variables: dict):
+        assert self.path_pattern.match_and_extract(path) == variables
+
+    def test_wildcard_segment(self):
+        self.given_pattern("/api/*/messages")
+        self.should_match("/api/users/messages")
+        self.should_not_match("/api//messages")
+        self.should_not_match("/api/users/1/messages")
+
+    def test_capture_variable(self):
+        self.given_pattern("/api/users/{user_id}/messages/{message_id}")
+        self.should_extract("/api/users/1/messages/2", {"user_id": "1", "message_id": "2"})
+        self.should_not_match("/api/users//messages/2")
+        self.should_not_match("/api/users/1/2/messages/3")
+
+    def test_capture_variable_with_regex(self):
+        self.given_pattern("/api/users/{user_id:[0-9]{1,3}}")
+        self.should_extract("/api/users/123", {"user_id": "123"})
+        self.should_not_match("/api/users/1234")
+        self.should_not_match("/api/users/cat")
+
+    def test_Given_regex_spanning_segments_When_match_Then_capture_only_within_a_segment(self):
+        self.given_pattern("/files/{name:.+}")
+        self.should_extract("/files/cat.png", {"name": "cat.png"})
+        self.should_not_match("/files/cats/cat.png")
+
+    def test_segment_mixing_literals_wildcards_and_variables(self):
+        self.given_pattern("/files/{name}.{extension}")
+        self.should_extract("/files/cat.tar.gz", {"name": "cat.tar", "extension": "gz"})
+        self.should_not_match("/files/cat")
+        self.given_pattern("/static/*.js")
+        self.should_match("/static/app.js")
+        self.should_not_match("/static/app.css")
+
+    def test_capture_the_rest(self):
+        self.given_pattern("/static/{*path}")
+        self.should_extract("/static", {"path": ""})
+        self.should_extract("/static/images/cat.png", {"path": "/images/cat.png"})
+        self.should_not_match("/statics/cat.png")
+
+    def test_extended_patterns_match_as_the_element_chain(self):
+        paths = ["/api/users/1", "/api/users/1/messages", "/api/users/", "/api/users/cat.js", "/api"]
+        for pattern in ["/api/*/{id}", "/api/users/{id:[0-9]+}", "/api/users/*.js", "/api/{*rest}"]:
+            self.given_pattern(pattern)
+            for path in paths:
+                path_container = PathContainer.from_path(path)
+                assert self.path_pattern.matches(path=path) == self.path_pattern.matches(path_container=path_container)
+
+    @pytest.mark.parametrize("pattern", ["/api/{*rest}/users", "/api{*rest}", "/{id}/{id}", "/{id", "/id}", "/{1d}"])
+    def test_Given_invalid_pattern_When_parse_Then_raise(self, pattern):
+        with pytest.raises(PatternParserException):
+            parser.parse(pattern)
@@ -6,6 +6,7 @@ __license__ = "Apache 2.0"
 # standard library
 from datetime import datetime
 from typing import List
+from unittest.mock import Mock
 
 # scip plugin
 from spring_cloud.commons.helpers import NaiveCacheManager
@@ -14,6 +15,7 @@ from spring_cloud.gateway.route import Route
 from spring_cloud.gateway.route.builder.route_locator import (
     CachingRouteLocator,
     CompositeRouteLocator,
+    RefreshableRouteLocator,
     RouteLocator,
     RouteLocatorBuilder,
     StaticRouteLocator,
@@ -66,6 +68,37 @@ class TestCachingRouteLocator:
             assert results[0].uri == "uri-1"
         assert self.delegate.call_count == 1
 
+    def test_Given_cache_When_refresh_Then_delegate_again(self):
+        self.locator.get_routes()
+        call_count = self.delegate.call_count
+        self.locator.refresh()
+        self.locator.get_routes()
+        assert self.delegate.call_count == call_count + 1
+
+
+class TestRefreshableRouteLocator:
+    def given_locator(self):
+        self.delegate = Mock(spec=RouteLocator)
+        self.delegate.get_routes.return_value = [route(1)]
+        self.locator = RefreshableRouteLocator(self.delegate)
+
+    def test_Given_routes_changed_When_refresh_Then_swap_the_table_as_a_whole(self):
+        self.given_locator()
+        table = self.locator.get_routes()
+        self.delegate.get_routes.return_value = [route(2), route(3)]
+        assert self.locator.get_routes() is table
+        assert self.locator.refresh()
+        assert [r.route_id for r in self.locator.get_routes()] == [2, 3]
+        assert [r.route_id for r in table] == [1]
+        assert isinstance(self.locator.get_routes(), tuple)
+
+    def test_Given_refresh_fails_When_refresh_Then_keep_the_current_table(self):
+        self.given_locator()
+        table = self.locator.get_routes()
+        self.delegate.get_routes.side_effect = ValueError("malformed routes")
+        assert not self.locator.refresh()
+        assert self.locator.get_routes() is table
+
 
 class TestRouteLocatorBuilder:
     def given_route_locator_builder(self):
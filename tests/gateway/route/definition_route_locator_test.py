@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# standard library
+import time
+from datetime import datetime
+
+# pypi/conda library
+import pytest
+
+# scip plugin
+from spring_cloud.gateway.filter.factory.core import (
+    PrefixPathGatewayFilter,
+    PrefixPathGatewayFilterFactory,
+    ResponseCompressionGatewayFilterFactory,
+)
+from spring_cloud.gateway.handler.predicate import TRUE
+from spring_cloud.gateway.handler.predicate.core import AfterRoutePredicateFactory, PathRoutePredicate
+from spring_cloud.gateway.route.definition import FileRouteDefinitionLocator, StaticRouteDefinitionLocator
+from spring_cloud.gateway.route.definition_route_locator import RouteDefinitionRouteLocator
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+
+def route_locator(*routes) -> RouteDefinitionRouteLocator:
+    return RouteDefinitionRouteLocator(StaticRouteDefinitionLocator(FileRouteDefinitionLocator.parse(list(routes))))
+
+
+def route(route_id, pattern="/api/**", prefix="/v1"):
+    return {
+        "id": route_id,
+        "uri": f"http://{route_id}",
+        "order": 1,
+        "predicates": [{"name": "Path", "args": {"pattern": pattern}}],
+        "filters": [{"name": "PrefixPath", "args": {"prefix": prefix}}],
+        "metadata": {"team": "cats"},
+    }
+
+
+class TestRouteDefinitionRouteLocator:
+    def test_Given_definition_When_get_routes_Then_compile_it(self):
+        routes = route_locator(route("users", "/api/users/**")).get_routes()
+
+        assert len(routes) == 1
+        assert routes[0].route_id == "users"
+        assert routes[0].uri == "http://users"
+        assert routes[0].order == 1
+        assert routes[0].metadata == {"team": "cats"}
+        assert isinstance(routes[0].predicate, PathRoutePredicate)
+        assert routes[0].predicate.config.pattern == "/api/users/**"
+        assert isinstance(routes[0].filters[0], PrefixPathGatewayFilter)
+
+    def test_Given_no_predicates_When_get_routes_Then_always_match(self):
+        routes = route_locator({"id": "all", "uri": "http://all"}).get_routes()
+        assert routes[0].predicate is TRUE
+        assert routes[0].filters == ()
+
+    def test_Given_identical_configs_When_get_routes_Then_share_the_predicates_and_filters(self):
+        routes = route_locator(route("a"), route("b"), route("c", "/c/**", "/v2")).get_routes()
+
+        assert routes[0].predicate is routes[1].predicate
+        assert routes[0].filters[0] is routes[1].filters[0]
+        assert routes[0].predicate is not routes[2].predicate
+        assert routes[0].filters[0] is not routes[2].filters[0]
+
+    def test_Given_unchanged_definitions_When_get_routes_again_Then_reuse_the_compiled_ones(self):
+        locator = route_locator(route("a"))
+        assert locator.get_routes()[0].predicate is locator.get_routes()[0].predicate
+
+    def test_Given_unshareable_filter_factory_When_get_routes_Then_create_a_filter_per_route(self):
+        class CountingGatewayFilterFactory(PrefixPathGatewayFilterFactory):
+            shareable = False
+
+        definitions = [route("a"), route("b")]
+        for definition in definitions:
+            definition["filters"][0]["name"] = "Counting"
+        locator = RouteDefinitionRouteLocator(
+            StaticRouteDefinitionLocator(FileRouteDefinitionLocator.parse(definitions)),
+            filter_factories=[CountingGatewayFilterFactory()],
+        )
+
+        routes = locator.get_routes()
+        assert routes[0].filters[0] is not routes[1].filters[0]
+
+    def test_Given_rate_limiters_When_get_routes_Then_limit_each_route_on_its_own(self):
+        definitions = [route("a"), route("b")]
+        for definition in definitions:
+            definition["filters"] = [{"name": "RequestRateLimiter", "args": {"replenish_rate": 10}}]
+
+        routes = route_locator(*definitions).get_routes()
+        assert routes[0].filters[0] is not routes[1].filters[0]
+
+    def test_Given_definitions_without_id_When_get_routes_again_Then_keep_their_ids(self):
+        definitions = [route(None), route(None)]
+        locator = route_locator(*definitions)
+
+        ids = [r.route_id for r in locator.get_routes()]
+        assert ids == [r.route_id for r in locator.get_routes()]
+        assert ids[0] != ids[1]
+
+    def test_Given_unchanged_route_When_get_routes_again_Then_keep_its_stateful_filters(self):
+        definitions = [route("a"), route("b")]
+        for definition in definitions:
+            definition["filters"] = [{"name": "RequestRateLimiter", "args": {"replenish_rate": 10}}]
+        locator = route_locator(*definitions)
+        routes = locator.get_routes()
+
+        definitions[1]["uri"] = "http://b-v2"
+        locator.route_definition_locator = StaticRouteDefinitionLocator(FileRouteDefinitionLocator.parse(definitions))
+        refreshed_routes = locator.get_routes()
+
+        assert refreshed_routes[0].filters[0] is routes[0].filters[0]
+        assert refreshed_routes[1].filters[0] is not routes[1].filters[0]
+
+    def test_Given_unknown_name_When_get_routes_Then_raise_with_the_known_names(self):
+        definition = route("a")
+        definition["predicates"][0]["name"] = "Unknown"
+        with pytest.raises(ValueError, match="Unknown predicate 'Unknown'.*'Path'"):
+            route_locator(definition).get_routes()
+
+    def test_Given_5000_definitions_When_get_routes_Then_compile_them_in_well_under_a_second(self):
+        locator = route_locator(*[route(f"r{i}", f"/api/service-{i % 100}/**", f"/v{i % 3}") for i in range(5000)])
+
+        start = time.perf_counter()
+        routes = locator.get_routes()
+        seconds = time.perf_counter() - start
+
+        assert len(routes) == 5000
+        assert seconds < 1
+
+
+class TestFactoryConfigs:
+    def test_Given_factories_Then_named_after_their_classes(self):
+        assert AfterRoutePredicateFactory().name == "After"
+        assert PrefixPathGatewayFilterFactory().name == "PrefixPath"
+
+    def test_Given_iso_date_time_When_new_config_Then_parse_it(self):
+        config = AfterRoutePredicateFactory().new_config(date_time="2020-01-01T08:00:00")
+        assert config.date_time == datetime(2020, 1, 1, 8)
+
+    def test_Given_encodings_list_When_new_config_Then_keep_the_defaults_of_the_rest(self):
+        config = ResponseCompressionGatewayFilterFactory().new_config(encodings=["gzip"])
+        assert config.encodings == ("gzip",)
+        assert config.min_size == 1024
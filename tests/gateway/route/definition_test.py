@@ -1,13 +1,18 @@
 # -*- coding: utf-8 -*-
 # standard library
+import json
 from typing import List
 from unittest.mock import Mock
 
+# pypi/conda library
+import pytest
+
 # scip plugin
 from spring_cloud.commons.helpers import NaiveCacheManager
 from spring_cloud.gateway.route.definition import (
     CachingRouteDefinitionLocator,
     CompositeRouteDefinitionLocator,
+    FileRouteDefinitionLocator,
     RouteDefinition,
     RouteDefinitionLocator,
     StaticRouteDefinitionLocator,
@@ -62,3 +67,54 @@ class TestCachingRouteDefinitionLocator:
             assert results[0].id == str(0)
             assert results[0].uri == "uri-0"
         assert self.delegate.call_count == 1
+
+    def test_Given_cache_When_refresh_Then_delegate_again(self):
+        self.locator.route_definitions
+        call_count = self.delegate.call_count
+        self.locator.refresh()
+        self.locator.route_definitions
+        assert self.delegate.call_count == call_count + 1
+
+
+class TestFileRouteDefinitionLocator:
+    routes = {
+        "routes": [
+            {
+                "id": "users",
+                "uri": "http://users-service",
+                "order": 1,
+                "predicates": [{"name": "Path", "args": {"pattern": "/api/users/**"}}],
+                "filters": [{"name": "PrefixPath", "args": {"prefix": "/v1"}}],
+                "metadata": {"team": "cats"},
+            },
+            {"uri": "http://messages-service"},
+        ]
+    }
+
+    def then_parse_the_routes(self, definitions: List[RouteDefinition]):
+        assert len(definitions) == 2
+        users = definitions[0]
+        assert (users.id, users.uri, users.order) == ("users", "http://users-service", 1)
+        assert users.metadata == {"team": "cats"}
+        assert (users.predicates[0].name, users.predicates[0].args) == ("Path", {"pattern": "/api/users/**"})
+        assert (users.filters[0].name, users.filters[0].args) == ("PrefixPath", {"prefix": "/v1"})
+        assert definitions[1].id is None
+        assert definitions[1].predicates == []
+
+    def test_Given_json_file_When_load_Then_parse_the_routes(self, tmp_path):
+        path = tmp_path / "routes.json"
+        path.write_text(json.dumps(self.routes))
+        self.then_parse_the_routes(FileRouteDefinitionLocator(str(path)).route_definitions)
+
+    def test_Given_yaml_file_When_load_Then_parse_the_routes(self, tmp_path):
+        yaml = pytest.importorskip("yaml")
+        path = tmp_path / "routes.yml"
+        path.write_text(yaml.safe_dump(self.routes))
+        self.then_parse_the_routes(FileRouteDefinitionLocator(str(path)).route_definitions)
+
+    @pytest.mark.parametrize(
+        "document", [{"routes": {}}, [{"id": "no-uri"}], [{"uri": "http://a_cat", "filters": [{}]}]]
+    )
+    def test_Given_malformed_routes_When_parse_Then_raise(self, document):
+        with pytest.raises(ValueError):
+            FileRouteDefinitionLocator.parse(document)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# standard library
+import os
+import time
+from unittest.mock import Mock
+
+__author__ = "Waterball (johnny850807@gmail.com)"
+__license__ = "Apache 2.0"
+
+# scip plugin
+from spring_cloud.gateway.route.watcher import FileWatcher
+
+
+class TestFileWatcher:
+    def given_watcher(self, tmp_path, interval: float = 1.0):
+        self.path = tmp_path / "routes.json"
+        self.path.write_text("[]")
+        self.on_change = Mock()
+        self.watcher = FileWatcher(str(self.path), self.on_change, interval)
+
+    def when_modify_file(self, content: str):
+        self.path.write_text(content)
+        # make sure the modification time differs even on the coarse-grained file systems
+        modified_time = time.time() + 10
+        os.utime(self.path, (modified_time, modified_time))
+
+    def test_Given_file_unchanged_When_check_Then_not_call_back(self, tmp_path):
+        self.given_watcher(tmp_path)
+        assert not self.watcher.check()
+        self.on_change.assert_not_called()
+
+    def test_Given_file_changed_When_check_Then_call_back_once(self, tmp_path):
+        self.given_watcher(tmp_path)
+        self.when_modify_file('[{"uri": "http://a_cat"}]')
+        assert self.watcher.check()
+        assert not self.watcher.check()
+        self.on_change.assert_called_once()
+
+    def test_Given_file_missing_When_check_Then_not_call_back(self, tmp_path):
+        self.given_watcher(tmp_path)
+        self.path.unlink()
+        assert not self.watcher.check()
+
+    def test_Given_started_When_file_changed_Then_call_back_in_background(self, tmp_path):
+        self.given_watcher(tmp_path, interval=0.01)
+        self.watcher.start()
+        try:
+            self.when_modify_file('[{"uri": "http://a_cat"}]')
+            deadline = time.time() + 2
+            while not self.on_change.called and time.time() < deadline:
+                time.sleep(0.01)
+            self.on_change.assert_called_once()
+        finally:
+            self.watcher.stop()
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# standard library
+import socket
+import threading
+import time
+from http.client import HTTPConnection
+
+# pypi/conda library
+import pytest
+
+# scip plugin
+from spring_cloud.gateway.server.async_server import AsyncHTTPServer, BadRequestError, parse_http_version
+from tests.gateway.server.server import echo_dispatcher_handler
+
+
+class TestAsyncHTTPServer:
+    def setup_method(self):
+        self.server = AsyncHTTPServer(("127.0.0.1", 0), echo_dispatcher_handler(), max_keep_alive_requests=5)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        while self.server.server_address[1] == 0:
+            time.sleep(0.01)
+
+    def teardown_method(self):
+        self.server.shutdown()
+        self.thread.join(timeout=3)
+
+    def connect(self) -> HTTPConnection:
+        return HTTPConnection(*self.server.server_address, timeout=5)
+
+    def test_Given_keep_alive_connection_When_send_requests_Then_all_served_over_the_same_connection(self):
+        connection = self.connect()
+        for path in ["/a", "/b", "/c"]:
+            connection.request("GET", path)
+            response = connection.getresponse()
+            assert response.status == 200
+            assert response.read() == path.encode()
+        connection.request("POST", "/post", body=b"-body")
+        assert connection.getresponse().read() == b"/post-body"
+        connection.close()
+
+    def test_Given_slow_request_When_send_another_request_Then_it_is_not_stalled(self):
+        slow_connection = self.connect()
+        slow_connection.request("GET", "/slow")
+
+        start = time.monotonic()
+        connection = self.connect()
+        connection.request("GET", "/fast")
+        assert connection.getresponse().read() == b"/fast"
+        assert time.monotonic() - start < 0.5
+
+        assert slow_connection.getresponse().read() == b"/slow"
+
+    def test_Given_max_keep_alive_requests_When_reached_Then_close_the_connection(self):
+        connection = self.connect()
+        for i in range(5):
+            connection.request("GET", "/a")
+            response = connection.getresponse()
+            response.read()
+        assert response.getheader("Connection") == "close"
+
+    def test_Given_no_route_matched_When_send_requests_Then_respond_404_and_keep_alive(self):
+        connection = self.connect()
+        for _ in range(2):
+            connection.request("POST", "/not_found", body=b"body")
+            response = connection.getresponse()
+            assert response.status == 404
+            assert response.read() == b""
+            assert not response.will_close
+
+    def test_Given_streamed_response_When_request_Then_relay_in_chunked_encoding(self):
+        connection = self.connect()
+        start = time.monotonic()
+        connection.request("GET", "/stream")
+        response = connection.getresponse()
+        assert time.monotonic() - start < 0.4
+        assert response.getheader("Transfer-Encoding") == "chunked"
+        assert response.read() == b"/stream-end"
+
+        connection.request("GET", "/a")
+        assert connection.getresponse().read() == b"/a"
+
+    def send_raw(self, data: bytes) -> bytes:
+        with socket.create_connection(self.server.server_address, timeout=5) as raw_connection:
+            raw_connection.sendall(data)
+            return raw_connection.recv(1024)
+
+    def test_Given_too_long_request_line_When_send_request_Then_respond_400(self):
+        response = self.send_raw(b"GET /" + b"a" * (128 * 1024) + b" HTTP/1.1\r\n\r\n")
+        assert response.startswith(b"HTTP/1.1 400")
+
+    def test_Given_too_long_header_line_When_send_request_Then_respond_431(self):
+        response = self.send_raw(b"GET / HTTP/1.1\r\nX-Cat: " + b"a" * (128 * 1024) + b"\r\n\r\n")
+        assert response.startswith(b"HTTP/1.1 431")
+
+    def test_Given_http_1_10_When_send_request_Then_keep_alive(self):
+        response = self.send_raw(b"GET /a HTTP/1.10\r\nHost: cat\r\n\r\n")
+        assert response.startswith(b"HTTP/1.1 200")
+        assert b"Connection: close" not in response
+
+    def test_health_check(self):
+        connection = self.connect()
+        connection.request("GET", "/api/gateway/_health_check")
+        response = connection.getresponse()
+        assert response.status == 200
+        assert response.read() == b"The Api Gateway is ready."
+
+    def test_metrics(self):
+        connection = self.connect()
+        connection.request("GET", "/a")
+        connection.getresponse().read()
+        connection.request("GET", "/api/gateway/_metrics")
+        response = connection.getresponse()
+        assert response.status == 200
+        assert 'status="200"} 1' in response.read().decode()
+
+
+class TestParseHttpVersion:
+    def test_Given_versions_When_parse_Then_compare_them_numerically(self):
+        assert parse_http_version("HTTP/1.10") > parse_http_version("HTTP/1.9") > parse_http_version("HTTP/1.1")
+        assert parse_http_version("HTTP/1.0") < (1, 1)
+
+    def test_Given_bad_version_When_parse_Then_raise(self):
+        with pytest.raises(BadRequestError):
+            parse_http_version("HTTP/one")
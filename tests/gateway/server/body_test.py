@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# standard library
+import io
+
+# pypi/conda library
+import pytest
+
+# scip plugin
+from spring_cloud.gateway.server.body import BodyFormatError, RequestBodyStream
+
+CHUNKED_BODY = b"4\r\nWiki\r\n6;ext=1\r\npedia \r\nE\r\nin \r\n\r\nchunks.\r\n0\r\nTrailer: value\r\n\r\nNEXT"
+
+
+class TestRequestBodyStream:
+    def test_Given_content_length_When_read_Then_only_read_the_body(self):
+        rfile = io.BytesIO(b"0123456789NEXT")
+        stream = RequestBodyStream(rfile, 10)
+        assert stream.len == 10
+        assert stream.read(4) == b"0123"
+        assert stream.len == 6
+        assert stream.read() == b"456789"
+        assert stream.exhausted
+        assert stream.read() == b""
+        assert rfile.read() == b"NEXT"
+
+    def test_Given_chunked_body_When_read_Then_decode_the_chunks(self):
+        rfile = io.BytesIO(CHUNKED_BODY)
+        stream = RequestBodyStream(rfile, chunked=True)
+        assert stream.len is None
+        assert stream.read() == b"Wikipedia in \r\n\r\nchunks."
+        assert rfile.read() == b"NEXT"
+
+    def test_Given_small_chunk_size_When_iterate_Then_yield_pieces(self):
+        stream = RequestBodyStream(io.BytesIO(b"0123456789"), 10, chunk_size=4)
+        assert list(stream) == [b"0123", b"4567", b"89"]
+        assert list(stream) == []
+
+    def test_Given_no_body_Then_has_no_body(self):
+        stream = RequestBodyStream(io.BytesIO(b"NEXT"))
+        assert not stream.has_body
+        assert stream.read() == b""
+
+    def test_Given_truncated_body_When_read_Then_raise_error(self):
+        stream = RequestBodyStream(io.BytesIO(b"0123"), 10)
+        with pytest.raises(BodyFormatError):
+            stream.read()
+
+    @pytest.mark.parametrize("size_line", [b"xyz", b"-4"])
+    def test_Given_malformed_chunk_size_When_read_Then_raise_error(self, size_line):
+        stream = RequestBodyStream(io.BytesIO(size_line + b"\r\nWiki\r\n0\r\n\r\n"), chunked=True)
+        with pytest.raises(BodyFormatError):
+            stream.read()
+
+    def test_Given_body_over_the_limit_When_discard_Then_return_false(self):
+        assert RequestBodyStream(io.BytesIO(CHUNKED_BODY), chunked=True).discard(limit=1024)
+        assert not RequestBodyStream(io.BytesIO(b"0" * 100), 100, chunk_size=10).discard(limit=50)
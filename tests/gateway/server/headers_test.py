@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# scip plugin
+from spring_cloud.gateway.server.headers import HttpHeaders, OverlayHttpHeaders
+
+
+class TestHttpHeaders:
+    def setup_method(self):
+        self.headers = HttpHeaders([("Accept", "text/html"), ("Host", "a_cat"), ("accept", "application/json")])
+
+    def test_Given_headers_When_get_in_any_case_Then_found(self):
+        assert self.headers["host"] == "a_cat"
+        assert self.headers.get("HOST") == "a_cat"
+        assert "hOsT" in self.headers
+        assert self.headers.get("Missing") is None
+
+    def test_Given_repeated_header_When_get_Then_join_all_the_values(self):
+        assert self.headers["Accept"] == "text/html, application/json"
+        assert self.headers.get_all("ACCEPT") == ["text/html", "application/json"]
+        assert list(self.headers) == ["Accept", "Host"]
+
+    def test_Given_repeated_cookie_header_When_get_Then_join_with_semicolon(self):
+        headers = HttpHeaders([("Cookie", "a=1"), ("Cookie", "b=2")])
+        assert headers["Cookie"] == "a=1; b=2"
+
+    def test_When_set_and_delete_Then_replace_all_the_values(self):
+        self.headers["accept"] = "*/*"
+        assert self.headers.get_all("Accept") == ["*/*"]
+        assert dict(self.headers) == {"Accept": "*/*", "Host": "a_cat"}
+        del self.headers["HOST"]
+        assert len(self.headers) == 1
+
+    def test_When_copy_Then_the_copy_is_independent(self):
+        copied = self.headers.copy()
+        copied.add("Accept", "*/*")
+        assert self.headers.get_all("Accept") == ["text/html", "application/json"]
+        assert copied.get_all("Accept") == ["text/html", "application/json", "*/*"]
+
+
+class TestOverlayHttpHeaders:
+    def setup_method(self):
+        self.base = HttpHeaders([("Accept", "text/html"), ("Host", "a_cat")])
+        self.headers = OverlayHttpHeaders.overlay(self.base)
+
+    def test_When_change_the_overlay_Then_the_base_is_untouched(self):
+        self.headers["host"] = "b_cat"
+        self.headers.add("X-Trace", "1")
+        del self.headers["Accept"]
+        assert dict(self.headers) == {"Host": "b_cat", "X-Trace": "1"}
+        assert "accept" not in self.headers
+        assert dict(self.base) == {"Accept": "text/html", "Host": "a_cat"}
+
+    def test_When_add_a_value_Then_keep_the_original_values(self):
+        self.headers.add("accept", "*/*")
+        assert self.headers.get_all("Accept") == ["text/html", "*/*"]
+        assert self.headers["Accept"] == "text/html, */*"
+
+    def test_Given_overlay_of_overlay_When_change_Then_both_share_the_base(self):
+        self.headers["X-First"] = "1"
+        second = OverlayHttpHeaders.overlay(self.headers)
+        second["X-Second"] = "2"
+        assert "X-Second" not in self.headers
+        assert dict(second) == {"Accept": "text/html", "Host": "a_cat", "X-First": "1", "X-Second": "2"}
+
+    def test_Given_dict_When_overlay_Then_lookup_case_insensitively(self):
+        headers = OverlayHttpHeaders.overlay({"Host": "a_cat"})
+        assert headers["HOST"] == "a_cat"
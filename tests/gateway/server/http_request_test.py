@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# standard library
+import io
+from http.client import parse_headers
+from unittest.mock import Mock
+
+# pypi/conda library
+import pytest
+
+# scip plugin
+from spring_cloud.gateway.server.body import BodyFormatError
+from spring_cloud.gateway.server.http_request import DefaultServerHttpRequest
+
+
+def given_request(path: str, raw_headers: bytes) -> DefaultServerHttpRequest:
+    headers = parse_headers(io.BytesIO(raw_headers + b"\r\n"))
+    server = Mock(server_address=("127.0.0.1", 8726))
+    return DefaultServerHttpRequest(headers, path, server, "GET", io.BytesIO(), Mock())
+
+
+class TestDefaultServerHttpRequest:
+    def setup_method(self):
+        self.request = given_request(
+            "/api/cats?name=fish&tag=a&tag=b%20c&empty=",
+            b"Host: a_cat\r\nX-Forwarded-For: 10.0.0.1\r\nx-forwarded-for: 10.0.0.2\r\n"
+            b"Cookie: session=abc=; theme = dark\r\nCookie: lang=en\r\n",
+        )
+
+    def test_path_excludes_the_query(self):
+        assert self.request.path == "/api/cats"
+
+    def test_query_keeps_every_value(self):
+        assert self.request.query == {"name": ["fish"], "tag": ["a", "b c"], "empty": [""]}
+
+    def test_cookies_are_parsed_from_every_cookie_header(self):
+        assert self.request.cookies == {"session": "abc=", "theme": "dark", "lang": "en"}
+
+    def test_headers_are_case_insensitive_and_keep_every_value(self):
+        assert self.request.headers["host"] == "a_cat"
+        assert self.request.headers.get_all("X-Forwarded-For") == ["10.0.0.1", "10.0.0.2"]
+
+    def test_parsed_once(self):
+        assert self.request.headers is self.request.headers
+        assert self.request.query is self.request.query
+        assert self.request.cookies is self.request.cookies
+
+    def test_has_no_instance_dict(self):
+        assert not hasattr(self.request, "__dict__")
+
+
+class TestBodyFraming:
+    @pytest.mark.parametrize("content_length", [b"abc", b"-1", b"1.5"])
+    def test_Given_malformed_content_length_When_validate_Then_raise_body_format_error(self, content_length):
+        request = given_request("/", b"Content-Length: " + content_length + b"\r\n")
+        with pytest.raises(BodyFormatError):
+            request.validate_body_framing()
+
+    def test_Given_chunked_body_When_validate_Then_ignore_the_content_length(self):
+        request = given_request("/", b"Transfer-Encoding: chunked\r\nContent-Length: abc\r\n")
+        request.validate_body_framing()
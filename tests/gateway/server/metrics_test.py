@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# scip plugin
+from spring_cloud.commons.helpers import LruCacheManager
+from spring_cloud.gateway.server.metrics import GatewayMetrics
+
+
+class TestGatewayMetrics:
+    def setup_method(self):
+        self.metrics = GatewayMetrics(buckets=(0.1, 1.0))
+
+    def test_Given_handling_request_When_render_Then_count_it_in_flight(self):
+        self.metrics.start("cat")
+        text = self.metrics.render()
+        assert 'gateway_requests_total{route="cat"} 1' in text
+        assert 'gateway_requests_in_flight{route="cat"} 1' in text
+
+    def test_Given_finished_requests_When_render_Then_break_down_by_status(self):
+        for status_code in [200, 200, 503, None]:
+            self.metrics.finish("cat", status_code, self.metrics.start("cat"))
+        text = self.metrics.render()
+        assert 'gateway_requests_in_flight{route="cat"} 0' in text
+        assert 'gateway_responses_total{route="cat",status="200"} 2' in text
+        assert 'gateway_responses_total{route="cat",status="503"} 1' in text
+        assert 'gateway_responses_total{route="cat",status="500"} 1' in text
+
+    def test_Given_upstream_time_When_render_Then_split_the_latency(self):
+        start = self.metrics.start("cat")
+        self.metrics.finish("cat", 200, start - 2.0, upstream_seconds=1.5)
+        text = self.metrics.render()
+        assert 'gateway_upstream_latency_seconds_bucket{route="cat",le="0.1"} 0' in text
+        assert 'gateway_upstream_latency_seconds_bucket{route="cat",le="+Inf"} 1' in text
+        assert 'gateway_upstream_latency_seconds_sum{route="cat"} 1.5' in text
+        assert 'gateway_overhead_latency_seconds_bucket{route="cat",le="1.0"} 1' in text
+        assert 'gateway_overhead_latency_seconds_count{route="cat"} 1' in text
+
+    def test_Given_unmatched_request_When_render_Then_count_it(self):
+        self.metrics.record_unmatched()
+        assert "gateway_unmatched_requests_total 1" in self.metrics.render()
+
+    def test_Given_route_id_with_quotes_When_render_Then_escape_it(self):
+        self.metrics.start('a"cat')
+        assert 'gateway_requests_total{route="a\\"cat"} 1' in self.metrics.render()
+
+    def test_Given_route_cache_When_render_Then_expose_its_hits_and_misses(self):
+        route_cache = LruCacheManager()
+        route_cache.put("cat", "meow")
+        route_cache.retrieve_value("cat")
+        route_cache.retrieve_value("dog")
+        self.metrics.track_route_cache(route_cache)
+        text = self.metrics.render()
+        assert "gateway_route_cache_hits_total 1" in text
+        assert "gateway_route_cache_misses_total 1" in text
+
+    def test_Given_response_cache_lookups_When_render_Then_expose_the_hit_ratio(self):
+        for result in ["hit", "hit", "hit", "miss"]:
+            self.metrics.finish("cat", 200, self.metrics.start("cat"), response_cache_result=result)
+        self.metrics.finish("dog", 200, self.metrics.start("dog"))
+        text = self.metrics.render()
+        assert 'gateway_response_cache_lookups_total{route="cat",result="hit"} 3' in text
+        assert 'gateway_response_cache_lookups_total{route="cat",result="miss"} 1' in text
+        assert 'gateway_response_cache_hit_ratio{route="cat"} 0.75' in text
+        assert 'gateway_response_cache_hit_ratio{route="dog"}' not in text
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# standard library
+import socket
+import threading
+import time
+from http.client import HTTPConnection
+from unittest.mock import Mock
+
+# pypi/conda library
+import pytest
+
+# scip plugin
+from spring_cloud.gateway.server.request_handler import HTTPRequestHandler
+from spring_cloud.gateway.server.worker import ThreadPoolHTTPServer
+from tests.gateway.server.server import echo_dispatcher_handler
+
+
+class TestHTTPRequestHandler:
+    def setup_method(self):
+        dispatcher_handler = echo_dispatcher_handler()
+        self.server = ThreadPoolHTTPServer(
+            ("127.0.0.1", 0),
+            lambda *args, **kwargs: HTTPRequestHandler(
+                *args,
+                dispatcher_handler=dispatcher_handler,
+                keep_alive_timeout=0.5,
+                max_keep_alive_requests=3,
+                **kwargs,
+            ),
+            max_threads=2,
+        )
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.connection = HTTPConnection(*self.server.server_address, timeout=5)
+
+    def teardown_method(self):
+        self.connection.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def request(self, method: str, path: str, body: bytes = None):
+        self.connection.request(method, path, body=body)
+        response = self.connection.getresponse()
+        return response, response.read()
+
+    def local_port(self) -> int:
+        return self.connection.sock.getsockname()[1]
+
+    def test_Given_keep_alive_When_send_requests_Then_reuse_the_connection(self):
+        response, body = self.request("GET", "/a")
+        port = self.local_port()
+        assert response.version == 11
+        assert response.getheader("Content-Length") == "2"
+        assert body == b"/a"
+
+        response, body = self.request("POST", "/b", body=b"-body")
+        assert body == b"/b-body"
+        assert self.local_port() == port
+
+    def test_Given_max_keep_alive_requests_When_reached_Then_close_the_connection(self):
+        for _ in range(2):
+            response, _ = self.request("GET", "/a")
+            assert not response.will_close
+        response, _ = self.request("GET", "/a")
+        assert response.will_close
+
+    def test_Given_idle_connection_When_timeout_Then_close_the_connection(self):
+        self.request("GET", "/a")
+        sock = self.connection.sock
+        time.sleep(1)
+        assert sock.recv(1) == b""
+
+    def test_Given_max_threads_idle_connections_When_another_client_requests_Then_serve_it(self):
+        idle_connections = [HTTPConnection(*self.server.server_address, timeout=5) for _ in range(2)]
+        try:
+            for connection in idle_connections:
+                connection.request("GET", "/idle")
+                assert connection.getresponse().read() == b"/idle"
+
+            response, body = self.request("GET", "/a")
+            assert response.status == 200
+            assert body == b"/a"
+
+            for connection in idle_connections:
+                connection.request("GET", "/b")
+                assert connection.getresponse().read() == b"/b"
+        finally:
+            for connection in idle_connections:
+                connection.close()
+
+    def test_Given_unread_request_body_When_respond_404_Then_keep_the_connection_usable(self):
+        response, body = self.request("POST", "/not_found", body=b"unread body")
+        assert response.status == 404
+        assert response.getheader("Content-Length") == "0"
+        port = self.local_port()
+
+        response, body = self.request("GET", "/a")
+        assert body == b"/a"
+        assert self.local_port() == port
+
+    def test_Given_chunked_request_body_When_send_Then_decode_the_body_and_keep_alive(self):
+        response, body = self.request("POST", "/post", body=iter([b"-chunked", b"-body"]))
+        assert body == b"/post-chunked-body"
+        port = self.local_port()
+
+        response, body = self.request("GET", "/a")
+        assert body == b"/a"
+        assert self.local_port() == port
+
+    def test_Given_streamed_response_When_request_Then_relay_in_chunked_encoding(self):
+        start = time.monotonic()
+        self.connection.request("GET", "/stream")
+        response = self.connection.getresponse()
+        assert time.monotonic() - start < 0.4
+        assert response.getheader("Transfer-Encoding") == "chunked"
+        assert response.read() == b"/stream-end"
+
+        response, body = self.request("GET", "/a")
+        assert body == b"/a"
+
+    def test_Given_http_1_0_client_When_stream_response_Then_delimit_the_body_by_closing(self):
+        with socket.create_connection(self.server.server_address, timeout=5) as sock:
+            sock.sendall(b"GET /stream HTTP/1.0\r\n\r\n")
+            data = b""
+            while True:
+                received = sock.recv(4096)
+                if not received:
+                    break
+                data += received
+        head, body = data.split(b"\r\n\r\n", 1)
+        assert b"Transfer-Encoding" not in head
+        assert body == b"/stream-end"
+
+    def send_raw(self, request: bytes, end: bytes = None) -> bytes:
+        """
+        Reads the response until it ends with `end`, or until the connection is closed.
+        """
+        with socket.create_connection(self.server.server_address, timeout=5) as sock:
+            sock.sendall(request)
+            data = b""
+            while end is None or not data.endswith(end):
+                received = sock.recv(4096)
+                if not received:
+                    break
+                data += received
+        return data
+
+    @pytest.mark.parametrize("version", ["HTTP/1.10", "HTTP/01.1"])
+    def test_Given_http_version_above_1_1_When_stream_response_Then_compare_it_numerically(self, version):
+        data = self.send_raw(f"GET /stream {version}\r\n\r\n".encode(), b"0\r\n\r\n")
+        head, body = data.split(b"\r\n\r\n", 1)
+        assert b"Transfer-Encoding: chunked" in head
+
+    def test_Given_malformed_http_version_When_request_Then_respond_400(self):
+        data = self.send_raw(b"GET /a HTTP/1.x\r\n\r\n")
+        assert b" 400 " in data.split(b"\r\n", 1)[0]
+
+    @pytest.mark.parametrize("content_length", ["abc", "-1"])
+    def test_Given_malformed_content_length_When_request_Then_respond_400_and_close(self, content_length):
+        start = time.monotonic()
+        data = self.send_raw(f"POST /a HTTP/1.1\r\nContent-Length: {content_length}\r\n\r\n".encode())
+        assert time.monotonic() - start < 0.4
+        assert data.startswith(b"HTTP/1.1 400 ")
+        assert data.count(b"HTTP/1.1") == 1
+
+    def test_Given_malformed_chunked_body_When_read_Then_respond_400_and_close(self):
+        start = time.monotonic()
+        data = self.send_raw(b"POST /post HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\nxyz\r\nbody\r\n")
+        assert time.monotonic() - start < 0.4
+        assert data.startswith(b"HTTP/1.1 400 ")
+
+    def test_Given_malformed_chunked_body_When_discard_after_respond_Then_close_the_connection(self):
+        self.server.handle_error = Mock()
+        start = time.monotonic()
+        data = self.send_raw(b"POST /not_found HTTP/1.1\r\nTransfer-Encoding: chunked\r\n\r\nxyz\r\nbody\r\n")
+        assert time.monotonic() - start < 0.4
+        assert data.startswith(b"HTTP/1.1 404 ")
+        assert data.count(b"HTTP/1.1") == 1
+        assert not self.server.handle_error.called
+
+    def test_Given_handled_requests_When_get_metrics_Then_respond_in_prometheus_format(self):
+        self.request("GET", "/a")
+        self.request("GET", "/not_found")
+        response, body = self.request("GET", "/api/gateway/_metrics")
+        assert response.getheader("Content-Type").startswith("text/plain; version=0.0.4")
+        text = body.decode()
+        assert "gateway_unmatched_requests_total 1" in text
+        assert 'status="200"} 1' in text
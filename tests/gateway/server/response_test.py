@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# standard library
+from unittest.mock import Mock
+
+# scip plugin
+from spring_cloud.gateway.server import ServerHTTPResponse
+
+
+class TestServerHTTPResponse:
+    def setup_method(self):
+        self.handler = Mock()
+        self.response = ServerHTTPResponse(self.handler)
+        self.response.set_status_code(200)
+
+    def test_When_commit_Then_write_the_whole_response_at_once(self):
+        self.response.add_header("Content-Type", "text/plain")
+        self.response.set_body(b"body")
+        self.response.commit()
+        self.handler.write_response.assert_called_once_with(
+            200, [("Content-Type", "text/plain"), ("Content-Length", "4")], b"body"
+        )
+
+    def test_Given_cookies_When_commit_Then_set_every_cookie(self):
+        self.response.add_cookie("a", "1")
+        self.response.add_cookie("b", "2")
+        self.response.commit()
+        status_code, headers, body = self.handler.write_response.call_args[0]
+        assert ("Set-Cookie", "a=1") in headers
+        assert ("Set-Cookie", "b=2") in headers
+        assert not any(key == "Cookie" for key, _ in headers)
+
+    def test_Given_no_cookies_When_commit_Then_send_no_cookie_header(self):
+        self.response.commit()
+        status_code, headers, body = self.handler.write_response.call_args[0]
+        assert headers == [("Content-Length", "0")]
@@ -3,9 +3,14 @@ __author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
 __license__ = "Apache 2.0"
 
 # standard library
+import time
 from typing import Dict
 
 # scip plugin
+from spring_cloud.gateway.filter import GatewayFilterChain, GlobalFilter
+from spring_cloud.gateway.handler import DispatcherHandler
+from spring_cloud.gateway.handler.handler import FilteringWebHandler, RoutePredicateHandlerMapping
+from spring_cloud.gateway.route.builder.route_locator import RouteLocatorBuilder
 from spring_cloud.gateway.server import ServerHTTPRequest, ServerHTTPResponse, ServerWebExchange
 from spring_cloud.utils.validate import not_none
 
@@ -57,3 +62,36 @@ class StubServerWebExchangeBuilder(ServerWebExchange.Builder):
 
     def build(self) -> ServerWebExchange:
         return self.__delegate
+
+
+class EchoRouteFilter(GlobalFilter):
+    """
+    Responds with the request path and the body, the requests to '/slow' will take a while,
+    the response to '/stream' is streamed, and its last piece arrives after a while.
+    """
+
+    def filter(self, exchange: ServerWebExchange, chain: GatewayFilterChain):
+        if exchange.request.path == "/slow":
+            time.sleep(1)
+        exchange.response.set_status_code(200)
+        if exchange.request.path == "/stream":
+            exchange.response.set_body_stream(self.slow_stream(exchange.request.path.encode()))
+        else:
+            exchange.response.set_body(exchange.request.path.encode() + exchange.request.body)
+        exchange.response.commit()
+
+    @staticmethod
+    def slow_stream(first_piece: bytes):
+        yield first_piece
+        time.sleep(0.5)
+        yield b"-end"
+
+
+def echo_dispatcher_handler() -> DispatcherHandler:
+    """
+    Every request except '/not_found' is echoed by the EchoRouteFilter.
+    """
+    route_locator = (
+        RouteLocatorBuilder().routes().route(lambda p: p.path("/not_found").negate_().uri("http://a_cat")).build()
+    )
+    return DispatcherHandler(RoutePredicateHandlerMapping(route_locator), FilteringWebHandler([EchoRouteFilter()]))
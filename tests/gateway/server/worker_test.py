@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# standard library
+import os
+import socket
+import threading
+import time
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler
+
+# pypi/conda library
+import pytest
+
+# scip plugin
+from spring_cloud.gateway.server.worker import PreforkServer, ThreadPoolHTTPServer
+
+
+class PidHandler(BaseHTTPRequestHandler):
+    """
+    Responds with the pid of the worker, the requests to '/slow' will take a while.
+    """
+
+    def do_GET(self):
+        if self.path == "/slow":
+            time.sleep(0.5)
+        body = str(os.getpid()).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def get(address, path: str):
+    connection = HTTPConnection(*address, timeout=5)
+    connection.request("GET", path)
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class TestThreadPoolHTTPServer:
+    def given_server(self, max_threads: int, max_queue_size: int, port: int = 0, reuse_port: bool = False):
+        server = ThreadPoolHTTPServer(
+            ("127.0.0.1", port),
+            PidHandler,
+            max_threads=max_threads,
+            max_queue_size=max_queue_size,
+            reuse_port=reuse_port,
+        )
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.servers.append(server)
+        return server
+
+    def setup_method(self):
+        self.servers = []
+
+    def teardown_method(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def test_Given_slow_requests_When_send_concurrently_Then_served_in_parallel(self):
+        server = self.given_server(max_threads=4, max_queue_size=4)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get(server.server_address, "/slow"))) for _ in range(4)
+        ]
+        start = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert time.monotonic() - start < 1.5
+        assert [status for status, _ in results] == [200] * 4
+
+    def test_Given_queue_is_full_When_send_requests_Then_reject_with_503(self):
+        server = self.given_server(max_threads=1, max_queue_size=1)
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(get(server.server_address, "/slow"))) for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+            time.sleep(0.05)
+        for thread in threads:
+            thread.join()
+        statuses = sorted(status for status, _ in results)
+        assert statuses[0] == 200
+        assert 503 in statuses
+
+    @pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT"), reason="SO_REUSEPORT is not supported")
+    def test_Given_reuse_port_When_bind_twice_Then_both_servers_listen(self):
+        port = free_port()
+        self.given_server(max_threads=1, max_queue_size=1, port=port, reuse_port=True)
+        self.given_server(max_threads=1, max_queue_size=1, port=port, reuse_port=True)
+        assert get(("127.0.0.1", port), "/")[0] == 200
+
+
+@pytest.mark.skipif(not hasattr(os, "fork") or not hasattr(socket, "SO_REUSEPORT"), reason="fork is not supported")
+class TestPreforkServer:
+    def test_Given_2_workers_When_send_requests_Then_served_by_the_workers(self):
+        port = free_port()
+
+        def serve():
+            ThreadPoolHTTPServer(("127.0.0.1", port), PidHandler, reuse_port=True).serve_forever()
+
+        prefork_server = PreforkServer(2, serve)
+        prefork_server.start()
+        try:
+            pids = set()
+            deadline = time.monotonic() + 5
+            while len(pids) < 2 and time.monotonic() < deadline:
+                try:
+                    status, body = get(("127.0.0.1", port), "/")
+                    pids.add(int(body))
+                except ConnectionError:
+                    time.sleep(0.05)
+            assert pids == set(prefork_server.pids)
+        finally:
+            prefork_server.server_close()
+        assert prefork_server.pids == []
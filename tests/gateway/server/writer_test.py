@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+__author__ = "Chaoyuuu (chaoyu2330@gmail.com)"
+__license__ = "Apache 2.0"
+
+# standard library
+import socket
+
+# scip plugin
+from spring_cloud.gateway.server.writer import encode_response_head, send_buffers
+
+
+class PartialSocket:
+    """
+    Accepts at most 3 bytes per sendmsg call.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.received = b""
+
+    def sendmsg(self, buffers):
+        self.calls += 1
+        data = b"".join(bytes(buffer) for buffer in buffers)[:3]
+        self.received += data
+        return len(data)
+
+
+def test_encode_response_head():
+    head = encode_response_head(404, [("Content-Length", "0"), ("Set-Cookie", "a=1")])
+    assert head == b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nSet-Cookie: a=1\r\n\r\n"
+
+
+def test_Given_partial_writes_When_send_buffers_Then_send_everything_in_order():
+    sock = PartialSocket()
+    send_buffers(sock, [b"head\r\n", b"", b"body"])
+    assert sock.received == b"head\r\nbody"
+    assert sock.calls == 4
+
+
+def test_Given_socket_When_send_buffers_Then_send_with_one_call():
+    left, right = socket.socketpair()
+    with left, right:
+        send_buffers(left, [b"head\r\n", b"body"])
+        assert right.recv(1024) == b"head\r\nbody"